@@ -4,28 +4,131 @@ import logging
 import nest_asyncio
 from pyrogram import idle
 
+from app import config
+from app.auth_manager.account_purge import get_session_cleanup_queue
+from app.auth_manager.auth_throttle import get_auth_throttle
+from app.auth_manager.login_names_filter import get_login_names_filter
+from app.auth_manager.password import get_password_hasher
+from app.auth_manager.users_cache import get_users_cache
 from app.bot_init.bot_init import client_bot
-from app.fsm_context.fsm_context import fsm_context_init
+from app.db.create_models import check_schema_version
+from app.db.db_config import async_engine
+from app.db.pool_monitor import get_pool_monitor
+from app.db.query_accounting import get_query_accountant
+from app.db.router import get_session_router
+from app.db.statements import get_statement_registry
+from app.fsm_context.fsm_context import fsm_context_init, get_fsm_context
+from app.metrics import get_metrics_registry, get_metrics_server
+from app.offload import get_blocking_executor
+from app.reminders.scheduler import get_reminder_schedulers, get_reminder_sender
+from app.tasks_manager.status_sweeper import get_status_sweeper
+from app.tasks_manager.task_cards import get_task_card_renderer
+from app.tasks_manager.tasks_cache import get_tasks_cache
+from app.tasks_manager.tasks_analytics import get_statistics_cache_stats
+from app.tasks_manager.tasks_search import get_search_cache_stats
+from app.tracing import get_tracer
 logging.basicConfig(level=logging.INFO)
 
 logger = logging.getLogger(__name__)
 
 
+def register_metrics_collectors() -> None:
+    """Export the counters of the caches, pools and workers in the metrics."""
+    collectors = {
+        "fsm": get_fsm_context().get_stats,
+        "tasks_cache": get_tasks_cache().get_stats,
+        "users_cache": get_users_cache().get_stats,
+        "task_cards_cache": get_task_card_renderer().get_stats,
+        "search_cache": get_search_cache_stats,
+        "statistics_cache": get_statistics_cache_stats,
+        "login_names_filter": get_login_names_filter().get_stats,
+        "auth_throttle": get_auth_throttle().get_stats,
+        "blocking_executor": get_blocking_executor().get_stats,
+        "password_executor": get_password_hasher().executor.get_stats,
+        "reminder_sender": get_reminder_sender().get_stats,
+        "status_sweeper": get_status_sweeper().get_stats,
+        "session_cleanup": get_session_cleanup_queue().get_stats,
+        "tracing": get_tracer().get_stats,
+        "database_pool": get_pool_monitor().get_stats
+    }
+    for prefix, get_stats in collectors.items():
+        get_metrics_registry().register_collector(prefix=prefix, get_stats=get_stats)
+    get_metrics_registry().register_collector(
+        prefix="reminder",
+        get_stats=lambda: {"schedulers": {x.name: x.get_stats() for x in get_reminder_schedulers()}},
+        label_keys={"schedulers": "scheduler"}
+    )
+    get_metrics_registry().register_collector(
+        prefix="session_router",
+        get_stats=get_session_router().get_stats,
+        label_keys={"replicas": "replica"}
+    )
+    get_metrics_registry().register_collector(
+        prefix="query_accounting",
+        get_stats=get_query_accountant().get_stats,
+        label_keys={"handlers": "handler"}
+    )
+
+
 async def main() -> None:
     """
     Launch the bot.
 
     Asynchronously initializes the FSM context, launches the bot client, and waits for completion.
     """
+    # Worker processes are forked before the first thread of the bot starts
+    get_password_hasher().executor.start()
     loop = asyncio.get_event_loop()
     run = loop.run_until_complete
+    run(check_schema_version())
     run(fsm_context_init())
+    run(get_login_names_filter().load())
+    if not config.PASSWORD_SCRYPT_N:
+        run(get_password_hasher().calibrate(time_budget=config.PASSWORD_HASH_TIME_BUDGET))
     run(client_bot.start())
     logger.info("Client started")
+    register_metrics_collectors()
+    run(get_metrics_server().start())
+    background_tasks = [loop.create_task(get_reminder_sender().run())]
+    background_tasks += [loop.create_task(x.run()) for x in get_reminder_schedulers()]
+    background_tasks.append(loop.create_task(get_status_sweeper().run()))
+    background_tasks.append(loop.create_task(get_session_cleanup_queue().run()))
+    background_tasks.append(loop.create_task(get_session_router().run()))
+    background_tasks.append(loop.create_task(get_tracer().exporter.run()))
     run(idle())
     logger.info("Client stopped")
+    run(get_metrics_server().stop())
+    for task in background_tasks:
+        task.cancel()
+    run(asyncio.gather(*background_tasks, return_exceptions=True))
+    get_tracer().exporter.flush()
+    for scheduler in get_reminder_schedulers():
+        run(scheduler.save_watermark())
+        logger.info("Reminder scheduler %s stats: %s", scheduler.name, scheduler.get_stats())
+    logger.info("Reminder sender stats: %s", get_reminder_sender().get_stats())
+    logger.info("Status sweeper stats: %s", get_status_sweeper().get_stats())
+    logger.info("Session cleanup stats: %s", get_session_cleanup_queue().get_stats())
     run(client_bot.stop())
+    run(async_engine.dispose())
+    run(get_session_router().dispose())
+    get_blocking_executor().shutdown()
+    get_password_hasher().executor.shutdown()
+    logger.info("Blocking executor stats: %s", get_blocking_executor().get_stats())
+    logger.info("Password executor stats: %s", get_password_hasher().executor.get_stats())
+    logger.info("Tasks cache stats: %s", get_tasks_cache().get_stats())
+    logger.info("Users cache stats: %s", get_users_cache().get_stats())
+    logger.info("Login names filter stats: %s", get_login_names_filter().get_stats())
+    logger.info("Auth throttle stats: %s", get_auth_throttle().get_stats())
+    logger.info("Task cards cache stats: %s", get_task_card_renderer().get_stats())
+    logger.info("Search cache stats: %s", get_search_cache_stats())
+    logger.info("Statistics cache stats: %s", get_statistics_cache_stats())
+    logger.info("Statement stats: %s", get_statement_registry().get_stats())
+    logger.info("Database pool stats: %s", get_pool_monitor().get_stats())
+    logger.info("Query accounting stats: %s", get_query_accountant().get_stats())
+    logger.info("Tracing stats: %s", get_tracer().get_stats())
+    logger.info("Session router stats: %s", get_session_router().get_stats())
 
 
-nest_asyncio.apply()
-asyncio.run(main())
+if __name__ == "__main__":
+    nest_asyncio.apply()
+    asyncio.run(main())
@@ -0,0 +1,197 @@
+"""
+Purge of user accounts.
+
+Deleting a user cascades to the user's tasks, which for an owner with a huge number of tasks is one long
+statement holding row locks on all of them. The purge first deletes the tasks in bounded batches, each
+in its own short transaction, and then removes the user together with the tasks created meanwhile and
+resets the sessions of other users logged in to the account in a single transaction. Either the account
+and its sessions are gone together, or nothing but some of its tasks is.
+
+The bot messages still shown to the users of the reset sessions are deleted in the background by
+the session cleanup queue, so the purge does not wait for Telegram.
+
+Options:
+    _session_cleanup_queue (SessionCleanupQueue): A single instance of the cleanup queue used by the application.
+"""
+
+import asyncio
+import logging
+
+from pyrogram.errors import FloodWait, RPCError
+
+from app import config
+from app.auth_manager.auth_controller import DELETE_USER
+from app.auth_manager.users_cache import get_users_cache
+from app.bot_init.bot_init import client_bot
+from app.db.db_config import AsyncSession
+from app.db.statements import get_statement_registry
+from app.fsm_context.fsm_context import get_fsm_context
+from app.tasks_manager.tasks_cache import get_tasks_cache, TasksChange
+
+logger = logging.getLogger(__name__)
+
+DELETE_TASKS_BATCH = get_statement_registry().register(
+    name="accounts.delete_tasks_batch",
+    sql=(
+        "DELETE FROM user_tasks WHERE id_task IN ("
+        "SELECT id_task FROM user_tasks WHERE owner_telegram_id =:owner_telegram_id "
+        "LIMIT :limit FOR UPDATE SKIP LOCKED)"
+    )
+)
+# Sessions of other users logged in to the account, with the bot messages still shown to them
+RESET_STALE_SESSIONS = get_statement_registry().register(
+    name="accounts.reset_stale_sessions",
+    sql=(
+        "WITH stale AS ("
+        "SELECT telegram_id, data FROM fsm_context "
+        "WHERE telegram_id <> :owner_telegram_id AND data->>'owner_telegram_id' = :owner_text "
+        "FOR UPDATE) "
+        "UPDATE fsm_context SET state = '', data = '{}' FROM stale "
+        "WHERE fsm_context.telegram_id = stale.telegram_id "
+        "RETURNING fsm_context.telegram_id, stale.data->'list_messages_delete_ids' AS message_ids"
+    )
+)
+
+
+class SessionCleanupQueue:
+    """
+    Bounded queue of reset sessions whose bot messages are deleted in the background.
+
+    Options:
+        max_queue_size (int): Maximum number of queued sessions, new sessions are dropped when it is full.
+
+    Methods:
+        put(telegram_id: int, message_ids: list[int]) -> bool: Queues the messages of a reset session.
+        run() -> None: Deletes the queued messages until cancelled.
+        get_stats() -> dict: Gets the queue counters.
+    """
+
+    def __init__(self, max_queue_size: int):
+        self.__queue: asyncio.Queue[tuple[int, list[int]]] = asyncio.Queue(maxsize=max_queue_size)
+        self.queued = 0
+        self.cleaned = 0
+        self.dropped = 0
+        self.failed = 0
+
+    def put(self, telegram_id: int, message_ids: list[int]) -> bool:
+        """
+        Queue the bot messages of a reset session.
+
+        Options:
+            telegram_id (int): Telegram user ID of the session.
+            message_ids (list[int]): IDs of the bot messages in the user's chat.
+
+        Returns:
+            bool: False if the queue is full and the session was dropped.
+        """
+        try:
+            self.__queue.put_nowait((telegram_id, message_ids))
+        except asyncio.QueueFull:
+            self.dropped += 1
+            logger.warning("Session cleanup queue is full, messages of %s are kept", telegram_id)
+            return False
+        self.queued += 1
+        return True
+
+    async def run(self) -> None:
+        """Delete the queued messages until cancelled."""
+        while True:
+            telegram_id, message_ids = await self.__queue.get()
+            try:
+                await client_bot.delete_messages(chat_id=telegram_id, message_ids=message_ids)
+                self.cleaned += 1
+            except FloodWait as error:
+                logger.warning("Flood wait of %s s while cleaning sessions", error.value)
+                await asyncio.sleep(error.value)
+                self.put(telegram_id=telegram_id, message_ids=message_ids)
+            except RPCError as error:
+                self.failed += 1
+                logger.warning("Messages of the session %s were not deleted: %s", telegram_id, error)
+            finally:
+                self.__queue.task_done()
+
+    def get_stats(self) -> dict:
+        """
+        Get the queue counters.
+
+        Returns:
+            dict: Queue size and the numbers of queued, cleaned, dropped and failed sessions.
+        """
+        return {
+            "size": self.__queue.qsize(),
+            "queued": self.queued,
+            "cleaned": self.cleaned,
+            "dropped": self.dropped,
+            "failed": self.failed
+        }
+
+
+_session_cleanup_queue: SessionCleanupQueue = SessionCleanupQueue(
+    max_queue_size=config.SESSION_CLEANUP_QUEUE_SIZE
+)
+
+
+def get_session_cleanup_queue() -> SessionCleanupQueue:
+    return _session_cleanup_queue
+
+
+async def delete_tasks_in_batches(owner_telegram_id: int, batch_size: int) -> int:
+    """
+    Delete the owner's tasks in batches, each batch in its own transaction.
+
+    Options:
+        owner_telegram_id (int): Account owner ID.
+        batch_size (int): Maximum number of tasks deleted by one transaction.
+
+    Returns:
+        int: Number of deleted tasks.
+    """
+    deleted = 0
+    while True:
+        async with AsyncSession() as session:
+            batch_deleted = (await DELETE_TASKS_BATCH.execute(
+                session,
+                {"owner_telegram_id": owner_telegram_id, "limit": batch_size}
+            )).rowcount
+            await session.commit()
+        deleted += batch_deleted
+        if batch_deleted < batch_size:
+            return deleted
+
+
+async def purge_account(owner_telegram_id: int) -> None:
+    """
+    Remove the account with its tasks and reset the sessions of other users logged in to it.
+
+    Options:
+        owner_telegram_id (int): Account owner ID.
+    """
+    deleted = await delete_tasks_in_batches(
+        owner_telegram_id=owner_telegram_id,
+        batch_size=config.ACCOUNT_PURGE_BATCH_SIZE
+    )
+    async with AsyncSession() as session:
+        await DELETE_USER.execute(session, {"owner_telegram_id": owner_telegram_id})
+        stale_sessions = (await RESET_STALE_SESSIONS.execute(
+            session,
+            {"owner_telegram_id": owner_telegram_id, "owner_text": str(owner_telegram_id)}
+        )).all()
+        await session.commit()
+    get_users_cache().invalidate(owner_telegram_id=owner_telegram_id)
+    get_tasks_cache().invalidate_owner(
+        owner_telegram_id=owner_telegram_id,
+        change=TasksChange(moves_deadlines=False)
+    )
+    for stale_session in stale_sessions:
+        await get_fsm_context().reload(telegram_id=stale_session.telegram_id)
+        if stale_session.message_ids:
+            get_session_cleanup_queue().put(
+                telegram_id=stale_session.telegram_id,
+                message_ids=stale_session.message_ids
+            )
+    logger.info(
+        "Account %s purged: %s tasks deleted in batches, %s sessions reset",
+        owner_telegram_id,
+        deleted,
+        len(stale_sessions)
+    )
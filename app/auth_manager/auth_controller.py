@@ -2,15 +2,79 @@
 Module for working with the database and managing users.
 
 This module contains functions for interacting with the database and managing users.
+Statements of every operation are precompiled once in the statement registry, users are read
+through the user cache, from a replica when one is configured, and every write invalidates the user's cache entries. Login names are added to
+the login names filter before they are written, so availability checks of free names need no query.
 """
 
-from sqlalchemy import text
-
-from app.db.db_config import Session
+from app.auth_manager.login_names_filter import get_login_names_filter
+from app.auth_manager.users_cache import get_users_cache, MISSING
+from app.db.db_config import AsyncSession
 from app.db.models import Users
-
-
-def update_is_login(owner_telegram_id: int, is_login: bool) -> None:
+from app.db.router import read_session
+from app.db.statements import get_statement_registry
+
+UPDATE_IS_LOGIN = get_statement_registry().register(
+    name="users.update_is_login",
+    sql=(
+        "UPDATE users SET is_login=:is_login "
+        "WHERE owner_telegram_id=:owner_telegram_id"
+    )
+)
+UPDATE_USERNAME = get_statement_registry().register(
+    name="users.update_username",
+    sql=(
+        "UPDATE users SET username=:username "
+        "WHERE owner_telegram_id=:owner_telegram_id"
+    )
+)
+UPDATE_LOGIN_NAME = get_statement_registry().register(
+    name="users.update_login_name",
+    sql=(
+        "UPDATE users SET login_name=:login_name "
+        "WHERE owner_telegram_id=:owner_telegram_id"
+    )
+)
+UPDATE_PASSWORD = get_statement_registry().register(
+    name="users.update_password",
+    sql=(
+        "UPDATE users SET password=:password "
+        "WHERE owner_telegram_id=:owner_telegram_id"
+    )
+)
+INSERT_USER = get_statement_registry().register(
+    name="users.insert",
+    sql=(
+        "INSERT INTO users (login_name, owner_telegram_id, password, username, is_login) "
+        "VALUES (:login_name, :owner_telegram_id, :password, :username, :is_login)"
+    )
+)
+GET_USER_BY_TELEGRAM_ID = get_statement_registry().register(
+    name="users.get_by_telegram_id",
+    sql=(
+        "SELECT owner_telegram_id, password, login_name, username, is_login "
+        "FROM users "
+        "WHERE owner_telegram_id = :owner_telegram_id"
+    )
+)
+GET_USER_BY_LOGIN_NAME = get_statement_registry().register(
+    name="users.get_by_login_name",
+    sql=(
+        "SELECT owner_telegram_id, password, login_name, username, is_login "
+        "FROM users "
+        "WHERE login_name = :login_name"
+    )
+)
+DELETE_USER = get_statement_registry().register(
+    name="users.delete",
+    sql=(
+        "DELETE FROM users "
+        "WHERE owner_telegram_id = :owner_telegram_id"
+    )
+)
+
+
+async def update_is_login(owner_telegram_id: int, is_login: bool) -> None:
     """
     Updates the user's login status.
 
@@ -21,22 +85,19 @@ def update_is_login(owner_telegram_id: int, is_login: bool) -> None:
     Returns:
         None
     """
-    with Session() as session:
-        query = text(
-            "UPDATE users SET is_login=:is_login "
-            "WHERE owner_telegram_id=:owner_telegram_id"
-        )
-        session.execute(
-            query,
+    async with AsyncSession() as session:
+        await UPDATE_IS_LOGIN.execute(
+            session,
             {
                 "owner_telegram_id": owner_telegram_id,
                 "is_login": is_login
             }
         )
-        session.commit()
+        await session.commit()
+    get_users_cache().invalidate(owner_telegram_id=owner_telegram_id)
 
 
-def update_username(owner_telegram_id: int, username: str) -> None:
+async def update_username(owner_telegram_id: int, username: str) -> None:
     """
     Updates the username in the database.
 
@@ -47,22 +108,19 @@ def update_username(owner_telegram_id: int, username: str) -> None:
     Returns:
         None
     """
-    with Session() as session:
-        query = text(
-            "UPDATE users SET username=:username "
-            "WHERE owner_telegram_id=:owner_telegram_id"
-        )
-        session.execute(
-            query,
+    async with AsyncSession() as session:
+        await UPDATE_USERNAME.execute(
+            session,
             {
                 "owner_telegram_id": owner_telegram_id,
                 "username": username
             }
         )
-        session.commit()
+        await session.commit()
+    get_users_cache().invalidate(owner_telegram_id=owner_telegram_id)
 
 
-def update_login_name(owner_telegram_id: int, login_name: str) -> None:
+async def update_login_name(owner_telegram_id: int, login_name: str) -> None:
     """
     Updates the user's unique login in the database.
 
@@ -73,22 +131,20 @@ def update_login_name(owner_telegram_id: int, login_name: str) -> None:
     Returns:
         None
     """
-    with Session() as session:
-        query = text(
-            "UPDATE users SET login_name=:login_name "
-            "WHERE owner_telegram_id=:owner_telegram_id"
-        )
-        session.execute(
-            query,
+    get_login_names_filter().add(login_name=login_name)
+    async with AsyncSession() as session:
+        await UPDATE_LOGIN_NAME.execute(
+            session,
             {
                 "owner_telegram_id": owner_telegram_id,
                 "login_name": login_name
             }
         )
-        session.commit()
+        await session.commit()
+    get_users_cache().invalidate(owner_telegram_id=owner_telegram_id, login_name=login_name)
 
 
-def update_password(owner_telegram_id: int, password: str) -> None:
+async def update_password(owner_telegram_id: int, password: str) -> None:
     """
     Updates the user's password in the database.
 
@@ -96,22 +152,19 @@ def update_password(owner_telegram_id: int, password: str) -> None:
         owner_telegram_id (int): Account owner ID.
         password (str): New password.
     """
-    with Session() as session:
-        query = text(
-            "UPDATE users SET password=:password "
-            "WHERE owner_telegram_id=:owner_telegram_id"
-        )
-        session.execute(
-            query,
+    async with AsyncSession() as session:
+        await UPDATE_PASSWORD.execute(
+            session,
             {
                 "owner_telegram_id": owner_telegram_id,
                 "password": password
             }
         )
-        session.commit()
+        await session.commit()
+    get_users_cache().invalidate(owner_telegram_id=owner_telegram_id)
 
 
-def set_user(
+async def set_user(
         login_name: str,
         owner_telegram_id: int,
         username: str,
@@ -128,12 +181,10 @@ def set_user(
         password (str): User password.
         is_login (bool, optional): User login status (default True).
     """
-    with Session() as session:
-        query = text(
-            "INSERT INTO users (login_name, owner_telegram_id, password, username, is_login) "
-            "VALUES (:login_name, :owner_telegram_id, :password, :username, :is_login)")
-        session.execute(
-            query,
+    get_login_names_filter().add(login_name=login_name)
+    async with AsyncSession() as session:
+        await INSERT_USER.execute(
+            session,
             {
                 "owner_telegram_id": owner_telegram_id,
                 "password": password,
@@ -142,10 +193,11 @@ def set_user(
                 "is_login": is_login
             }
         )
-        session.commit()
+        await session.commit()
+    get_users_cache().invalidate(owner_telegram_id=owner_telegram_id, login_name=login_name)
 
 
-def get_user(
+async def get_user(
         owner_telegram_id: int = None,
         login_name: str = None
     ) -> Users | None:
@@ -159,42 +211,58 @@ def get_user(
     Returns:
         Users | None: The user object, or None if the user is not found.
     """
+    if not owner_telegram_id and not login_name:
+        return None
+    cached_user = get_users_cache().get(owner_telegram_id=owner_telegram_id or None, login_name=login_name)
+    if cached_user is not MISSING:
+        return cached_user
+    generation = get_users_cache().generation
     user = None
-    with Session() as session:
+    async with read_session(GET_USER_BY_TELEGRAM_ID, GET_USER_BY_LOGIN_NAME) as session:
         if owner_telegram_id:
-            query = text(
-                "SELECT owner_telegram_id, password, login_name, username, is_login "
-                "FROM users "
-                "WHERE owner_telegram_id = :owner_telegram_id"
-            )
-            user: Users | None = session.execute(
-                query, {"owner_telegram_id": owner_telegram_id}
-            ).first()
+            user: Users | None = (await GET_USER_BY_TELEGRAM_ID.execute(
+                session, {"owner_telegram_id": owner_telegram_id}
+            )).first()
         elif login_name:
-            query = text(
-                "SELECT owner_telegram_id, password, login_name, username, is_login "
-                "FROM users "
-                "WHERE login_name = :login_name")
-            user: Users | None = session.execute(
-                query, {"login_name": login_name}
-            ).first()
+            user: Users | None = (await GET_USER_BY_LOGIN_NAME.execute(
+                session, {"login_name": login_name}
+            )).first()
+    get_users_cache().set(user=user, owner_telegram_id=owner_telegram_id or None, generation=generation)
     return user
 
 
-def delete_user(owner_telegram_id: int) -> None:
+async def is_login_name_taken(login_name: str) -> bool:
+    """
+    Checks whether the unique login is taken by a user.
+
+    Options:
+        login_name (str): Unique user login.
+
+    Returns:
+        bool: True if the login is taken or empty (a Telegram user without a username).
+        Logins the login names filter reports as free are answered without a database query.
+    """
+    if not login_name:
+        return True
+    if not get_login_names_filter().might_contain(login_name=login_name):
+        get_login_names_filter().record_check(is_taken=None)
+        return False
+    is_taken = await get_user(login_name=login_name) is not None
+    get_login_names_filter().record_check(is_taken=is_taken)
+    return is_taken
+
+
+async def delete_user(owner_telegram_id: int) -> None:
     """
     Removes a user from the database.
 
     Options:
         owner_telegram_id (int): Account owner ID.
     """
-    with Session() as session:
-        query = text(
-            "DELETE FROM users "
-            "WHERE owner_telegram_id = :owner_telegram_id"
-        )
-        session.execute(query, {"owner_telegram_id": owner_telegram_id})
-        session.commit()
+    async with AsyncSession() as session:
+        await DELETE_USER.execute(session, {"owner_telegram_id": owner_telegram_id})
+        await session.commit()
+    get_users_cache().invalidate(owner_telegram_id=owner_telegram_id)
 
 
 def check_user_is_owner(user_telegram_id: int, owner_telegram_id: int) -> bool:
@@ -1,8 +1,9 @@
 from pyrogram import filters, Client, types
 
 from app.auth_manager import auth_controller
-from app.auth_manager.password import validation_password, encrypt_password, \
-    verify_password, text_set_password_message
+from app.auth_manager.auth_throttle import get_auth_throttle, text_throttled_message
+from app.auth_manager.password import validation_password, hash_password, \
+    verify_password, text_set_password_message, get_password_hasher
 from app.bot_init.bot_init import client_bot
 from app.db.models import Users
 from app.fsm_context.fsm_context import get_fsm_context
@@ -23,13 +24,13 @@ async def set_password(_: Client, message: types.Message) -> None:
         text_message = text_set_password_message(is_error=True)
     else:
         data = get_fsm_context().get_data(telegram_id=message.from_user.id)
-        data["password"] = encrypt_password(password=message.text.strip())
+        data["password"] = await hash_password(password=message.text.strip())
         text_message = "Подтвердите ваш новый пароль, введя его еще раз"
-        get_fsm_context().update_state(
+        await get_fsm_context().update_state(
             telegram_id=message.from_user.id,
             state="authorization:confirm_reset_password"
         )
-        get_fsm_context().update_data(
+        await get_fsm_context().update_data(
             telegram_id=message.from_user.id,
             data=data
         )
@@ -49,9 +50,9 @@ async def confirm_set_password(client: Client, message: types.Message) -> None:
     """Confirmation handler for setting a new password."""
     data = get_fsm_context().get_data(telegram_id=message.from_user.id)
     is_update_user: bool = False
-    if not verify_password(
+    if not await verify_password(
         password=message.text.strip(),
-        encrypted_password=data.get("password")
+        password_hash=data.get("password")
     ):
         text_message = (
             "Пароли не совпадают!!!\n"
@@ -59,12 +60,12 @@ async def confirm_set_password(client: Client, message: types.Message) -> None:
         )
         keyboard = [[types.KeyboardButton(text="В главное меню")]]
         reply_markup = types.ReplyKeyboardMarkup(keyboard=keyboard)
-        get_fsm_context().update_state(
+        await get_fsm_context().update_state(
             telegram_id=message.from_user.id,
             state="authorization:reset_password"
         )
     else:
-        auth_controller.update_password(
+        await auth_controller.update_password(
             owner_telegram_id=message.from_user.id,
             password=data.get('password')
         )
@@ -103,23 +104,44 @@ async def authorization_user(_: Client, message: types.Message) -> None:
         message=message
     )
     await telegram_utils.send_messages()
-    get_fsm_context().update_state(
+    await get_fsm_context().update_state(
         telegram_id=message.from_user.id,
         state="authorization:login"
     )
 
 
+async def send_throttled_message(message: types.Message, lockout: float) -> None:
+    """
+    Sends the message rejecting a throttled authorization attempt.
+
+    Options:
+    - message (types.Message): Message of the attempt.
+    - lockout (float): Seconds until the next attempt is allowed.
+    """
+    reply_markup = types.ReplyKeyboardMarkup(keyboard=[[types.KeyboardButton(text="В главное меню")]])
+    telegram_utils = TelegramUtils(
+        text=text_throttled_message(lockout=lockout),
+        reply_markup=reply_markup,
+        message=message
+    )
+    await telegram_utils.send_messages()
+
+
 @client_bot.on_message(
     filters.text &
     (get_filters().message_filter(state="authorization:login"))
 )
 async def authorization_user_login(_: Client, message: types.Message) -> None:
     """Login input handler for authorization."""
+    lockout = get_auth_throttle().get_lockout(("telegram_id", message.from_user.id))
+    if lockout:
+        return await send_throttled_message(message=message, lockout=lockout)
     login_name = message.from_user.username if message.text == "Продолжить" \
         else message.text.strip()
-    user: Users | None = auth_controller.get_user(login_name=login_name)
+    user: Users | None = await auth_controller.get_user(login_name=login_name)
     keyboard = list()
     if not user:
+        get_auth_throttle().record_failure(("telegram_id", message.from_user.id))
         text_message = "Данный логин не был обнаружен. \
             Повторите ввод логина еще раз"
         keyboard.append([
@@ -130,7 +152,7 @@ async def authorization_user_login(_: Client, message: types.Message) -> None:
     else:
         data = get_fsm_context().get_data(telegram_id=message.from_user.id)
         data["login_name"] = login_name
-        get_fsm_context().update_data(
+        await get_fsm_context().update_data(
             telegram_id=message.from_user.id,
             data=data
         )
@@ -151,7 +173,7 @@ async def authorization_user_login(_: Client, message: types.Message) -> None:
     )
     await telegram_utils.send_messages()
     if user:
-        get_fsm_context().update_state(
+        await get_fsm_context().update_state(
             telegram_id=message.from_user.id,
             state="authorization:password"
         )
@@ -162,7 +184,7 @@ async def authorization_user_login(_: Client, message: types.Message) -> None:
 async def reset_password(_: Client, message: types.Message) -> None:
     """ОPassword recovery request handler."""
     data = get_fsm_context().get_data(telegram_id=message.from_user.id)
-    user: Users | None = auth_controller.get_user(
+    user: Users | None = await auth_controller.get_user(
         login_name=data.get('login_name')
     )
     reply_markup = None
@@ -176,7 +198,7 @@ async def reset_password(_: Client, message: types.Message) -> None:
         keyboard = list()
         keyboard.append([types.KeyboardButton(text="В главное меню")])
         reply_markup = types.ReplyKeyboardMarkup(keyboard=keyboard)
-        get_fsm_context().update_state(
+        await get_fsm_context().update_state(
             telegram_id=message.from_user.id,
             state="authorization:reset_password"
         )
@@ -200,13 +222,18 @@ async def registration_user(client: Client, message: types.Message) -> None:
     reply_markup = None
     keyboard = list()
     data = get_fsm_context().get_data(telegram_id=message.from_user.id)
-    user: Users | None = auth_controller.get_user(
+    throttle_keys = (("telegram_id", message.from_user.id), ("login_name", data.get('login_name')))
+    lockout = get_auth_throttle().get_lockout(*throttle_keys)
+    if lockout:
+        return await send_throttled_message(message=message, lockout=lockout)
+    user: Users | None = await auth_controller.get_user(
         login_name=data.get('login_name')
     )
-    if not verify_password(
+    if not await verify_password(
         password=message.text.strip(),
-        encrypted_password=user.password
+        password_hash=user.password
     ):
+        get_auth_throttle().record_failure(*throttle_keys)
         text_message = "Вы ввели неверный пароль. \
             Повторите попытку еще раз, или сбросьте ваш пароль"
         if auth_controller.check_user_is_owner(
@@ -219,7 +246,13 @@ async def registration_user(client: Client, message: types.Message) -> None:
         keyboard.append([types.KeyboardButton(text="В главное меню")])
         reply_markup = types.ReplyKeyboardMarkup(keyboard=keyboard)
     else:
-        auth_controller.update_is_login(
+        get_auth_throttle().record_success(*throttle_keys)
+        if get_password_hasher().needs_rehash(password_hash=user.password):
+            await auth_controller.update_password(
+                owner_telegram_id=user.owner_telegram_id,
+                password=await hash_password(password=message.text.strip())
+            )
+        await auth_controller.update_is_login(
             owner_telegram_id=user.owner_telegram_id,
             is_login=True
         )
@@ -249,7 +282,7 @@ async def confirm_delete_account_user(
     if not data.get('owner_telegram_id'):
         text_message = "Вы не имеете доступ к данному функционалу"
     else:
-        auth_controller.update_is_login(
+        await auth_controller.update_is_login(
             owner_telegram_id=data.get('owner_telegram_id'),
             is_login=False
         )
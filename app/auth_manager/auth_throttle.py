@@ -0,0 +1,199 @@
+"""
+Throttling of authorization attempts.
+
+Every failed login lookup and password guess is counted in a sliding window per Telegram user and per
+target login, so a burst is stopped whether it comes from one user guessing many logins or from many
+users guessing one login. The sliding window is approximated from two fixed windows: the count of the
+previous window is weighted by the part of it still inside the sliding window, which needs two counters
+per key instead of a timestamp per attempt. A key reaching the limit is locked out, and every next
+lockout of the same key is twice as long. Locked out attempts are rejected by the handlers before any
+database query or password hashing.
+
+Counters are kept in an LRU cache bounded in size, with a time-to-live longer than the longest lockout,
+so the memory used by the throttle does not grow with the number of attackers.
+
+Options:
+    _auth_throttle (AuthThrottle): A single instance of the throttle used by the application.
+"""
+
+import time
+from dataclasses import dataclass
+from typing import Callable, Hashable
+
+from app import config
+from app.cache import LRUCache
+
+
+@dataclass
+class AttemptWindow:
+    """
+    Failed attempts of one key.
+
+    Options:
+        window_start (float): Start of the current fixed window.
+        count (int): Failed attempts in the current fixed window.
+        previous_count (int): Failed attempts in the previous fixed window.
+        locked_until (float): End of the lockout, 0 if the key is not locked out.
+        lockouts (int): Number of lockouts of the key.
+    """
+    window_start: float
+    count: int = 0
+    previous_count: int = 0
+    locked_until: float = 0.0
+    lockouts: int = 0
+
+
+class AuthThrottle:
+    """
+    Sliding-window counters of failed attempts with exponential lockout.
+
+    Options:
+        max_attempts (int): Failed attempts allowed in the window before a lockout.
+        window (float): Length of the sliding window in seconds.
+        lockout (float): Length of the first lockout in seconds.
+        max_lockout (float): Maximum length of a lockout in seconds.
+        max_keys (int): Maximum number of tracked keys.
+        clock (Callable[[], float]): Clock used for the windows (time.monotonic by default).
+
+    Methods:
+        get_lockout(*keys: Hashable) -> float: Gets the remaining lockout of the most locked out key.
+        record_failure(*keys: Hashable) -> None: Counts a failed attempt for the keys.
+        record_success(*keys: Hashable) -> None: Resets the counters of the keys.
+        get_stats() -> dict: Gets the throttle counters.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int,
+        window: float,
+        lockout: float,
+        max_lockout: float,
+        max_keys: int,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.max_attempts = max_attempts
+        self.window = window
+        self.lockout = lockout
+        self.max_lockout = max_lockout
+        self.__clock = clock
+        self.__windows = LRUCache(max_size=max_keys, ttl=max_lockout + 2 * window, clock=clock)
+        self.allowed = 0
+        self.rejected = 0
+        self.failures = 0
+        self.lockouts = 0
+
+    def __advance(self, attempt_window: AttemptWindow, now: float) -> None:
+        """Move the fixed windows of the key forward to the current time."""
+        elapsed_windows = int((now - attempt_window.window_start) // self.window)
+        if elapsed_windows <= 0:
+            return
+        attempt_window.previous_count = attempt_window.count if elapsed_windows == 1 else 0
+        attempt_window.count = 0
+        attempt_window.window_start += elapsed_windows * self.window
+
+    def get_lockout(self, *keys: Hashable) -> float:
+        """
+        Get the remaining lockout of the keys of an attempt and count the attempt as allowed or rejected.
+
+        Options:
+            *keys (Hashable): Keys of the attempt, for example ("telegram_id", 1) and ("login", "name").
+
+        Returns:
+            float: Seconds until the attempt is allowed, 0 if it is allowed now.
+        """
+        now = self.__clock()
+        remaining = 0.0
+        for key in keys:
+            attempt_window: AttemptWindow | None = self.__windows.get(key)
+            if attempt_window is not None:
+                remaining = max(remaining, attempt_window.locked_until - now)
+        if remaining > 0:
+            self.rejected += 1
+            return remaining
+        self.allowed += 1
+        return 0.0
+
+    def record_failure(self, *keys: Hashable) -> None:
+        """
+        Count a failed attempt for the keys and lock out the keys reaching the limit.
+
+        Options:
+            *keys (Hashable): Keys of the attempt.
+        """
+        now = self.__clock()
+        self.failures += 1
+        for key in keys:
+            attempt_window: AttemptWindow | None = self.__windows.get(key)
+            if attempt_window is None:
+                attempt_window = AttemptWindow(window_start=now)
+            self.__advance(attempt_window=attempt_window, now=now)
+            attempt_window.count += 1
+            weight = 1 - (now - attempt_window.window_start) / self.window
+            if attempt_window.count + attempt_window.previous_count * weight >= self.max_attempts:
+                attempt_window.locked_until = now + min(
+                    self.lockout * 2 ** attempt_window.lockouts,
+                    self.max_lockout
+                )
+                attempt_window.lockouts += 1
+                attempt_window.count = attempt_window.previous_count = 0
+                self.lockouts += 1
+            self.__windows.set(key, attempt_window)
+
+    def record_success(self, *keys: Hashable) -> None:
+        """
+        Reset the counters and lockouts of the keys after a successful attempt.
+
+        Options:
+            *keys (Hashable): Keys of the attempt.
+        """
+        for key in keys:
+            self.__windows.delete(key)
+
+    def get_stats(self) -> dict:
+        """
+        Get the throttle counters.
+
+        Returns:
+            dict: Numbers of allowed and rejected attempts, failures and lockouts,
+            with the size and eviction counters of the tracked keys.
+        """
+        windows_stats = self.__windows.get_stats()
+        return {
+            "allowed": self.allowed,
+            "rejected": self.rejected,
+            "failures": self.failures,
+            "lockouts": self.lockouts,
+            "keys": windows_stats["size"],
+            "max_keys": windows_stats["max_size"],
+            "evictions": windows_stats["evictions"],
+            "expirations": windows_stats["expirations"]
+        }
+
+
+_auth_throttle: AuthThrottle = AuthThrottle(
+    max_attempts=config.AUTH_THROTTLE_MAX_ATTEMPTS,
+    window=config.AUTH_THROTTLE_WINDOW,
+    lockout=config.AUTH_THROTTLE_LOCKOUT,
+    max_lockout=config.AUTH_THROTTLE_MAX_LOCKOUT,
+    max_keys=config.AUTH_THROTTLE_MAX_KEYS
+)
+
+
+def get_auth_throttle() -> AuthThrottle:
+    return _auth_throttle
+
+
+def text_throttled_message(lockout: float) -> str:
+    """
+    Generates a message about too many failed authorization attempts.
+
+    Options:
+    - lockout (float): Seconds until the next attempt is allowed.
+
+    Returns:
+    - str: Text message.
+    """
+    return (
+        "Слишком много неудачных попыток входа. "
+        f"Повторите попытку через {int(lockout) + 1} сек."
+    )
@@ -0,0 +1,161 @@
+"""
+Bloom filter of taken login names.
+
+This module contains the filter answering whether a login name may be taken without a database
+query. The filter is loaded at startup by streaming the login names of the users table, and
+auth_controller adds a login name before it is written by set_user or update_login_name, so the filter
+never misses a taken name. A negative answer means that the name is definitely free. A positive answer
+may be false and is checked with the unique index of the users table. Names freed by deleted users or
+login changes stay in the filter and only count as false positives.
+
+Until the filter is loaded every name is reported as possibly taken.
+
+Options:
+    _login_names_filter (LoginNamesFilter): A single instance of the filter used by the application.
+"""
+
+import hashlib
+import logging
+import math
+
+from app import config
+from app.db.db_config import AsyncSession
+from app.db.statements import get_statement_registry
+
+logger = logging.getLogger(__name__)
+
+GET_LOGIN_NAMES = get_statement_registry().register(
+    name="users.get_login_names",
+    sql="SELECT login_name FROM users"
+)
+
+
+class LoginNamesFilter:
+    """
+    Bloom filter of taken login names with false-positive metrics.
+
+    The number of bits and hash functions is chosen for the capacity and the target
+    false-positive rate. Bit positions come from double hashing of one BLAKE2b digest.
+
+    Options:
+        capacity (int): Expected number of login names.
+        error_rate (float): Target false-positive rate at the capacity.
+
+    Methods:
+        add(login_name: str) -> None: Adds a login name to the filter.
+        might_contain(login_name: str) -> bool: Checks whether the login name may be taken.
+        record_check(is_taken: bool | None) -> None: Records the outcome of an availability check.
+        load() -> None: Loads the login names of all users from the database.
+        get_stats() -> dict: Gets the filter counters.
+    """
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.__bits = bytearray((self.size + 7) // 8)
+        self.items = 0
+        self.is_loaded = False
+        self.definitely_free = 0
+        self.possible_hits = 0
+        self.false_positives = 0
+
+    def __get_positions(self, login_name: str) -> list[int]:
+        """Get the bit positions of the login name."""
+        digest = hashlib.blake2b(login_name.encode(), digest_size=16).digest()
+        first_hash, second_hash = int.from_bytes(digest[:8]), int.from_bytes(digest[8:]) | 1
+        return [(first_hash + x * second_hash) % self.size for x in range(self.hash_count)]
+
+    def add(self, login_name: str) -> None:
+        """
+        Add a login name to the filter.
+
+        Options:
+            login_name (str): Unique user login.
+        """
+        for position in self.__get_positions(login_name=login_name):
+            self.__bits[position >> 3] |= 1 << (position & 7)
+        self.items += 1
+
+    def might_contain(self, login_name: str) -> bool:
+        """
+        Check whether the login name may be taken.
+
+        Options:
+            login_name (str): Unique user login.
+
+        Returns:
+            bool: False if the login name is definitely free, True if it may be taken
+            or the filter is not loaded yet.
+        """
+        if not self.is_loaded:
+            return True
+        return all(
+            self.__bits[position >> 3] & (1 << (position & 7))
+            for position in self.__get_positions(login_name=login_name)
+        )
+
+    def record_check(self, is_taken: bool | None) -> None:
+        """
+        Record the outcome of an availability check.
+
+        Options:
+            is_taken (bool | None): None if the filter answered that the name is free,
+                otherwise the answer of the database for a possible hit.
+        """
+        if is_taken is None:
+            self.definitely_free += 1
+            return
+        self.possible_hits += 1
+        if not is_taken:
+            self.false_positives += 1
+
+    async def load(self) -> None:
+        """Load the login names of all users from the database, streaming them with a server-side cursor."""
+        async with AsyncSession() as session:
+            result = await GET_LOGIN_NAMES.stream(session)
+            async for list_login_names in result.scalars().partitions(config.LOGIN_NAMES_FILTER_BATCH_SIZE):
+                for login_name in list_login_names:
+                    self.add(login_name=login_name)
+        self.is_loaded = True
+        if self.items > self.capacity:
+            logger.warning(
+                "Login names filter holds %s names over its capacity %s, false positives will grow",
+                self.items,
+                self.capacity
+            )
+
+    def get_stats(self) -> dict:
+        """
+        Get the filter counters.
+
+        Returns:
+            dict: Size of the filter, answered checks, observed false-positive rate of the possible hits
+            and the false-positive rate expected for the number of added names.
+        """
+        checks = self.definitely_free + self.possible_hits
+        negatives = self.definitely_free + self.false_positives
+        return {
+            "loaded": self.is_loaded,
+            "items": self.items,
+            "capacity": self.capacity,
+            "bits": self.size,
+            "hash_count": self.hash_count,
+            "checks": checks,
+            "definitely_free": self.definitely_free,
+            "possible_hits": self.possible_hits,
+            "false_positives": self.false_positives,
+            "false_positive_rate": self.false_positives / negatives if negatives else 0.0,
+            "expected_false_positive_rate": (1 - math.exp(-self.hash_count * self.items / self.size)) ** self.hash_count
+        }
+
+
+_login_names_filter: LoginNamesFilter = LoginNamesFilter(
+    capacity=config.LOGIN_NAMES_FILTER_CAPACITY,
+    error_rate=config.LOGIN_NAMES_FILTER_ERROR_RATE
+)
+
+
+def get_login_names_filter() -> LoginNamesFilter:
+    return _login_names_filter
@@ -1,9 +1,42 @@
+"""
+Password hashing.
+
+Passwords are stored as one-way scrypt hashes in the format "scrypt$n$r$p$salt$hash" (salt and hash
+in base64). scrypt is memory-hard and holds the GIL while it runs, so every hash is computed in the
+password executor backed by worker processes, and hashing one password never blocks the updates of
+other users. Rows written before the hashing was introduced hold Fernet tokens: they are still verified
+by decryption, and needs_rehash tells the login handler to replace them with a hash after the next
+successful login. The same happens to hashes made with weaker parameters than the current ones.
+
+The cost parameter n is taken from the configuration, or calibrated at startup with a benchmark
+doubling n until one hash no longer fits the configured latency budget.
+
+Options:
+    _password_hasher (PasswordHasher): A single instance of the password hasher used by the application.
+"""
+
+import base64
+import hashlib
+import hmac
+import logging
 import re
-from cryptography.fernet import Fernet
+import secrets
+import time
+
+from cryptography.fernet import Fernet, InvalidToken
+
+from app import config
 from app.config import SECRET_KEY
+from app.offload import BlockingExecutor, offload
 
+logger = logging.getLogger(__name__)
 
 FERNET = Fernet(SECRET_KEY)
+HASH_PREFIX = "scrypt"
+SALT_SIZE = 16
+HASH_SIZE = 32
+MIN_SCRYPT_N = 2 ** 14
+MAX_SCRYPT_N = 2 ** 20
 
 
 def validation_password(password: str) -> bool:
@@ -20,46 +53,204 @@ def validation_password(password: str) -> bool:
     return bool(re.match(regex_pattern, password))
 
 
-def encrypt_password(password: str) -> str:
+def scrypt(password: bytes, salt: bytes, n: int, r: int, p: int) -> bytes:
     """
-    Encrypts the provided password using Fernet encryption.
+    Computes the scrypt hash of the password, called in the worker processes.
 
     Options:
-    - password (str): Password for encryption.
+    - password (bytes): Password.
+    - salt (bytes): Salt.
+    - n (int): CPU and memory cost, a power of 2.
+    - r (int): Block size.
+    - p (int): Parallelization.
 
     Returns:
-    - str: Encrypted password.
+    - bytes: Hash of HASH_SIZE bytes.
     """
-    encrypted_password = FERNET.encrypt(password.encode()).decode()
-    return encrypted_password
+    return hashlib.scrypt(
+        password,
+        salt=salt,
+        n=n,
+        r=r,
+        p=p,
+        maxmem=128 * r * (n + p + 2),
+        dklen=HASH_SIZE
+    )
+
+
+@offload
+def decrypt_legacy_password(password: str) -> str | None:
+    """
+    Decrypts a password stored with Fernet encryption in the blocking executor.
+
+    Options:
+    - password (str): Fernet token.
+
+    Returns:
+    - str | None: Decrypted password, or None if the token is invalid.
+    """
+    try:
+        return FERNET.decrypt(password.encode()).decode()
+    except InvalidToken:
+        return None
+
+
+class PasswordHasher:
+    """
+    Hasher of passwords with scrypt in a process pool.
+
+    Options:
+        n (int): CPU and memory cost of new hashes.
+        r (int): Block size of new hashes.
+        p (int): Parallelization of new hashes.
+        executor (BlockingExecutor): Process executor running the hashing.
+
+    Methods:
+        hash(password: str) -> str: Hashes the password with the current parameters.
+        verify(password: str, password_hash: str) -> bool: Checks the password against a hash or a Fernet token.
+        needs_rehash(password_hash: str) -> bool: Checks whether the stored password should be hashed again.
+        calibrate(time_budget: float) -> int: Chooses n for the latency budget of one hash.
+    """
+
+    def __init__(self, n: int, r: int, p: int, executor: BlockingExecutor):
+        self.n = n
+        self.r = r
+        self.p = p
+        self.executor = executor
+
+    async def hash(self, password: str) -> str:
+        """
+        Hash the password with the current parameters.
+
+        Options:
+            password (str): Plain password text.
+
+        Returns:
+            str: Hash in the format "scrypt$n$r$p$salt$hash".
+        """
+        n, r, p = self.n, self.r, self.p
+        salt = secrets.token_bytes(SALT_SIZE)
+        password_hash = await self.executor.run(scrypt, password.encode(), salt, n, r, p)
+        return "$".join((
+            HASH_PREFIX,
+            str(n),
+            str(r),
+            str(p),
+            base64.b64encode(salt).decode(),
+            base64.b64encode(password_hash).decode()
+        ))
+
+    async def verify(self, password: str, password_hash: str) -> bool:
+        """
+        Check the password against a stored hash or a legacy Fernet token.
+
+        Options:
+            password (str): Plain password text.
+            password_hash (str): Stored hash or Fernet token.
+
+        Returns:
+            bool: True if the password matches, False otherwise.
+        """
+        if not password_hash.startswith(f"{HASH_PREFIX}$"):
+            decrypted_password = await decrypt_legacy_password(password_hash)
+            return decrypted_password is not None and hmac.compare_digest(
+                password.encode(),
+                decrypted_password.encode()
+            )
+        _, n, r, p, salt, expected_hash = password_hash.split("$")
+        computed_hash = await self.executor.run(
+            scrypt,
+            password.encode(),
+            base64.b64decode(salt),
+            int(n),
+            int(r),
+            int(p)
+        )
+        return hmac.compare_digest(computed_hash, base64.b64decode(expected_hash))
+
+    def needs_rehash(self, password_hash: str) -> bool:
+        """
+        Check whether the stored password should be hashed again after a successful login.
+
+        Options:
+            password_hash (str): Stored hash or Fernet token.
+
+        Returns:
+            bool: True for Fernet tokens and for hashes with a lower cost or other block parameters.
+        """
+        if not password_hash.startswith(f"{HASH_PREFIX}$"):
+            return True
+        _, n, r, p, _, _ = password_hash.split("$")
+        return int(n) < self.n or (int(r), int(p)) != (self.r, self.p)
+
+    async def calibrate(self, time_budget: float) -> int:
+        """
+        Choose n for the latency budget of one hash and use it for new hashes.
+
+        n is doubled from MIN_SCRYPT_N while the next doubling is expected to fit the budget,
+        measuring the hash time in the worker processes.
+
+        Options:
+            time_budget (float): Target time of one hash in seconds.
+
+        Returns:
+            int: The chosen n.
+        """
+        n = MIN_SCRYPT_N
+        while n < MAX_SCRYPT_N:
+            started_at = time.perf_counter()
+            await self.executor.run(scrypt, b"calibration", b"calibration-salt", n, self.r, self.p)
+            elapsed = time.perf_counter() - started_at
+            if elapsed * 2 > time_budget:
+                break
+            n *= 2
+        self.n = n
+        logger.info("Password hashing calibrated: n=%s r=%s p=%s for %s s", n, self.r, self.p, time_budget)
+        return n
+
+
+_password_hasher: PasswordHasher = PasswordHasher(
+    n=config.PASSWORD_SCRYPT_N or MIN_SCRYPT_N,
+    r=config.PASSWORD_SCRYPT_R,
+    p=config.PASSWORD_SCRYPT_P,
+    executor=BlockingExecutor(
+        max_workers=config.PASSWORD_HASH_WORKERS,
+        max_queue_size=config.PASSWORD_HASH_QUEUE_SIZE,
+        timeout=config.PASSWORD_HASH_TIMEOUT,
+        processes=True
+    )
+)
+
+
+def get_password_hasher() -> PasswordHasher:
+    return _password_hasher
 
 
-def descript_password(password: str) -> str:
+async def hash_password(password: str) -> str:
     """
-    Decrypts the provided password using Fernet decryption.
+    Hashes the provided password with scrypt in the password executor.
 
     Options:
-    - password (str): Encrypted password to decrypt.
+    - password (str): Password for hashing.
 
     Returns:
-    - str: Decrypted password.
+    - str: Password hash.
     """
-    decrypted_password = FERNET.decrypt(password.encode()).decode()
-    return decrypted_password
+    return await get_password_hasher().hash(password=password)
 
 
-def verify_password(password: str, encrypted_password: str) -> bool:
+async def verify_password(password: str, password_hash: str) -> bool:
     """
-    Checks whether the provided password matches the decrypted encrypted password.
+    Checks whether the provided password matches the stored password hash or legacy Fernet token.
 
     Options:
     - password (str): Plain password text.
-    - encrypted_password (str): Encrypted password for comparison.
+    - password_hash (str): Stored password hash for comparison.
 
     Returns:
     - bool: True if the passwords are the same, False otherwise.
     """
-    return password == descript_password(encrypted_password)
+    return await get_password_hasher().verify(password=password, password_hash=password_hash)
 
 
 def text_set_password_message(is_error: bool = False) -> str:
@@ -73,7 +264,7 @@ def text_set_password_message(is_error: bool = False) -> str:
     - str: Instructional text message.
     """
     text_message = (
-        f"{('Вы ввели пароль, не соответствующий критериям!!!\n' if is_error else '')}" 
+        f"{('Вы ввели пароль, не соответствующий критериям!!!\n' if is_error else '')}"
         "Введите ваш новый пароль.\n\n"
         "Он должен соответствовать следующим критериям:\n\n"
         "1) Более 8 символов\n"
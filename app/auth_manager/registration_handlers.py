@@ -1,9 +1,8 @@
 from pyrogram import filters, Client, types
 from app.auth_manager import auth_controller
-from app.auth_manager.password import validation_password, encrypt_password, \
+from app.auth_manager.password import validation_password, hash_password, \
     verify_password, text_set_password_message
 from app.bot_init.bot_init import client_bot
-from app.db.models import Users
 from app.fsm_context.fsm_context import get_fsm_context
 from app.root.controller import send_message_start
 from app.root.filters import get_filters
@@ -29,7 +28,7 @@ async def registration_user(_: Client, message: types.Message) -> None:
         message=message
     )
     await telegram_utils.send_messages()
-    get_fsm_context().update_state(
+    await get_fsm_context().update_state(
         telegram_id=message.from_user.id,
         state="registration:username"
     )
@@ -61,8 +60,8 @@ async def set_username(_: Client, message: types.Message) -> None:
         message=message
     )
     await telegram_utils.send_messages()
-    get_fsm_context().update_data(telegram_id=message.from_user.id, data=data)
-    get_fsm_context().update_state(
+    await get_fsm_context().update_data(telegram_id=message.from_user.id, data=data)
+    await get_fsm_context().update_state(
         telegram_id=message.from_user.id,
         state="registration:nickname"
     )
@@ -76,10 +75,8 @@ async def set_username(_: Client, message: types.Message) -> None:
     """Handler for setting the user login during the registration process."""
     login_name = message.from_user.username if message.text == "Продолжить" \
         else message.text.strip()
-    user: Users | None = auth_controller.get_user(
-        owner_telegram_id=message.from_user.id
-    )
-    if user:
+    is_login_name_taken = await auth_controller.is_login_name_taken(login_name=login_name)
+    if is_login_name_taken:
         text_message = (
             "Данный логин уже присутствует в боте. "
             "Введите ваш логин"
@@ -97,7 +94,7 @@ async def set_username(_: Client, message: types.Message) -> None:
         text_message = text_set_password_message()
         keyboard = [[types.KeyboardButton(text="В главное меню")]]
         reply_markup = types.ReplyKeyboardMarkup(keyboard=keyboard)
-        get_fsm_context().update_data(
+        await get_fsm_context().update_data(
             telegram_id=message.from_user.id,
             data=data
         )
@@ -107,10 +104,11 @@ async def set_username(_: Client, message: types.Message) -> None:
         message=message
     )
     await telegram_utils.send_messages()
-    get_fsm_context().update_state(
-        telegram_id=message.from_user.id,
-        state="registration:set_password"
-    )
+    if not is_login_name_taken:
+        await get_fsm_context().update_state(
+            telegram_id=message.from_user.id,
+            state="registration:set_password"
+        )
 
 
 @client_bot.on_message(
@@ -125,15 +123,15 @@ async def set_password(_: Client, message: types.Message) -> None:
         text_message = text_set_password_message(is_error=True)
     else:
         data = get_fsm_context().get_data(telegram_id=message.from_user.id)
-        data["password"] = encrypt_password(password=message.text.strip())
+        data["password"] = await hash_password(password=message.text.strip())
         text_message = (
             "Подтвердите ваш новый пароль, введя его еще раз"
         )
-        get_fsm_context().update_state(
+        await get_fsm_context().update_state(
             telegram_id=message.from_user.id,
             state="registration:confirm_set_password"
         )
-        get_fsm_context().update_data(
+        await get_fsm_context().update_data(
             telegram_id=message.from_user.id,
             data=data
         )
@@ -153,9 +151,9 @@ async def confirm_set_password(client: Client, message: types.Message) -> None:
     """Handler for confirming the user's password during the registration process."""
     data = get_fsm_context().get_data(telegram_id=message.from_user.id)
     is_save_user: bool = False
-    if not verify_password(
+    if not await verify_password(
         password=message.text.strip(),
-        encrypted_password=data.get("password")
+        password_hash=data.get("password")
     ):
         text_message = (
             "Пароли не совпадают!!!\n"
@@ -163,12 +161,12 @@ async def confirm_set_password(client: Client, message: types.Message) -> None:
         )
         keyboard = [[types.KeyboardButton(text="В главное меню")]]
         reply_markup = types.ReplyKeyboardMarkup(keyboard=keyboard)
-        get_fsm_context().update_state(
+        await get_fsm_context().update_state(
             telegram_id=message.from_user.id,
             state="registration:set_password"
         )
     else:
-        auth_controller.set_user(
+        await auth_controller.set_user(
             owner_telegram_id=message.from_user.id,
             password=data.get('password'),
             login_name=data.get("login_name"),
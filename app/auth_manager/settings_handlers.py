@@ -1,7 +1,7 @@
 from pyrogram import filters, types, Client
 from app.auth_manager import auth_controller
 from app.auth_manager.password import text_set_password_message, \
-    validation_password, encrypt_password, verify_password
+    validation_password, hash_password, verify_password
 from app.bot_init.bot_init import client_bot
 from app.fsm_context.fsm_context import get_fsm_context
 from app.root.controller import send_message_start
@@ -61,7 +61,7 @@ async def settings_menu(
             inline_keyboard=inline_keyboard
         )
         state = "settings"
-    get_fsm_context().update_state(
+    await get_fsm_context().update_state(
         telegram_id=message.from_user.id,
         state=state
     )
@@ -86,7 +86,7 @@ async def update_username(_: Client, message: types.CallbackQuery) -> None:
         "Введите ваше новое имя"
     )
     reply_markup = get_back_buttons(owner_telegram_id=owner_telegram_id)
-    get_fsm_context().update_state(
+    await get_fsm_context().update_state(
         telegram_id=message.from_user.id,
         state="settings:set_username"
     )
@@ -104,7 +104,7 @@ async def update_username(_: Client, message: types.CallbackQuery) -> None:
 )
 async def set_username(_: Client, message: types.Message) -> None:
     """Handler for setting a new username."""
-    auth_controller.update_username(
+    await auth_controller.update_username(
         owner_telegram_id=message.from_user.id,
         username=message.text
     )
@@ -127,7 +127,7 @@ async def update_login(_: Client, message: types.CallbackQuery) -> None:
         "Введите ваш новый логин"
     )
     reply_markup = get_back_buttons(owner_telegram_id=owner_telegram_id)
-    get_fsm_context().update_state(
+    await get_fsm_context().update_state(
         telegram_id=message.from_user.id,
         state="settings:set_login_name"
     )
@@ -147,14 +147,14 @@ async def set_login(_: Client, message: types.Message) -> None:
     """Handler for setting a new user login."""
     is_update_login: bool = False
     reply_markup = None
-    if auth_controller.get_user(login_name=message.text):
+    if await auth_controller.is_login_name_taken(login_name=message.text):
         text_message = (
             "Данный логин уже существует!!!\n"
             "Введите ваш новый логин"
         )
         reply_markup = get_back_buttons(owner_telegram_id=message.from_user.id)
     else:
-        auth_controller.update_login_name(
+        await auth_controller.update_login_name(
             owner_telegram_id=message.from_user.id,
             login_name=message.text
         )
@@ -181,7 +181,7 @@ async def update_password(_: Client, message: types.CallbackQuery) -> None:
     owner_telegram_id = int(message.data.split(":")[-1])
     text_message = text_set_password_message()
     reply_markup = get_back_buttons(owner_telegram_id=owner_telegram_id)
-    get_fsm_context().update_state(
+    await get_fsm_context().update_state(
         telegram_id=message.from_user.id,
         state="settings:set_password"
     )
@@ -203,15 +203,15 @@ async def set_password(_: Client, message: types.Message) -> None:
     if not validation_password(password=message.text.strip()):
         text_message = text_set_password_message(is_error=True)
     else:
-        data["password"] = encrypt_password(password=message.text.strip())
+        data["password"] = await hash_password(password=message.text.strip())
         text_message = (
             "Подтвердите ваш новый пароль, введя его еще раз"
         )
-        get_fsm_context().update_data(
+        await get_fsm_context().update_data(
             telegram_id=message.from_user.id,
             data=data
         )
-        get_fsm_context().update_state(
+        await get_fsm_context().update_state(
             telegram_id=message.from_user.id,
             state="settings:confirm_set_password"
         )
@@ -235,21 +235,21 @@ async def confirm_set_password(_: Client, message: types.Message) -> None:
     data = get_fsm_context().get_data(telegram_id=message.from_user.id)
     owner_telegram_id = data.get('owner_telegram_id')
     is_update_password: bool = False
-    if not verify_password(
+    if not await verify_password(
         password=message.text.strip(),
-        encrypted_password=data.get("password")
+        password_hash=data.get("password")
     ):
         text_message = (
             "Пароли не совпадают!!!\n"
             f"{text_set_password_message()}"
         )
         reply_markup = get_back_buttons(owner_telegram_id=owner_telegram_id)
-        get_fsm_context().update_state(
+        await get_fsm_context().update_state(
             telegram_id=owner_telegram_id,
             state="registration:set_password"
         )
     else:
-        auth_controller.update_password(
+        await auth_controller.update_password(
             owner_telegram_id=owner_telegram_id,
             password=data.get('password')
         )
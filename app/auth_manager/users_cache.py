@@ -0,0 +1,120 @@
+"""
+Read-through cache of users.
+
+This module contains the user directory placed in front of auth_controller.get_user. Users are
+cached by owner_telegram_id with a time-to-live and a size bound, and a secondary index maps
+login names to owner IDs, so lookups by either key are served from the same entry. Lookups by
+owner ID also cache a missing user, which keeps the start menu of unregistered users off the
+database. Every write function of auth_controller invalidates the user's entries.
+
+Options:
+    _users_cache (UsersCache): A single instance of the user cache used by the application.
+"""
+
+from typing import Any
+
+from app import config
+from app.cache import LRUCache
+from app.db.models import Users
+
+MISSING = object()
+
+
+class UsersCache:
+    """
+    Cache of users indexed by owner ID and login name.
+
+    Options:
+        max_size (int): Maximum number of cached users.
+        ttl (float): Entry lifetime in seconds.
+
+    Methods:
+        get(owner_telegram_id: int = None, login_name: str = None) -> Users | None | object: Gets a cached user,
+            None for a cached missing user or MISSING if nothing is cached.
+        set(user: Users | None, owner_telegram_id: int = None, generation: int = None) -> None: Stores
+            a user or a missing user in the cache.
+        invalidate(owner_telegram_id: int = None, login_name: str = None) -> None: Removes the user's entries.
+        get_stats() -> dict: Gets the hit-rate counters of the cache.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        self.__users = LRUCache(max_size=max_size, ttl=ttl, on_evict=self.__forget_owner)
+        self.__owners_by_login: dict[str, int] = dict()
+        self.__logins_by_owner: dict[int, str] = dict()
+        self.generation = 0
+
+    def __forget_owner(self, owner_telegram_id: int) -> None:
+        """Remove the login name of the removed entry from the index."""
+        login_name = self.__logins_by_owner.pop(owner_telegram_id, None)
+        if login_name is not None and self.__owners_by_login.get(login_name) == owner_telegram_id:
+            del self.__owners_by_login[login_name]
+
+    def get(self, owner_telegram_id: int = None, login_name: str = None) -> Any:
+        """
+        Get a cached user by owner ID or login name.
+
+        Options:
+            owner_telegram_id (int, optional): Account owner ID.
+            login_name (str, optional): Unique user login.
+
+        Returns:
+            Users | None | object: The cached user, None if the user is cached as missing,
+            or MISSING if nothing is cached.
+        """
+        if owner_telegram_id is not None:
+            return self.__users.get(owner_telegram_id, MISSING)
+        owner_telegram_id = self.__owners_by_login.get(login_name)
+        if owner_telegram_id is None:
+            return MISSING
+        user = self.__users.get(owner_telegram_id)
+        return user if user is not None and user.login_name == login_name else MISSING
+
+    def set(self, user: Users | None, owner_telegram_id: int = None, generation: int = None) -> None:
+        """
+        Store a user, or a missing user looked up by owner ID, in the cache.
+
+        Options:
+            user (Users | None): The user, or None if the user was not found.
+            owner_telegram_id (int, optional): Account owner ID of the lookup, required for a missing user.
+            generation (int, optional): Cache generation read before the lookup. The user is not stored
+                if the cache was invalidated since then, the lookup may have read an old row.
+        """
+        if generation is not None and generation != self.generation:
+            return
+        if user is None:
+            if owner_telegram_id is not None:
+                self.__users.set(owner_telegram_id, None)
+            return
+        self.__forget_owner(user.owner_telegram_id)
+        self.__users.set(user.owner_telegram_id, user)
+        self.__logins_by_owner[user.owner_telegram_id] = user.login_name
+        self.__owners_by_login[user.login_name] = user.owner_telegram_id
+
+    def invalidate(self, owner_telegram_id: int = None, login_name: str = None) -> None:
+        """Remove the cached entries of the user by owner ID and by login name."""
+        self.generation += 1
+        if login_name is not None:
+            indexed_owner_telegram_id = self.__owners_by_login.get(login_name)
+            if indexed_owner_telegram_id is not None:
+                self.__users.delete(indexed_owner_telegram_id)
+        if owner_telegram_id is not None:
+            self.__users.delete(owner_telegram_id)
+
+    def get_stats(self) -> dict:
+        """
+        Get the cache counters.
+
+        Returns:
+            dict: Size, hit and eviction counters of the user cache.
+        """
+        return self.__users.get_stats()
+
+
+_users_cache: UsersCache = UsersCache(
+    max_size=config.USERS_CACHE_SIZE,
+    ttl=config.USERS_CACHE_TTL
+)
+
+
+def get_users_cache() -> UsersCache:
+    return _users_cache
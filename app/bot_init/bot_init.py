@@ -2,21 +2,167 @@
 Setting up and initializing the bot client.
 
 This module contains code to configure and initialize a bot client that uses the Pyrogram library.
+Every handler registered on the client runs inside a middleware: the handled update is available
+through the current_update context variable, the statements it executes are accounted to the update
+and the handler by the query accountant, the session router tracks the tables written by the update
+so its later reads stay on the primary database, and a handler failing because the database or the blocking
+executor is overloaded or unavailable answers the user with a "busy, retry" reply instead of an unanswered update.
+The latency and errors of every handler and of every Telegram API call are counted in the metrics,
+and sampled updates are traced from their filter evaluation to the end of the handler.
 
 Options:
     api_id (int): API identifier provided by Telegram.
     api_hash (str): Secret hash provided by Telegram.
     bot_token (str): Telegram bot token.
-    client_bot (Client): Pyrogram bot client object.
+    client_bot (BotClient): Pyrogram bot client object.
+    current_update (ContextVar): Update handled by the current handler.
 """
 
-from pyrogram import Client
+import functools
+import logging
+import time
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable
+
+from pyrogram import Client, raw, types
+from pyrogram.errors import RPCError
+from pyrogram.handlers.handler import Handler
+
 from app import config
+from app.db.pool_monitor import is_database_busy_error
+from app.db.query_accounting import get_query_accountant
+from app.db.router import get_session_router
+from app.metrics import get_metrics_registry
+from app.offload import OffloadError
+from app.tracing import get_tracer, SPAN_KIND_CLIENT
+
+logger = logging.getLogger(__name__)
+
+TEXT_DATABASE_BUSY = "Сервис сейчас перегружен. Повторите попытку через несколько секунд"
+
+HANDLER_DURATION = get_metrics_registry().histogram(
+    name="bot_handler_duration_seconds",
+    documentation="Duration of the handlers.",
+    label_names=("handler",)
+)
+HANDLER_ERRORS = get_metrics_registry().counter(
+    name="bot_handler_errors_total",
+    documentation="Errors raised by the handlers.",
+    label_names=("handler", "error")
+)
+TELEGRAM_API_DURATION = get_metrics_registry().histogram(
+    name="telegram_api_duration_seconds",
+    documentation="Duration of the Telegram API calls.",
+    label_names=("method",)
+)
+TELEGRAM_API_ERRORS = get_metrics_registry().counter(
+    name="telegram_api_errors_total",
+    documentation="Errors returned by the Telegram API calls.",
+    label_names=("method", "error")
+)
+
+current_update: ContextVar[types.Message | types.CallbackQuery | None] = ContextVar("current_update", default=None)
+
+
+class BotClient(Client):
+    """
+    Pyrogram client running every handler inside the middleware.
+
+    Methods:
+        add_handler(handler: Handler, group: int = 0) -> tuple: Registers the handler wrapped in the middleware.
+        invoke(query: raw.core.TLObject, *args, **kwargs) -> Any: Invokes a Telegram API method, records
+            its latency and traces it.
+        answer_busy(update: types.Message | types.CallbackQuery) -> None: Answers the update with the busy reply.
+    """
+
+    def add_handler(self, handler: Handler, group: int = 0) -> tuple:
+        handler.check = self.__wrap_check(handler.check, handler_name=handler.callback.__qualname__)
+        handler.callback = self.__wrap(handler.callback)
+        return super().add_handler(handler, group)
+
+    @staticmethod
+    def __wrap_check(check: Callable[..., Awaitable[bool]], handler_name: str) -> Callable[..., Awaitable[bool]]:
+        """Wrap the filter check of a handler to record its evaluation in the trace of the update."""
+        @functools.wraps(check)
+        async def traced_check(client: Client, update: Any) -> bool:
+            if not get_tracer().sample_rate:
+                return await check(client, update)
+            started_at = time.time_ns()
+            is_matched = await check(client, update)
+            get_tracer().record_filter(
+                update=update,
+                handler=handler_name,
+                start_time=started_at,
+                end_time=time.time_ns(),
+                is_matched=bool(is_matched)
+            )
+            return is_matched
+
+        return traced_check
+
+    def __wrap(self, callback: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+        """Wrap a handler callback in the middleware."""
+        @functools.wraps(callback)
+        async def middleware(client: Client, update: Any, *args: Any) -> Any:
+            token = current_update.set(update)
+            writes_token = get_session_router().start_update()
+            queries_token = get_query_accountant().start_update(handler=callback.__qualname__, update=update)
+            trace_token = get_tracer().start_trace(update=update, handler=callback.__qualname__)
+            started_at = time.perf_counter()
+            try:
+                with get_tracer().span(name=f"handler {callback.__qualname__}"):
+                    return await callback(client, update, *args)
+            except Exception as error:
+                HANDLER_ERRORS.inc(callback.__qualname__, type(error).__name__)
+                if not is_database_busy_error(error) and not isinstance(error, OffloadError):
+                    raise
+                logger.warning("Service is busy, %s answered with a retry reply: %r", callback.__qualname__, error)
+                await self.answer_busy(update=update)
+            finally:
+                HANDLER_DURATION.observe(time.perf_counter() - started_at, callback.__qualname__)
+                get_tracer().finish_trace(trace_token)
+                get_query_accountant().finish_update(queries_token)
+                get_session_router().finish_update(writes_token)
+                current_update.reset(token)
+
+        return middleware
+
+    async def invoke(self, query: raw.core.TLObject, *args: Any, **kwargs: Any) -> Any:
+        method = type(query).__name__
+        started_at = time.perf_counter()
+        try:
+            with get_tracer().span(
+                name=f"telegram {method}",
+                kind=SPAN_KIND_CLIENT,
+                attributes={"rpc.system": "telegram", "rpc.method": method}
+            ):
+                return await super().invoke(query, *args, **kwargs)
+        except Exception as error:
+            TELEGRAM_API_ERRORS.inc(method, type(error).__name__)
+            raise
+        finally:
+            TELEGRAM_API_DURATION.observe(time.perf_counter() - started_at, method)
+
+    async def answer_busy(self, update: types.Message | types.CallbackQuery) -> None:
+        """
+        Answer the update with the busy reply, without touching the database.
+
+        Options:
+            update (types.Message | types.CallbackQuery): Handled update.
+        """
+        try:
+            if isinstance(update, types.CallbackQuery):
+                await update.answer(text=TEXT_DATABASE_BUSY, show_alert=True)
+            elif isinstance(update, types.Message):
+                await self.send_message(chat_id=update.chat.id, text=TEXT_DATABASE_BUSY)
+        except RPCError as error:
+            logger.warning("Busy reply was not sent: %s", error)
+
 
 api_id = config.API_ID
 api_hash = config.API_HASH
 bot_token = config.TELEGRAM_BOT_TOKEN
-client_bot = Client(
+client_bot = BotClient(
     name=f"{config.CLIENT_SESSION_PATH}/pyrogram_bot",
     api_id=api_id,
     api_hash=api_hash,
@@ -0,0 +1,139 @@
+"""
+Bounded in-process caches.
+
+This module contains a least recently used cache with an optional time-to-live,
+which the controllers put in front of the database to avoid repeated round trips.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+
+class LRUCache:
+    """
+    A thread-safe least recently used cache with an optional time-to-live.
+
+    Options:
+        max_size (int): Maximum number of entries kept in the cache.
+        ttl (float | None): Entry lifetime in seconds, or None if entries never expire.
+        on_evict (Callable[[Hashable], None] | None): Callback called with the key of every entry
+            removed from the cache (evicted, expired or deleted).
+        clock (Callable[[], float]): Clock used for expiry (time.monotonic by default).
+
+    Methods:
+        get(key: Hashable, default: Any = None) -> Any: Get a cached value and count a hit or a miss.
+        set(key: Hashable, value: Any) -> None: Store a value, evicting the least recently used entry when full.
+        delete(key: Hashable) -> None: Remove an entry if it is present.
+        clear() -> None: Remove all entries.
+        get_stats() -> dict: Get the size, hit and eviction counters of the cache.
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+        ttl: float | None = None,
+        on_evict: Callable[[Hashable], None] | None = None,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.__on_evict = on_evict
+        self.__clock = clock
+        self.__entries: OrderedDict[Hashable, tuple[Any, float | None]] = OrderedDict()
+        self.__lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self.__lock:
+            entry = self.__entries.get(key)
+            return entry is not None and not self.__is_expired(entry)
+
+    def __is_expired(self, entry: tuple[Any, float | None]) -> bool:
+        expires_at = entry[1]
+        return expires_at is not None and expires_at <= self.__clock()
+
+    def __remove(self, key: Hashable) -> None:
+        del self.__entries[key]
+        if self.__on_evict:
+            self.__on_evict(key)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Get a cached value.
+
+        Options:
+            key (Hashable): Cache key.
+            default (Any): Value returned when the key is missing or expired.
+
+        Returns:
+            Any: The cached value or default.
+        """
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            if self.__is_expired(entry):
+                self.expirations += 1
+                self.misses += 1
+                self.__remove(key)
+                return default
+            self.__entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """
+        Store a value in the cache.
+
+        Options:
+            key (Hashable): Cache key.
+            value (Any): Value to store.
+        """
+        expires_at = self.__clock() + self.ttl if self.ttl is not None else None
+        with self.__lock:
+            if key in self.__entries:
+                self.__entries.move_to_end(key)
+            self.__entries[key] = (value, expires_at)
+            while len(self.__entries) > self.max_size:
+                oldest_key = next(iter(self.__entries))
+                self.evictions += 1
+                self.__remove(oldest_key)
+
+    def delete(self, key: Hashable) -> None:
+        """Remove an entry from the cache if it is present."""
+        with self.__lock:
+            if key in self.__entries:
+                self.__remove(key)
+
+    def clear(self) -> None:
+        """Remove all entries from the cache."""
+        with self.__lock:
+            for key in list(self.__entries):
+                self.__remove(key)
+
+    def get_stats(self) -> dict:
+        """
+        Get the cache counters.
+
+        Returns:
+            dict: Size, capacity, hits, misses, hit rate, evictions and expirations.
+        """
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self.__entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations
+        }
@@ -15,3 +15,119 @@ API_HASH = getenv('API_HASH')
 API_ID = int(getenv('API_ID'))
 
 CLIENT_SESSION_PATH = getenv('CLIENT_SESSION_PATH', './app/bot_init')
+
+TASKS_CACHE_MAX_TASKS = int(getenv('TASKS_CACHE_MAX_TASKS', 10000))
+
+TASKS_CACHE_MAX_LISTS = int(getenv('TASKS_CACHE_MAX_LISTS', 1000))
+
+TASKS_CACHE_MAX_GENERATIONS = int(getenv('TASKS_CACHE_MAX_GENERATIONS', 10000))
+
+OFFLOAD_TIMEOUT = float(getenv('OFFLOAD_TIMEOUT', 10))
+
+OFFLOAD_MAX_QUEUE_SIZE = int(getenv('OFFLOAD_MAX_QUEUE_SIZE', 100))
+
+DATABASE_PREPARED_STATEMENT_CACHE_SIZE = int(getenv('DATABASE_PREPARED_STATEMENT_CACHE_SIZE', 500))
+
+IMPORT_BATCH_SIZE = int(getenv('IMPORT_BATCH_SIZE', 5000))
+
+IMPORT_MAX_ROWS = int(getenv('IMPORT_MAX_ROWS', 100000))
+
+IMPORT_MAX_FILE_SIZE = int(getenv('IMPORT_MAX_FILE_SIZE', 20 * 1024 * 1024))
+
+EXPORT_CHUNK_SIZE = int(getenv('EXPORT_CHUNK_SIZE', 1000))
+
+EXPORT_SPOOL_MAX_SIZE = int(getenv('EXPORT_SPOOL_MAX_SIZE', 1024 * 1024))
+
+SEARCH_PAGE_SIZE = int(getenv('SEARCH_PAGE_SIZE', 10))
+
+SEARCH_CACHE_SIZE = int(getenv('SEARCH_CACHE_SIZE', 1000))
+
+SEARCH_CACHE_TTL = float(getenv('SEARCH_CACHE_TTL', 300))
+
+REMINDER_LEAD_TIME = int(getenv('REMINDER_LEAD_TIME', 3600))
+
+REMINDER_WINDOW = int(getenv('REMINDER_WINDOW', 3600))
+
+REMINDER_BATCH_SIZE = int(getenv('REMINDER_BATCH_SIZE', 10000))
+
+REMINDER_MAX_LATENESS = int(getenv('REMINDER_MAX_LATENESS', 86400))
+
+REMINDER_SEND_RATE = float(getenv('REMINDER_SEND_RATE', 25))
+
+REMINDER_QUEUE_SIZE = int(getenv('REMINDER_QUEUE_SIZE', 10000))
+
+STATUS_SWEEPER_BATCH_SIZE = int(getenv('STATUS_SWEEPER_BATCH_SIZE', 1000))
+
+STATUS_SWEEPER_MAX_INTERVAL = float(getenv('STATUS_SWEEPER_MAX_INTERVAL', 300))
+
+RECURRENCE_OVERDUE_WINDOW = int(getenv('RECURRENCE_OVERDUE_WINDOW', 7 * 24 * 3600))
+
+TASK_CARDS_CACHE_SIZE = int(getenv('TASK_CARDS_CACHE_SIZE', 10000))
+
+TASK_CARDS_BUCKET_SIZE = float(getenv('TASK_CARDS_BUCKET_SIZE', 60))
+
+ANALYTICS_CACHE_SIZE = int(getenv('ANALYTICS_CACHE_SIZE', 1000))
+
+USERS_CACHE_SIZE = int(getenv('USERS_CACHE_SIZE', 10000))
+
+USERS_CACHE_TTL = float(getenv('USERS_CACHE_TTL', 300))
+
+PASSWORD_HASH_WORKERS = int(getenv('PASSWORD_HASH_WORKERS', 2))
+
+PASSWORD_HASH_QUEUE_SIZE = int(getenv('PASSWORD_HASH_QUEUE_SIZE', 100))
+
+PASSWORD_HASH_TIMEOUT = float(getenv('PASSWORD_HASH_TIMEOUT', 10))
+
+PASSWORD_HASH_TIME_BUDGET = float(getenv('PASSWORD_HASH_TIME_BUDGET', 0.1))
+
+PASSWORD_SCRYPT_N = int(getenv('PASSWORD_SCRYPT_N', 0))
+
+PASSWORD_SCRYPT_R = int(getenv('PASSWORD_SCRYPT_R', 8))
+
+PASSWORD_SCRYPT_P = int(getenv('PASSWORD_SCRYPT_P', 1))
+
+LOGIN_NAMES_FILTER_CAPACITY = int(getenv('LOGIN_NAMES_FILTER_CAPACITY', 100000))
+
+LOGIN_NAMES_FILTER_ERROR_RATE = float(getenv('LOGIN_NAMES_FILTER_ERROR_RATE', 0.01))
+
+LOGIN_NAMES_FILTER_BATCH_SIZE = int(getenv('LOGIN_NAMES_FILTER_BATCH_SIZE', 10000))
+
+ACCOUNT_PURGE_BATCH_SIZE = int(getenv('ACCOUNT_PURGE_BATCH_SIZE', 5000))
+
+SESSION_CLEANUP_QUEUE_SIZE = int(getenv('SESSION_CLEANUP_QUEUE_SIZE', 10000))
+
+AUTH_THROTTLE_MAX_ATTEMPTS = int(getenv('AUTH_THROTTLE_MAX_ATTEMPTS', 5))
+
+AUTH_THROTTLE_WINDOW = float(getenv('AUTH_THROTTLE_WINDOW', 300))
+
+AUTH_THROTTLE_LOCKOUT = float(getenv('AUTH_THROTTLE_LOCKOUT', 60))
+
+AUTH_THROTTLE_MAX_LOCKOUT = float(getenv('AUTH_THROTTLE_MAX_LOCKOUT', 3600))
+
+AUTH_THROTTLE_MAX_KEYS = int(getenv('AUTH_THROTTLE_MAX_KEYS', 100000))
+
+DATABASE_POOL_TIMEOUT = float(getenv('DATABASE_POOL_TIMEOUT', 5))
+
+DATABASE_STATEMENT_TIMEOUT = float(getenv('DATABASE_STATEMENT_TIMEOUT', 15))
+
+DATABASE_REPLICA_CONNECTION_STRINGS = [x for x in getenv('DATABASE_REPLICA_CONNECTION_STRINGS', '').split(',') if x]
+
+DATABASE_REPLICA_HEALTH_INTERVAL = float(getenv('DATABASE_REPLICA_HEALTH_INTERVAL', 10))
+
+DATABASE_REPLICA_STICKY_TIME = float(getenv('DATABASE_REPLICA_STICKY_TIME', 5))
+
+DATABASE_QUERY_BUDGET = int(getenv('DATABASE_QUERY_BUDGET', 15))
+
+DATABASE_QUERY_REPEAT_LIMIT = int(getenv('DATABASE_QUERY_REPEAT_LIMIT', 3))
+
+METRICS_HOST = getenv('METRICS_HOST', '127.0.0.1')
+
+METRICS_PORT = int(getenv('METRICS_PORT', 9108))
+
+METRICS_TIMEOUT = float(getenv('METRICS_TIMEOUT', 5))
+
+TRACING_SAMPLE_RATE = float(getenv('TRACING_SAMPLE_RATE', 0))
+
+TRACING_FILE = getenv('TRACING_FILE', './traces.jsonl')
+
+TRACING_QUEUE_SIZE = int(getenv('TRACING_QUEUE_SIZE', 1000))
@@ -1 +1 @@
-from . import db_config, create_models
+from . import db_config
@@ -0,0 +1,43 @@
+"""
+Compatibility shim for the migration to the asynchronous database layer.
+
+The controllers and the FSM are coroutines now. Synchronous code that has not been migrated yet
+(scripts, a console, old helpers) can call them through run_sync until it is rewritten.
+nest_asyncio is applied at startup, so run_sync also works while the bot's event loop is running.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, TypeVar
+
+T = TypeVar("T")
+
+
+def run_sync(coroutine: Awaitable[T]) -> T:
+    """
+    Run a controller coroutine from synchronous code and return its result.
+
+    Options:
+    - coroutine (Awaitable[T]): Coroutine to run, for example auth_controller.get_user(owner_telegram_id=1).
+
+    Returns:
+    - T: Result of the coroutine.
+    """
+    return asyncio.get_event_loop().run_until_complete(coroutine)
+
+
+def to_sync(function: Callable[..., Awaitable[T]]) -> Callable[..., T]:
+    """
+    Wrap an async controller function into a synchronous function with the same arguments.
+
+    Options:
+    - function (Callable[..., Awaitable[T]]): Async controller function.
+
+    Returns:
+    - Callable[..., T]: Synchronous wrapper of the function.
+    """
+    def wrapper(*args: Any, **kwargs: Any) -> T:
+        return run_sync(function(*args, **kwargs))
+
+    wrapper.__name__ = function.__name__
+    wrapper.__doc__ = function.__doc__
+    return wrapper
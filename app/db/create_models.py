@@ -3,72 +3,348 @@ Creating tables in the database.
 
 This script checks for the existence of tables in the database and, if they do not exist, creates them.
 It also initializes the `uuid_generate_v4()` function in PostgreSQL to use unique identifiers.
+The schema is set up by an explicit command run before the bot starts, never on import:
+    python -m app.db.create_models
+
+At startup the bot only compares the schema version recorded in the service_state table with
+SCHEMA_VERSION (check_schema_version), one primary key lookup instead of reflecting the database.
 
 Options:
-    - engine: SQLAlchemy engine used to interact with the database.
+    - SCHEMA_VERSION: Version of the schema created by this script, increased with every change of the schema.
 
 Actions:
-    - The script uses SQL queries to create the users, fsm_context and user_tasks tables.
+    - The script uses SQL queries to create the users, fsm_context, user_tasks, task_occurrence_exceptions and service_state tables.
     - When creating the user_tasks table, foreign keys and a cascade delete are specified, linking it with the users table.
+    - The recurrence columns of user_tasks and the task_occurrence_exceptions table are added if they are missing.
+    - The row_version column of user_tasks and the trigger increasing it on updates are added if they are missing.
+    - The task_status column with its trigger and the indexes of the status sweeper are added if they are missing.
+    - The next_occurrence_end column of user_tasks with its trigger and index is added if it is missing.
+    - The search_vector column and the full-text and trigram indexes of user_tasks are added if they are missing.
+    - The schema version is recorded in the service_state table.
     - If the table in the database has already been created, this action in this file is skipped
 """
 
-from sqlalchemy import text
-from sqlalchemy.ext.automap import automap_base
+import logging
 
-from app.db.db_config import engine
+from sqlalchemy import Engine, inspect, text
+from sqlalchemy.exc import DBAPIError
 
-Base = automap_base()
-Base.prepare(engine, reflect=True)
+from app.db.db_config import AsyncSession, engine
+from app.db.statements import get_statement_registry
 
-# Get the table names
-table_names: list[str] = [x for x in Base.metadata.tables.keys()]
+logger = logging.getLogger(__name__)
 
-with engine.connect() as con:
-    con.execute(
-        text(
-            'CREATE EXTENSION IF NOT EXISTS "uuid-ossp";'
-        )
+SCHEMA_VERSION = 3
+
+GET_SCHEMA_VERSION = get_statement_registry().register(
+    name="service_state.get_schema_version",
+    sql="SELECT value FROM service_state WHERE name = 'schema_version'"
+)
+
+
+class SchemaVersionError(Exception):
+    """The database schema is missing or has another version than the application."""
+
+
+def create_models(engine: Engine = engine) -> None:
+    """
+    Create the missing tables, columns, types, triggers and indexes and record the schema version.
+
+    Options:
+        engine (Engine): Synchronous engine of the database.
+    """
+    inspector = inspect(engine)
+    table_names: list[str] = inspector.get_table_names()
+    is_task_status_missing: bool = (
+        "user_tasks" not in table_names
+        or "task_status" not in {x["name"] for x in inspector.get_columns("user_tasks")}
     )
-    if "users" not in table_names:
+
+    with engine.connect() as con:
+        con.execute(
+            text(
+                'CREATE EXTENSION IF NOT EXISTS "uuid-ossp";'
+            )
+        )
+        if "users" not in table_names:
+            con.execute(
+                text(
+                    'CREATE TABLE users (\
+                    user_uuid UUID DEFAULT uuid_generate_v4() NOT NULL PRIMARY KEY, \
+                    owner_telegram_id BIGINT UNIQUE NOT NULL, \
+                    login_name VARCHAR UNIQUE NOT NULL, \
+                    username VARCHAR NOT NULL, \
+                    password VARCHAR NOT NULL, \
+                    is_login bool NOT NULL DEFAULT false, \
+                    registration_date TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP);'
+                )
+            )
+
+        if "fsm_context" not in table_names:
+            con.execute(
+                text(
+                    'CREATE TABLE fsm_context (\
+                    telegram_id BIGINT NOT NULL PRIMARY KEY, \
+                    state VARCHAR DEFAULT NULL, \
+                    data JSON DEFAULT \'{}\');'
+                )
+            )
+
+        if "user_tasks" not in table_names:
+            con.execute(
+                text(
+                    'CREATE TABLE user_tasks (\
+                    task_uuid UUID DEFAULT uuid_generate_v4() NOT NULL PRIMARY KEY, \
+                    id_task serial UNIQUE NOT NULL, \
+                    owner_telegram_id bigint NOT NULL, \
+                    task_name VARCHAR NOT NULL, \
+                    description VARCHAR NOT NULL, \
+                    start_time TIMESTAMPTZ NOT NULL, \
+                    end_time TIMESTAMPTZ NOT NULL, \
+                    completion_time TIMESTAMPTZ DEFAULT NULL, \
+                    status BOOLEAN NOT NULL DEFAULT FALSE, \
+                    FOREIGN KEY (owner_telegram_id) REFERENCES users (owner_telegram_id) ON DELETE CASCADE);'
+                )
+            )
+
+        # Recurrence rule of a task, the row keeps the first occurrence of the series
+        con.execute(
+            text(
+                'ALTER TABLE user_tasks \
+                ADD COLUMN IF NOT EXISTS recurrence_unit VARCHAR DEFAULT NULL \
+                CHECK (recurrence_unit IN (\'day\', \'week\', \'month\')), \
+                ADD COLUMN IF NOT EXISTS recurrence_interval INTEGER NOT NULL DEFAULT 1 \
+                CHECK (recurrence_interval > 0);'
+            )
+        )
+
+        # Version of the task row, cached task cards are keyed by it
+        con.execute(
+            text(
+                'ALTER TABLE user_tasks ADD COLUMN IF NOT EXISTS row_version INTEGER NOT NULL DEFAULT 0;'
+            )
+        )
         con.execute(
             text(
-                'CREATE TABLE users (\
-                user_uuid UUID DEFAULT uuid_generate_v4() NOT NULL PRIMARY KEY, \
-                owner_telegram_id BIGINT UNIQUE NOT NULL, \
-                login_name VARCHAR UNIQUE NOT NULL, \
-                username VARCHAR NOT NULL, \
-                password VARCHAR NOT NULL, \
-                is_login bool NOT NULL DEFAULT false, \
-                registration_date TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP);'
+                'CREATE OR REPLACE FUNCTION user_tasks_increase_row_version() RETURNS trigger AS $$ \
+                BEGIN \
+                    NEW.row_version := OLD.row_version + 1; \
+                    RETURN NEW; \
+                END; $$ LANGUAGE plpgsql;'
+            )
+        )
+        con.execute(
+            text(
+                'CREATE OR REPLACE TRIGGER user_tasks_increase_row_version BEFORE UPDATE ON user_tasks \
+                FOR EACH ROW EXECUTE FUNCTION user_tasks_increase_row_version();'
             )
         )
 
-    if "fsm_context" not in table_names:
+        # Stored task state, kept up to date by a trigger on writes and by the status sweeper as time passes
+        if is_task_status_missing:
+            con.execute(
+                text(
+                    'CREATE TYPE task_status AS ENUM (\
+                    \'pending\', \'active\', \'overdue\', \'done\', \'recurring\');'
+                )
+            )
+            con.execute(
+                text(
+                    'ALTER TABLE user_tasks ADD COLUMN task_status task_status NOT NULL DEFAULT \'pending\';'
+                )
+            )
+        else:
+            con.execute(
+                text(
+                    'ALTER TYPE task_status ADD VALUE IF NOT EXISTS \'recurring\';'
+                )
+            )
+            # A new enum value cannot be used in the transaction that added it, the index below uses it
+            con.commit()
+        # Open series stay recurring, the state of their occurrences is computed when they are expanded
+        con.execute(
+            text(
+                'CREATE OR REPLACE FUNCTION user_tasks_set_task_status() RETURNS trigger AS $$ \
+                BEGIN \
+                    NEW.task_status := CASE \
+                        WHEN NEW.status THEN \'done\' \
+                        WHEN NEW.recurrence_unit IS NOT NULL THEN \'recurring\' \
+                        WHEN NEW.end_time <= current_timestamp THEN \'overdue\' \
+                        WHEN NEW.start_time <= current_timestamp THEN \'active\' \
+                        ELSE \'pending\' END; \
+                    RETURN NEW; \
+                END; $$ LANGUAGE plpgsql;'
+            )
+        )
+        con.execute(
+            text(
+                'CREATE OR REPLACE TRIGGER user_tasks_set_task_status BEFORE INSERT OR UPDATE ON user_tasks \
+                FOR EACH ROW EXECUTE FUNCTION user_tasks_set_task_status();'
+            )
+        )
+        if is_task_status_missing:
+            con.execute(
+                text(
+                    'UPDATE user_tasks SET status = status;'
+                )
+            )
+        con.execute(
+            text(
+                'CREATE INDEX IF NOT EXISTS ix_user_tasks_owner_task_status ON user_tasks \
+                (owner_telegram_id, task_status);'
+            )
+        )
+        con.execute(
+            text(
+                'CREATE INDEX IF NOT EXISTS ix_user_tasks_pending_start_time ON user_tasks \
+                (start_time) WHERE task_status = \'pending\';'
+            )
+        )
         con.execute(
             text(
-                'CREATE TABLE fsm_context (\
-                telegram_id BIGINT NOT NULL PRIMARY KEY, \
-                state VARCHAR DEFAULT NULL, \
-                data JSON DEFAULT \'{}\');'
+                'CREATE INDEX IF NOT EXISTS ix_user_tasks_active_end_time ON user_tasks \
+                (end_time) WHERE task_status = \'active\';'
             )
         )
 
-    if "user_tasks" not in table_names:
+        # Completed occurrences of recurring tasks, the other occurrences are never stored
+        if "task_occurrence_exceptions" not in table_names:
+            con.execute(
+                text(
+                    'CREATE TABLE task_occurrence_exceptions (\
+                    id_task INTEGER NOT NULL, \
+                    occurrence_start TIMESTAMPTZ NOT NULL, \
+                    completion_time TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP, \
+                    PRIMARY KEY (id_task, occurrence_start), \
+                    FOREIGN KEY (id_task) REFERENCES user_tasks (id_task) ON DELETE CASCADE);'
+                )
+            )
+
+        if "service_state" not in table_names:
+            con.execute(
+                text(
+                    'CREATE TABLE service_state (\
+                    name VARCHAR NOT NULL PRIMARY KEY, \
+                    value VARCHAR NOT NULL);'
+                )
+            )
+
+        # Pending deadlines in the order the reminder scheduler reads them
         con.execute(
             text(
-                'CREATE TABLE user_tasks (\
-                task_uuid UUID DEFAULT uuid_generate_v4() NOT NULL PRIMARY KEY, \
-                id_task serial UNIQUE NOT NULL, \
-                owner_telegram_id bigint NOT NULL, \
-                task_name VARCHAR NOT NULL, \
-                description VARCHAR NOT NULL, \
-                start_time TIMESTAMPTZ NOT NULL, \
-                end_time TIMESTAMPTZ NOT NULL, \
-                completion_time TIMESTAMPTZ DEFAULT NULL, \
-                status BOOLEAN NOT NULL DEFAULT FALSE, \
-                FOREIGN KEY (owner_telegram_id) REFERENCES users (owner_telegram_id) ON DELETE CASCADE);'
+                'CREATE INDEX IF NOT EXISTS ix_user_tasks_end_time_pending ON user_tasks \
+                (end_time, id_task) WHERE status = false;'
             )
         )
+        # Open recurring series in id_task order, paged by the reminder scheduler when it catches up
+        con.execute(
+            text(
+                'CREATE INDEX IF NOT EXISTS ix_user_tasks_recurring ON user_tasks \
+                (id_task) WHERE task_status = \'recurring\';'
+            )
+        )
+        # End time of the next occurrence of a series not yet passed by the reminder scheduler, it is only
+        # advanced by the scheduler, so an edit of the times or the rule resets it to the first occurrence
+        con.execute(
+            text(
+                'ALTER TABLE user_tasks ADD COLUMN IF NOT EXISTS next_occurrence_end TIMESTAMPTZ DEFAULT NULL;'
+            )
+        )
+        con.execute(
+            text(
+                'CREATE OR REPLACE FUNCTION user_tasks_reset_next_occurrence() RETURNS trigger AS $$ \
+                BEGIN \
+                    IF TG_OP = \'INSERT\' THEN \
+                        NEW.next_occurrence_end := NEW.end_time; \
+                    ELSIF (NEW.start_time, NEW.end_time, NEW.recurrence_unit, NEW.recurrence_interval) \
+                        IS DISTINCT FROM \
+                        (OLD.start_time, OLD.end_time, OLD.recurrence_unit, OLD.recurrence_interval) THEN \
+                        NEW.next_occurrence_end := NEW.end_time; \
+                    END IF; \
+                    RETURN NEW; \
+                END; $$ LANGUAGE plpgsql;'
+            )
+        )
+        con.execute(
+            text(
+                'CREATE OR REPLACE TRIGGER user_tasks_reset_next_occurrence BEFORE INSERT OR UPDATE ON user_tasks \
+                FOR EACH ROW EXECUTE FUNCTION user_tasks_reset_next_occurrence();'
+            )
+        )
+        con.execute(
+            text(
+                'UPDATE user_tasks SET next_occurrence_end = end_time WHERE next_occurrence_end IS NULL;'
+            )
+        )
+        con.execute(
+            text(
+                'CREATE INDEX IF NOT EXISTS ix_user_tasks_recurring_next_occurrence ON user_tasks \
+                (next_occurrence_end, id_task) WHERE task_status = \'recurring\';'
+            )
+        )
+
+        # Full-text and fuzzy search over task names and descriptions
+        con.execute(
+            text(
+                'CREATE EXTENSION IF NOT EXISTS pg_trgm;'
+            )
+        )
+        con.execute(
+            text(
+                'ALTER TABLE user_tasks ADD COLUMN IF NOT EXISTS search_vector tsvector \
+                GENERATED ALWAYS AS ( \
+                setweight(to_tsvector(\'russian\', coalesce(task_name, \'\')), \'A\') || \
+                setweight(to_tsvector(\'russian\', coalesce(description, \'\')), \'B\')) STORED;'
+            )
+        )
+        con.execute(
+            text(
+                'CREATE INDEX IF NOT EXISTS ix_user_tasks_owner_telegram_id ON user_tasks (owner_telegram_id);'
+            )
+        )
+        con.execute(
+            text(
+                'CREATE INDEX IF NOT EXISTS ix_user_tasks_search_vector ON user_tasks USING GIN (search_vector);'
+            )
+        )
+        con.execute(
+            text(
+                'CREATE INDEX IF NOT EXISTS ix_user_tasks_task_name_trgm ON user_tasks \
+                USING GIN (task_name gin_trgm_ops);'
+            )
+        )
+
+        con.execute(
+            text(
+                'INSERT INTO service_state (name, value) VALUES (\'schema_version\', :version) \
+                ON CONFLICT (name) DO UPDATE SET value = EXCLUDED.value;'
+            ),
+            {"version": str(SCHEMA_VERSION)}
+        )
+
+        con.commit()
+
+
+async def check_schema_version() -> None:
+    """
+    Check that the database schema was created by this version of the application.
+
+    Raises:
+        SchemaVersionError: The schema was not created or has another version.
+    """
+    async with AsyncSession() as session:
+        try:
+            version = (await GET_SCHEMA_VERSION.execute(session)).scalar()
+        except DBAPIError:
+            version = None
+    if version != str(SCHEMA_VERSION):
+        raise SchemaVersionError(
+            f"Database schema version is {version}, expected {SCHEMA_VERSION}: "
+            "run python -m app.db.create_models"
+        )
+
 
-    con.commit()
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    create_models()
+    logger.info("Database schema version %s is set up", SCHEMA_VERSION)
@@ -1,6 +1,10 @@
-from sqlalchemy import create_engine, JSON, ARRAY, Integer, MetaData
+from sqlalchemy import create_engine, make_url, JSON, ARRAY, Integer, MetaData
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncEngine
 from sqlalchemy.orm import sessionmaker, DeclarativeBase
 from app import config
+from app.db.query_accounting import get_query_accountant
+from app.tracing import get_tracer
+from app.db.pool_monitor import get_pool_monitor, MonitoredAsyncQueuePool
 
 
 class Base(DeclarativeBase):
@@ -18,5 +22,49 @@ class Base(DeclarativeBase):
     })
 
 
-engine = create_engine(config.DATABASE_CONNECTION_STRING, pool_size=10, max_overflow=30)
+POOL_SIZE = 10
+MAX_OVERFLOW = 30
+
+# Synchronous engine, kept for schema setup and code that has not been migrated yet
+engine = create_engine(config.DATABASE_CONNECTION_STRING, pool_size=POOL_SIZE, max_overflow=MAX_OVERFLOW)
 Session = sessionmaker(bind=engine)
+
+
+def create_async_database_engine(connection_string: str, **kwargs) -> AsyncEngine:
+    """
+    Create an asyncpg engine with the pool and timeout settings of the application,
+    its statements are accounted per update by the query accountant and traced by the tracer.
+
+    Checkouts fail fast after DATABASE_POOL_TIMEOUT, every statement is cancelled by the server after
+    DATABASE_STATEMENT_TIMEOUT, and connections are pinged on checkout, so a database brownout turns
+    into errors instead of hung handlers.
+
+    Options:
+        connection_string (str): Database connection string.
+        **kwargs: Additional arguments of create_async_engine.
+
+    Returns:
+        AsyncEngine: Asynchronous engine.
+    """
+    async_database_engine = create_async_engine(
+        make_url(connection_string).set(drivername="postgresql+asyncpg").update_query_dict(
+            {"prepared_statement_cache_size": str(config.DATABASE_PREPARED_STATEMENT_CACHE_SIZE)}
+        ),
+        pool_size=POOL_SIZE,
+        max_overflow=MAX_OVERFLOW,
+        pool_timeout=config.DATABASE_POOL_TIMEOUT,
+        pool_pre_ping=True,
+        connect_args={
+            "server_settings": {"statement_timeout": str(int(config.DATABASE_STATEMENT_TIMEOUT * 1000))}
+        },
+        **kwargs
+    )
+    get_query_accountant().attach(async_database_engine.sync_engine)
+    get_tracer().attach(async_database_engine.sync_engine)
+    return async_database_engine
+
+
+# Asynchronous engine of the primary database used by the controllers and the FSM
+async_engine = create_async_database_engine(config.DATABASE_CONNECTION_STRING, poolclass=MonitoredAsyncQueuePool)
+get_pool_monitor().attach(async_engine.sync_engine)
+AsyncSession = async_sessionmaker(bind=async_engine, expire_on_commit=False)
@@ -26,6 +26,10 @@ Data-classes:
             - end_time: datetime - task end time.
             - completion_time: datetime | None - task completion time (can be None if the task is not completed).
             - status: bool - task execution status (True if completed, False otherwise).
+            - task_status: str - stored task state: pending, active, overdue, done or recurring.
+            - recurrence_unit: str | None - unit of the recurrence rule: day, week or month (None for a single task).
+            - recurrence_interval: int - interval of the recurrence rule in units.
+            - row_version: int - version of the row, increased on every update.
 
 Note:
     - These classes use generic annotations that provide information about the types of variables.
@@ -62,3 +66,7 @@ class UserTasks:
     end_time: datetime
     completion_time: datetime | None
     status: bool
+    task_status: str
+    recurrence_unit: str | None
+    recurrence_interval: int
+    row_version: int
@@ -0,0 +1,193 @@
+"""
+Monitoring of the database connection pool.
+
+This module contains the monitor of the asynchronous engine's pool. Connections opened, closed and
+invalidated and checkouts and checkins are counted from SQLAlchemy pool events, and the age of every
+open connection is tracked from its connect event. SQLAlchemy has no event for the start of a checkout,
+so the time a caller waits for a connection is measured by MonitoredAsyncQueuePool, the pool class of
+the engine, and observed in the db_pool_checkout_wait_seconds histogram of the metrics.
+
+The pool is fail-fast: a checkout waits at most DATABASE_POOL_TIMEOUT seconds and every statement at
+most DATABASE_STATEMENT_TIMEOUT seconds. is_database_busy_error recognizes the errors raised then, and
+the bot client answers the update with a "busy, retry" reply instead of letting handlers pile up.
+
+Options:
+    _pool_monitor (PoolMonitor): A single instance of the monitor used by the application.
+"""
+
+import logging
+import threading
+import time
+from typing import Callable
+
+from sqlalchemy import event, Engine
+from sqlalchemy.exc import DBAPIError, TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, PoolProxiedConnection
+
+from app.metrics import get_metrics_registry
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds of the checkout wait histogram buckets in seconds, the +Inf bucket is added when exported
+WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+# query_canceled (statement timeout), admin_shutdown, cannot_connect_now, too_many_connections
+BUSY_SQLSTATES = frozenset(("57014", "57P01", "57P03", "53300"))
+
+CHECKOUT_WAIT = get_metrics_registry().histogram(
+    name="db_pool_checkout_wait_seconds",
+    documentation="Time callers waited for a connection of the primary database pool.",
+    buckets=WAIT_BUCKETS
+)
+
+
+class PoolMonitor:
+    """
+    Counters of the connection pool collected from pool events.
+
+    Options:
+        clock (Callable[[], float]): Clock used for waits and connection ages (time.monotonic by default).
+
+    Methods:
+        attach(engine: Engine) -> None: Listens to the pool events of the engine.
+        record_checkout(wait: float, is_timeout: bool) -> None: Records the wait of a checkout.
+        get_stats() -> dict: Gets the pool counters.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self.__clock = clock
+        self.__lock = threading.Lock()
+        self.__engine: Engine | None = None
+        self.__connected_at: dict[int, float] = dict()
+        self.waits = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.checkouts = 0
+        self.checkins = 0
+        self.timeouts = 0
+        self.connects = 0
+        self.closes = 0
+        self.invalidations = 0
+
+    def attach(self, engine: Engine) -> None:
+        """
+        Listen to the pool events of the engine.
+
+        Options:
+            engine (Engine): Engine, the sync_engine of an asynchronous engine.
+        """
+        self.__engine = engine
+        event.listen(engine, "connect", self.__on_connect)
+        event.listen(engine, "checkout", self.__on_checkout)
+        event.listen(engine, "checkin", self.__on_checkin)
+        event.listen(engine, "invalidate", self.__on_invalidate)
+        event.listen(engine, "close", self.__on_close)
+        event.listen(engine, "close_detached", self.__on_close)
+
+    def __on_connect(self, dbapi_connection, _) -> None:
+        with self.__lock:
+            self.connects += 1
+            self.__connected_at[id(dbapi_connection)] = self.__clock()
+
+    def __on_checkout(self, *_) -> None:
+        with self.__lock:
+            self.checkouts += 1
+
+    def __on_checkin(self, *_) -> None:
+        with self.__lock:
+            self.checkins += 1
+
+    def __on_invalidate(self, *_) -> None:
+        with self.__lock:
+            self.invalidations += 1
+
+    def __on_close(self, dbapi_connection, *_) -> None:
+        with self.__lock:
+            self.closes += 1
+            self.__connected_at.pop(id(dbapi_connection), None)
+
+    def record_checkout(self, wait: float, is_timeout: bool) -> None:
+        """
+        Record the wait of a checkout.
+
+        Options:
+            wait (float): Time in seconds the caller waited for a connection.
+            is_timeout (bool): Whether the checkout timed out.
+        """
+        with self.__lock:
+            CHECKOUT_WAIT.observe(wait)
+            self.waits += 1
+            self.wait_total += wait
+            self.wait_max = max(self.wait_max, wait)
+            if is_timeout:
+                self.timeouts += 1
+        if is_timeout:
+            logger.warning("Database pool checkout timed out after %.2f s", wait)
+
+    def get_stats(self) -> dict:
+        """
+        Get the pool counters.
+
+        Returns:
+            dict: Pool size, checked out connections, overflow, event counters, the average and maximum
+            checkout wait and the age in seconds of the open connections.
+        """
+        pool = self.__engine.pool if self.__engine is not None else None
+        now = self.__clock()
+        with self.__lock:
+            ages = [now - x for x in self.__connected_at.values()]
+            return {
+                "size": pool.size() if pool is not None else 0,
+                "checked_out": pool.checkedout() if pool is not None else 0,
+                # QueuePool counts the overflow from -pool_size, only connections beyond the pool size are reported
+                "overflow": max(pool.overflow(), 0) if pool is not None else 0,
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "timeouts": self.timeouts,
+                "connects": self.connects,
+                "closes": self.closes,
+                "invalidations": self.invalidations,
+                "wait_avg": self.wait_total / self.waits if self.waits else 0.0,
+                "wait_max": self.wait_max,
+                "connections": len(ages),
+                "connection_age_avg": sum(ages) / len(ages) if ages else 0.0,
+                "connection_age_max": max(ages, default=0.0)
+            }
+
+
+_pool_monitor: PoolMonitor = PoolMonitor()
+
+
+def get_pool_monitor() -> PoolMonitor:
+    return _pool_monitor
+
+
+class MonitoredAsyncQueuePool(AsyncAdaptedQueuePool):
+    """Asynchronous queue pool recording the wait of every checkout in the pool monitor."""
+
+    def connect(self) -> PoolProxiedConnection:
+        started_at = time.monotonic()
+        is_timeout = False
+        try:
+            return super().connect()
+        except PoolTimeoutError:
+            is_timeout = True
+            raise
+        finally:
+            get_pool_monitor().record_checkout(wait=time.monotonic() - started_at, is_timeout=is_timeout)
+
+
+def is_database_busy_error(error: BaseException) -> bool:
+    """
+    Check whether the error means that the database is overloaded or unavailable.
+
+    Options:
+        error (BaseException): Error raised by a handler.
+
+    Returns:
+        bool: True for pool checkout timeouts, statement timeouts and lost or refused connections.
+    """
+    if isinstance(error, (PoolTimeoutError, ConnectionError)):
+        return True
+    if isinstance(error, DBAPIError):
+        return error.connection_invalidated or getattr(error.orig, "sqlstate", None) in BUSY_SQLSTATES
+    return False
@@ -0,0 +1,227 @@
+"""
+Accounting of the SQL statements executed by every update.
+
+The cursor events of the database engines time every statement sent to the server, including the
+statements of the FSM, of TelegramUtils and of the controllers. The bot client opens the accounting of
+an update before its handler runs, so every statement executed by the handler is attributed to the
+update and to the handler function. When the handler returns, a summary of the update is logged, and
+a warning is logged when the update executed more statements than DATABASE_QUERY_BUDGET, executed one
+statement more than DATABASE_QUERY_REPEAT_LIMIT times (an N+1 pattern: a query per item of a list)
+or executed an identical statement with identical parameters twice.
+
+Statements are named by the statement registry name when they come from a registered statement,
+otherwise by their SQL text. Statements of background workers are not attributed to any update.
+
+Options:
+    _query_accountant (QueryAccountant): A single instance of the accountant used by the application.
+"""
+
+import logging
+import time
+from collections import Counter
+from contextvars import ContextVar, Token
+from dataclasses import dataclass, field
+from typing import Any
+
+from sqlalchemy import event, Engine
+
+from app import config
+
+logger = logging.getLogger(__name__)
+
+# Length of the SQL text naming an unregistered statement in the logs
+SQL_NAME_LENGTH = 80
+
+
+@dataclass
+class UpdateQueries:
+    """
+    Statements executed by one update.
+
+    Options:
+        handler (str): Qualified name of the handler function.
+        update (str): Short description of the update.
+        count (int): Number of executed statements.
+        total_time (float): Total execution time of the statements in seconds.
+        counts (Counter): Number of executions by statement name.
+        times (Counter): Execution time in seconds by statement name.
+        identical (Counter): Number of executions by statement name and parameters.
+    """
+    handler: str
+    update: str
+    count: int = 0
+    total_time: float = 0.0
+    counts: Counter = field(default_factory=Counter)
+    times: Counter = field(default_factory=Counter)
+    identical: Counter = field(default_factory=Counter)
+
+
+# Statements of the update being handled, None outside of updates
+_update_queries: ContextVar[UpdateQueries | None] = ContextVar("update_queries", default=None)
+
+
+def describe_update(update: Any) -> str:
+    """
+    Get a short description of an update for the logs.
+
+    Options:
+        update (Any): Pyrogram update, a Message or a CallbackQuery.
+
+    Returns:
+        str: Type of the update with the chat and message or the callback data.
+    """
+    chat = getattr(update, "chat", None)
+    if chat is not None:
+        return f"{type(update).__name__} {chat.id}:{update.id}"
+    data = getattr(update, "data", None)
+    if data is not None:
+        return f"{type(update).__name__} {update.from_user.id}:{data!r}"
+    return type(update).__name__
+
+
+class QueryAccountant:
+    """
+    Per-update accounting of the statements executed by the database engines.
+
+    Options:
+        query_budget (int): Statements allowed per update before a warning.
+        repeat_limit (int): Executions of one statement allowed per update before a warning.
+
+    Methods:
+        attach(engine: Engine) -> None: Listens to the cursor events of the engine.
+        start_update(handler: str, update: Any) -> Token: Starts the accounting of an update.
+        finish_update(token: Token) -> UpdateQueries: Finishes the accounting of the update and logs it.
+        get_stats() -> dict: Gets the statement counters by handler.
+    """
+
+    def __init__(self, query_budget: int, repeat_limit: int):
+        self.query_budget = query_budget
+        self.repeat_limit = repeat_limit
+        self.__handlers: dict[str, dict] = dict()
+        self.updates = 0
+        self.over_budget = 0
+        self.repeated = 0
+        self.duplicated = 0
+
+    def attach(self, engine: Engine) -> None:
+        """
+        Listen to the cursor events of the engine.
+
+        Options:
+            engine (Engine): Engine, the sync_engine of an asynchronous engine.
+        """
+        event.listen(engine, "before_cursor_execute", self.__before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", self.__after_cursor_execute)
+
+    @staticmethod
+    def __before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+        if _update_queries.get() is not None:
+            context.query_started_at = time.perf_counter()
+
+    @staticmethod
+    def __after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+        update_queries = _update_queries.get()
+        started_at = getattr(context, "query_started_at", None)
+        if update_queries is None or started_at is None:
+            return
+        elapsed = time.perf_counter() - started_at
+        name = context.execution_options.get("statement_name") or " ".join(statement.split())[:SQL_NAME_LENGTH]
+        update_queries.count += 1
+        update_queries.total_time += elapsed
+        update_queries.counts[name] += 1
+        update_queries.times[name] += elapsed
+        update_queries.identical[(name, repr(parameters))] += 1
+
+    @staticmethod
+    def start_update(handler: str, update: Any) -> Token:
+        """
+        Start the accounting of an update, called by the bot client before a handler runs.
+
+        Options:
+            handler (str): Qualified name of the handler function.
+            update (Any): Handled update.
+
+        Returns:
+            Token: Token passed to finish_update.
+        """
+        return _update_queries.set(UpdateQueries(handler=handler, update=describe_update(update)))
+
+    def finish_update(self, token: Token) -> UpdateQueries:
+        """
+        Finish the accounting of the update, log its summary and warn about a budget overrun and repeats.
+
+        Options:
+            token (Token): Token returned by start_update.
+
+        Returns:
+            UpdateQueries: Statements executed by the update.
+        """
+        update_queries = _update_queries.get()
+        _update_queries.reset(token)
+        handler_stats = self.__handlers.setdefault(
+            update_queries.handler,
+            {"updates": 0, "statements": 0, "total_time": 0.0, "max_statements": 0, "over_budget": 0}
+        )
+        handler_stats["updates"] += 1
+        handler_stats["statements"] += update_queries.count
+        handler_stats["total_time"] += update_queries.total_time
+        handler_stats["max_statements"] = max(handler_stats["max_statements"], update_queries.count)
+        self.updates += 1
+        if update_queries.times:
+            slowest, slowest_time = update_queries.times.most_common(1)[0]
+            logger.info(
+                "%s handled %s: %d statements in %.1f ms, slowest %s %.1f ms",
+                update_queries.handler, update_queries.update, update_queries.count,
+                update_queries.total_time * 1000, slowest, slowest_time * 1000
+            )
+        else:
+            logger.info("%s handled %s: no statements", update_queries.handler, update_queries.update)
+        if update_queries.count > self.query_budget:
+            handler_stats["over_budget"] += 1
+            self.over_budget += 1
+            logger.warning(
+                "%s exceeded the query budget of %d with %d statements: %s",
+                update_queries.handler, self.query_budget, update_queries.count,
+                dict(update_queries.counts.most_common())
+            )
+        repeated = {x: y for x, y in update_queries.counts.items() if y > self.repeat_limit}
+        if repeated:
+            self.repeated += 1
+            logger.warning("%s repeated statements, possible N+1 queries: %s", update_queries.handler, repeated)
+        duplicated = {x[0]: y for x, y in update_queries.identical.items() if y > 1}
+        if duplicated:
+            self.duplicated += 1
+            logger.warning("%s executed identical statements: %s", update_queries.handler, duplicated)
+        return update_queries
+
+    def get_stats(self) -> dict:
+        """
+        Get the statement counters.
+
+        Returns:
+            dict: Numbers of accounted updates, updates over the budget, with repeated and with identical
+            statements, and the updates, statements, time and maximum statements per update by handler.
+        """
+        return {
+            "updates": self.updates,
+            "over_budget": self.over_budget,
+            "repeated": self.repeated,
+            "duplicated": self.duplicated,
+            "handlers": {
+                name: {
+                    **stats,
+                    "avg_statements": stats["statements"] / stats["updates"]
+                }
+                for name, stats in self.__handlers.items()
+            }
+        }
+
+
+_query_accountant: QueryAccountant = QueryAccountant(
+    query_budget=config.DATABASE_QUERY_BUDGET,
+    repeat_limit=config.DATABASE_QUERY_REPEAT_LIMIT
+)
+
+
+def get_query_accountant() -> QueryAccountant:
+    return _query_accountant
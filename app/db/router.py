@@ -0,0 +1,278 @@
+"""
+Routing of read-only controller queries to database replicas.
+
+Writes always go to the primary database. Read-only controller operations open their session with
+read_session, passing the statements they run, and the router picks a healthy replica round-robin.
+The tables of every statement are known from its SQL text (see Statement), and every executed
+write records the tables it touched:
+- in the update being handled, so a read of a table the update has already written stays on the
+  primary and the user sees their own writes;
+- globally for DATABASE_REPLICA_STICKY_TIME seconds, so a replica lagging behind a write made by
+  another update does not put an outdated row into the users or tasks cache.
+Replicas are checked in the background every DATABASE_REPLICA_HEALTH_INTERVAL seconds, a replica
+failing the check gets no reads until it passes again. Without configured or healthy replicas
+every read goes to the primary.
+
+Options:
+    _session_router (SessionRouter): A single instance of the router used by the application.
+"""
+
+import asyncio
+import logging
+import time
+from contextvars import ContextVar, Token
+from dataclasses import dataclass
+from typing import Callable, Iterable, Protocol
+
+from sqlalchemy import make_url, text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from app import config
+from app.db.db_config import AsyncSession as PrimarySession, create_async_database_engine
+
+logger = logging.getLogger(__name__)
+
+CHECK_REPLICA = text("SELECT pg_is_in_recovery()")
+# Tables changed by the ON DELETE CASCADE foreign keys of a written table, see create_models
+CASCADED_TABLES = {
+    "users": ("user_tasks",),
+    "user_tasks": ("task_occurrence_exceptions",)
+}
+
+# Tables written in the update being handled, None outside of updates
+_update_writes: ContextVar[set[str] | None] = ContextVar("update_writes", default=None)
+
+
+class RoutedStatement(Protocol):
+    """Statement with the tables it reads, see Statement."""
+    tables: frozenset[str]
+
+
+@dataclass
+class Replica:
+    """
+    Replica database.
+
+    Options:
+        name (str): Connection string of the replica without the password.
+        engine (AsyncEngine): Asynchronous engine of the replica.
+        session_maker (async_sessionmaker): Session factory bound to the engine.
+        is_healthy (bool): Whether the last health check passed.
+        is_in_recovery (bool | None): Whether the replica is a standby server, None before the first check.
+        reads (int): Number of read sessions opened on the replica.
+        failed_checks (int): Number of failed health checks.
+    """
+    name: str
+    engine: AsyncEngine
+    session_maker: async_sessionmaker
+    is_healthy: bool = False
+    is_in_recovery: bool | None = None
+    reads: int = 0
+    failed_checks: int = 0
+
+
+class SessionRouter:
+    """
+    Router of read sessions between the primary database and the replicas.
+
+    Options:
+        primary (async_sessionmaker): Session factory of the primary database.
+        replicas (list[Replica]): Replica databases.
+        health_interval (float): Interval between health checks of the replicas in seconds.
+        sticky_time (float): Time in seconds a written table is read from the primary by every update.
+        clock (Callable[[], float]): Clock used for the sticky time (time.monotonic by default).
+
+    Methods:
+        start_update() -> Token: Starts tracking the writes of an update.
+        finish_update(token: Token) -> None: Stops tracking the writes of the update.
+        record_write(tables: Iterable[str]) -> None: Records tables written by a statement.
+        read_session(*statements: RoutedStatement) -> AsyncSession: Opens a session for read-only statements.
+        check_health() -> None: Checks every replica.
+        run() -> None: Checks the replicas until cancelled.
+        dispose() -> None: Closes the connections of the replicas.
+        get_stats() -> dict: Gets the routing counters.
+    """
+
+    def __init__(
+        self,
+        primary: async_sessionmaker,
+        replicas: list[Replica],
+        health_interval: float,
+        sticky_time: float,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.primary = primary
+        self.replicas = replicas
+        self.health_interval = health_interval
+        self.sticky_time = sticky_time
+        self.__clock = clock
+        self.__written_at: dict[str, float] = dict()
+        self.__next_replica = 0
+        self.primary_reads = 0
+        self.replica_reads = 0
+        self.read_your_writes = 0
+
+    @staticmethod
+    def start_update() -> Token:
+        """
+        Start tracking the writes of an update, called by the bot client before a handler runs.
+
+        Returns:
+            Token: Token restoring the previous tracking in finish_update.
+        """
+        return _update_writes.set(set())
+
+    @staticmethod
+    def finish_update(token: Token) -> None:
+        """
+        Stop tracking the writes of the update.
+
+        Options:
+            token (Token): Token returned by start_update.
+        """
+        _update_writes.reset(token)
+
+    def record_write(self, tables: Iterable[str]) -> None:
+        """
+        Record the tables written by a statement and the tables its deletes cascade to.
+
+        Options:
+            tables (Iterable[str]): Tables of the statement.
+        """
+        now = self.__clock()
+        update_writes = _update_writes.get()
+        tables = list(tables)
+        for table in tables:
+            tables.extend(x for x in CASCADED_TABLES.get(table, ()) if x not in tables)
+            self.__written_at[table] = now
+            if update_writes is not None:
+                update_writes.add(table)
+
+    def __is_written(self, tables: frozenset[str]) -> bool:
+        """Check whether any of the tables was written by the update or recently."""
+        update_writes = _update_writes.get()
+        if update_writes and not update_writes.isdisjoint(tables):
+            return True
+        written_after = self.__clock() - self.sticky_time
+        return any(self.__written_at.get(x, written_after) > written_after for x in tables)
+
+    def read_session(self, *statements: RoutedStatement) -> AsyncSession:
+        """
+        Open a session for read-only statements, on a healthy replica unless their tables were written.
+
+        Options:
+            *statements (RoutedStatement): Statements executed in the session.
+
+        Returns:
+            AsyncSession: Session of a replica or of the primary database.
+        """
+        healthy_replicas = [x for x in self.replicas if x.is_healthy]
+        if not healthy_replicas:
+            self.primary_reads += 1
+            return self.primary()
+        if self.__is_written(frozenset().union(*(x.tables for x in statements))):
+            self.primary_reads += 1
+            self.read_your_writes += 1
+            return self.primary()
+        replica = healthy_replicas[self.__next_replica % len(healthy_replicas)]
+        self.__next_replica += 1
+        replica.reads += 1
+        self.replica_reads += 1
+        return replica.session_maker()
+
+    async def check_health(self) -> None:
+        """Check that every replica accepts connections and answers within the pool timeout."""
+        for replica in self.replicas:
+            try:
+                async with asyncio.timeout(config.DATABASE_POOL_TIMEOUT):
+                    async with replica.engine.connect() as connection:
+                        replica.is_in_recovery = (await connection.execute(CHECK_REPLICA)).scalar()
+            except (SQLAlchemyError, OSError, TimeoutError) as error:
+                replica.failed_checks += 1
+                if replica.is_healthy:
+                    logger.warning("Replica %s failed the health check: %r", replica.name, error)
+                replica.is_healthy = False
+                continue
+            if not replica.is_healthy:
+                logger.info("Replica %s is healthy, in recovery: %s", replica.name, replica.is_in_recovery)
+            replica.is_healthy = True
+
+    async def run(self) -> None:
+        """Check the replicas every health_interval seconds until cancelled."""
+        if not self.replicas:
+            return
+        while True:
+            await self.check_health()
+            await asyncio.sleep(self.health_interval)
+
+    async def dispose(self) -> None:
+        """Close the connections of the replicas."""
+        for replica in self.replicas:
+            await replica.engine.dispose()
+
+    def get_stats(self) -> dict:
+        """
+        Get the routing counters.
+
+        Returns:
+            dict: Numbers of reads routed to the primary and to the replicas, reads kept on the primary
+            after a write, and the health and reads of every replica by name.
+        """
+        return {
+            "primary_reads": self.primary_reads,
+            "replica_reads": self.replica_reads,
+            "read_your_writes": self.read_your_writes,
+            "replicas": {
+                x.name: {
+                    "is_healthy": x.is_healthy,
+                    "is_in_recovery": x.is_in_recovery,
+                    "reads": x.reads,
+                    "failed_checks": x.failed_checks
+                }
+                for x in self.replicas
+            }
+        }
+
+
+def create_replica(connection_string: str) -> Replica:
+    """
+    Create a replica with an engine configured like the engine of the primary database.
+
+    Options:
+        connection_string (str): Connection string of the replica.
+
+    Returns:
+        Replica: Replica, unhealthy until the first health check.
+    """
+    engine = create_async_database_engine(connection_string)
+    return Replica(
+        name=make_url(connection_string).render_as_string(hide_password=True),
+        engine=engine,
+        session_maker=async_sessionmaker(bind=engine, expire_on_commit=False)
+    )
+
+
+_session_router: SessionRouter = SessionRouter(
+    primary=PrimarySession,
+    replicas=[create_replica(connection_string=x) for x in config.DATABASE_REPLICA_CONNECTION_STRINGS],
+    health_interval=config.DATABASE_REPLICA_HEALTH_INTERVAL,
+    sticky_time=config.DATABASE_REPLICA_STICKY_TIME
+)
+
+
+def get_session_router() -> SessionRouter:
+    return _session_router
+
+
+def read_session(*statements: RoutedStatement) -> AsyncSession:
+    """
+    Open a session for read-only statements through the session router.
+
+    Options:
+        *statements (RoutedStatement): Statements executed in the session.
+
+    Returns:
+        AsyncSession: Session of a replica or of the primary database.
+    """
+    return get_session_router().read_session(*statements)
@@ -0,0 +1,169 @@
+"""
+Registry of precompiled SQL statements.
+
+Every controller operation registers its statement once at import time instead of building a new
+text() clause on each call. The SQL text of a registered statement never changes, so asyncpg keeps
+one server-side prepared statement per connection for it (see prepared_statement_cache_size in
+db_config) and PostgreSQL skips parsing and planning on repeated calls.
+The registry also counts executions and timings of every statement, and the name of a statement is
+passed to the cursor events in its execution options, so the query accountant reports statements by
+name. The tables of a statement are
+parsed from its SQL text, and executed writes are recorded in the session router, which keeps reads of
+the written tables on the primary database.
+
+Options:
+    _statement_registry (StatementRegistry): A single instance of the registry used by the application.
+"""
+
+import re
+import time
+
+from sqlalchemy import text, Result, TextClause
+from sqlalchemy.ext.asyncio import AsyncSession, AsyncResult
+
+from app.db.router import get_session_router
+from app.metrics import get_metrics_registry
+
+# Names following FROM, JOIN, INTO and UPDATE, a superset of the tables of a statement
+TABLE_PATTERN = re.compile(r"\b(?:FROM|JOIN|INTO|UPDATE)\s+([a-z_][a-z0-9_]*)", re.IGNORECASE)
+WRITE_PATTERN = re.compile(r"\b(?:INSERT|UPDATE|DELETE)\b", re.IGNORECASE)
+
+STATEMENT_DURATION = get_metrics_registry().histogram(
+    name="db_statement_duration_seconds",
+    documentation="Duration of the registered statements, including the connection checkout.",
+    label_names=("statement",)
+)
+
+
+class Statement:
+    """
+    A precompiled SQL statement with execution statistics.
+
+    Options:
+        name (str): Unique statement name, for example "users.get_by_telegram_id".
+        clause (TextClause): Precompiled SQLAlchemy clause.
+        tables (frozenset[str]): Tables read or written by the statement.
+        is_write (bool): Whether the statement writes, SELECT ... FOR UPDATE included.
+        executions (int): Number of executions.
+        total_time (float): Total execution time in seconds.
+        max_time (float): Longest execution time in seconds.
+
+    Methods:
+        execute(session: AsyncSession, params: dict | None = None) -> Result: Executes the statement.
+        stream(session: AsyncSession, params: dict | None = None) -> AsyncResult: Executes the statement
+            with a server-side cursor.
+    """
+
+    def __init__(self, name: str, sql: str):
+        self.name = name
+        self.clause: TextClause = text(sql).execution_options(statement_name=name)
+        self.tables = frozenset(x.lower() for x in TABLE_PATTERN.findall(sql))
+        self.is_write = WRITE_PATTERN.search(sql) is not None
+        self.executions = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+
+    async def execute(self, session: AsyncSession, params: dict | None = None) -> Result:
+        """
+        Execute the statement in the session.
+
+        Options:
+            session (AsyncSession): Database session.
+            params (dict | None): Statement parameters.
+
+        Returns:
+            Result: Result of the statement.
+        """
+        started_at = time.perf_counter()
+        try:
+            return await session.execute(self.clause, params or {})
+        finally:
+            self.__record(elapsed=time.perf_counter() - started_at)
+
+    async def stream(self, session: AsyncSession, params: dict | None = None) -> AsyncResult:
+        """
+        Execute the statement with a server-side cursor, rows are fetched while the result is read.
+
+        Options:
+            session (AsyncSession): Database session.
+            params (dict | None): Statement parameters.
+
+        Returns:
+            AsyncResult: Streamed result of the statement.
+        """
+        started_at = time.perf_counter()
+        try:
+            return await session.stream(self.clause, params or {})
+        finally:
+            self.__record(elapsed=time.perf_counter() - started_at)
+
+    def __record(self, elapsed: float) -> None:
+        """Record the execution time in the statistics and the metrics, and the tables written."""
+        self.executions += 1
+        self.total_time += elapsed
+        self.max_time = max(self.max_time, elapsed)
+        STATEMENT_DURATION.observe(elapsed, self.name)
+        if self.is_write:
+            get_session_router().record_write(tables=self.tables)
+
+
+class StatementRegistry:
+    """
+    Registry of precompiled statements, one per controller operation.
+
+    Methods:
+        register(name: str, sql: str) -> Statement: Precompiles and registers a statement.
+        get(name: str) -> Statement: Gets a registered statement by name.
+        get_stats() -> dict[str, dict]: Gets execution counts and timings of every statement.
+    """
+
+    def __init__(self):
+        self.__statements: dict[str, Statement] = dict()
+
+    def __len__(self) -> int:
+        return len(self.__statements)
+
+    def register(self, name: str, sql: str) -> Statement:
+        """
+        Precompile and register a statement.
+
+        Options:
+            name (str): Unique statement name.
+            sql (str): SQL text with named parameters.
+
+        Returns:
+            Statement: The registered statement.
+        """
+        if name in self.__statements:
+            raise ValueError(f"Statement {name} is already registered")
+        statement = Statement(name=name, sql=sql)
+        self.__statements[name] = statement
+        return statement
+
+    def get(self, name: str) -> Statement:
+        """Get a registered statement by name."""
+        return self.__statements[name]
+
+    def get_stats(self) -> dict[str, dict]:
+        """
+        Get execution statistics of every statement.
+
+        Returns:
+            dict[str, dict]: Executions, total, average and maximum time in seconds by statement name.
+        """
+        return {
+            name: {
+                "executions": statement.executions,
+                "total_time": statement.total_time,
+                "avg_time": statement.total_time / statement.executions if statement.executions else 0.0,
+                "max_time": statement.max_time
+            }
+            for name, statement in self.__statements.items()
+        }
+
+
+_statement_registry: StatementRegistry = StatementRegistry()
+
+
+def get_statement_registry() -> StatementRegistry:
+    return _statement_registry
@@ -10,10 +10,34 @@
 
 import json
 
-from sqlalchemy import text
-
-from app.db.db_config import Session
+from app.db.db_config import AsyncSession
 from app.db.models import FSMContext
+from app.db.router import read_session
+from app.db.statements import get_statement_registry
+
+GET_ALL_FSM_CONTEXTS = get_statement_registry().register(
+    name="fsm_context.get_all",
+    sql="SELECT * FROM fsm_context"
+)
+GET_FSM_CONTEXT = get_statement_registry().register(
+    name="fsm_context.get",
+    sql="SELECT * FROM fsm_context WHERE telegram_id=:telegram_id"
+)
+INSERT_FSM_CONTEXT = get_statement_registry().register(
+    name="fsm_context.insert",
+    sql="INSERT INTO fsm_context VALUES (:telegram_id, :state, :data)"
+)
+UPDATE_FSM_CONTEXT = get_statement_registry().register(
+    name="fsm_context.update",
+    sql=(
+        "UPDATE fsm_context SET state=:state, data=:data "
+        "WHERE telegram_id=:telegram_id"
+    )
+)
+DELETE_FSM_CONTEXT = get_statement_registry().register(
+    name="fsm_context.delete",
+    sql="DELETE FROM fsm_context WHERE telegram_id=:telegram_id"
+)
 
 
 class FSM:
@@ -26,7 +50,7 @@ class FSM:
 
     Methods:
         get_list_fsm_contexts(): Retrieves a dictionary of FSMContext objects for all users.
-        __update_list_fsm_contexts(): Private method for updating the list of FSMContext objects from the database.
+        update_list_fsm_contexts(): Updates the list of FSMContext objects from the database.
         __get_fsm_context(telegram_id: int) -> FSMContext | None: Private method to get FSMContext
             object for the user.
         __set_fsm_context(telegram_id: int, state: str, data: dict) -> None: Private method for
@@ -40,11 +64,14 @@ class FSM:
         get_data(telegram_id: int) -> dict: Retrieves additional user data in the FSM.
         update_data(telegram_id: int, data: dict) -> dict: Updates additional user data in FSM.
         clear(telegram_id: int) -> None: Clears the FSMContext object for the user.
+        reload(telegram_id: int) -> None: Reloads the user's FSMContext object changed in the database.
+        get_stats() -> dict: Gets the number of cached FSMContext objects and database round trips.
     """
 
     def __init__(self):
         self.__list_fsm_contexts: dict[int, FSMContext] = dict()
-        self.__update_list_fsm_contexts()
+        self.reads = 0
+        self.writes = 0
 
     def get_list_fsm_contexts(self) -> dict[int, FSMContext]:
         """
@@ -55,17 +82,15 @@ class FSM:
         """
         return self.__list_fsm_contexts
 
-    def __update_list_fsm_contexts(self) -> None:
+    async def update_list_fsm_contexts(self) -> None:
         """
         Update the list of FSMContext objects from the database.
         """
-        with Session() as session:
-            query = text("SELECT * FROM fsm_context")
-            fsm_context_list: list[FSMContext] = session.execute(query).all()
+        async with read_session(GET_ALL_FSM_CONTEXTS) as session:
+            fsm_context_list: list[FSMContext] = (await GET_ALL_FSM_CONTEXTS.execute(session)).all()
         self.__list_fsm_contexts: dict[int, FSMContext] = {x.telegram_id: x for x in fsm_context_list}
 
-    @staticmethod
-    def __get_fsm_context(telegram_id: int) -> FSMContext | None:
+    async def __get_fsm_context(self, telegram_id: int) -> FSMContext | None:
         """
         Get the FSMContext object for the user.
 
@@ -75,14 +100,15 @@ class FSM:
         Returns:
             FSMContext | None: The FSMContext object, or None if the object is not found.
         """
-        with Session() as session:
-            query = text("SELECT * FROM fsm_context WHERE telegram_id=:telegram_id")
-            fsm_context: FSMContext | None = session.execute(
-                query, {"telegram_id": telegram_id}
-            ).first()
+        self.reads += 1
+        # Read from the primary database: update_state and update_data write back the row they read
+        async with AsyncSession() as session:
+            fsm_context: FSMContext | None = (await GET_FSM_CONTEXT.execute(
+                session, {"telegram_id": telegram_id}
+            )).first()
         return fsm_context
 
-    def __set_fsm_context(self, telegram_id: int, state: str, data: dict) -> None:
+    async def __set_fsm_context(self, telegram_id: int, state: str, data: dict) -> None:
         """
         Set a new FSMContext object in the database.
 
@@ -91,22 +117,22 @@ class FSM:
             state (str): New user state in FSM.
             data (dict): New additional user data in FSM.
         """
-        with Session() as session:
-            query = text("INSERT INTO fsm_context VALUES (:telegram_id, :state, :data)")
-            session.execute(
-                query,
+        self.writes += 1
+        async with AsyncSession() as session:
+            await INSERT_FSM_CONTEXT.execute(
+                session,
                 {
                     "telegram_id": telegram_id,
                     "state": state,
                     "data": json.dumps(data)
                 }
             )
-            session.commit()
-        self.__list_fsm_contexts[telegram_id] = self.__get_fsm_context(
+            await session.commit()
+        self.__list_fsm_contexts[telegram_id] = await self.__get_fsm_context(
             telegram_id=telegram_id
         )
 
-    def __update_fsm_context(self, telegram_id: int, state: str, data: dict) -> None:
+    async def __update_fsm_context(self, telegram_id: int, state: str, data: dict) -> None:
         """
         Update an existing FSMContext object in the database.
 
@@ -115,30 +141,27 @@ class FSM:
             state (str): New user state in FSM.
             data (dict): New additional user data in FSM.
         """
-        with Session() as session:
-            query = text(
-                "UPDATE fsm_context SET state=:state, data=:data "
-                "WHERE telegram_id=:telegram_id"
-            )
-            session.execute(
-                query,
+        self.writes += 1
+        async with AsyncSession() as session:
+            await UPDATE_FSM_CONTEXT.execute(
+                session,
                 {
                     "telegram_id": telegram_id,
                     "state": state,
                     "data": json.dumps(data)
                 }
             )
-            session.commit()
-        self.__list_fsm_contexts[telegram_id] = self.__get_fsm_context(
+            await session.commit()
+        self.__list_fsm_contexts[telegram_id] = await self.__get_fsm_context(
             telegram_id=telegram_id
         )
 
-    def __delete_fsm_context(self, telegram_id: int) -> None:
+    async def __delete_fsm_context(self, telegram_id: int) -> None:
         """Remove the FSMContext object from the database."""
-        with Session() as session:
-            query = text("DELETE FROM fsm_context WHERE telegram_id=:telegram_id")
-            session.execute(query, {"telegram_id": telegram_id})
-            session.commit()
+        self.writes += 1
+        async with AsyncSession() as session:
+            await DELETE_FSM_CONTEXT.execute(session, {"telegram_id": telegram_id})
+            await session.commit()
         del self.__list_fsm_contexts[telegram_id]
 
     def get_state(self, telegram_id: int) -> str | None:
@@ -154,17 +177,17 @@ class FSM:
         if self.__list_fsm_contexts.get(telegram_id):
             return self.__list_fsm_contexts[telegram_id].state
 
-    def update_state(self, telegram_id: int, state: str) -> None:
+    async def update_state(self, telegram_id: int, state: str) -> None:
         """Update the user's state in FSM."""
-        fsm_context: FSMContext | None = self.__get_fsm_context(telegram_id=telegram_id)
+        fsm_context: FSMContext | None = await self.__get_fsm_context(telegram_id=telegram_id)
         if fsm_context:
-            self.__update_fsm_context(
+            await self.__update_fsm_context(
                 telegram_id=telegram_id,
                 state=state,
                 data=fsm_context.data
             )
         else:
-            self.__set_fsm_context(telegram_id=telegram_id, state=state, data=dict())
+            await self.__set_fsm_context(telegram_id=telegram_id, state=state, data=dict())
 
     def get_data(self, telegram_id: int) -> dict:
         """
@@ -179,7 +202,7 @@ class FSM:
         return self.__list_fsm_contexts[telegram_id].data \
             if self.__list_fsm_contexts.get(telegram_id) else dict()
 
-    def update_data(self, telegram_id: int, data: dict) -> dict:
+    async def update_data(self, telegram_id: int, data: dict) -> dict:
         """
         Update additional user data in FSM.
 
@@ -191,22 +214,43 @@ class FSM:
             dict: Updated additional user data in FSM.
 
         """
-        fsm_context: FSMContext | None = self.__get_fsm_context(
+        fsm_context: FSMContext | None = await self.__get_fsm_context(
             telegram_id=telegram_id
         )
         if fsm_context:
-            self.__update_fsm_context(
+            await self.__update_fsm_context(
                 telegram_id=telegram_id,
                 data=data,
                 state=fsm_context.state
             )
         else:
-            self.__set_fsm_context(telegram_id=telegram_id, data=data, state=str())
+            await self.__set_fsm_context(telegram_id=telegram_id, data=data, state=str())
         return self.get_data(telegram_id=telegram_id)
 
-    def clear(self, telegram_id: int) -> None:
+    async def clear(self, telegram_id: int) -> None:
         """Clear the FSMContext object for the user."""
-        self.__update_fsm_context(telegram_id=telegram_id, state=str(), data=dict())
+        await self.__update_fsm_context(telegram_id=telegram_id, state=str(), data=dict())
+
+    async def reload(self, telegram_id: int) -> None:
+        """Reload the FSMContext object of the user after it was changed in the database directly."""
+        fsm_context: FSMContext | None = await self.__get_fsm_context(telegram_id=telegram_id)
+        if fsm_context:
+            self.__list_fsm_contexts[telegram_id] = fsm_context
+        else:
+            self.__list_fsm_contexts.pop(telegram_id, None)
+
+    def get_stats(self) -> dict:
+        """
+        Get the FSM counters.
+
+        Returns:
+            dict: Number of FSMContext objects kept in memory and numbers of database reads and writes.
+        """
+        return {
+            "contexts": len(self.__list_fsm_contexts),
+            "reads": self.reads,
+            "writes": self.writes
+        }
 
 
 _fsm_context: FSM
@@ -215,6 +259,7 @@ _fsm_context: FSM
 async def fsm_context_init() -> None:
     global _fsm_context
     _fsm_context = FSM()
+    await _fsm_context.update_list_fsm_contexts()
 
 
 def get_fsm_context() -> FSM:
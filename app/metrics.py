@@ -0,0 +1,356 @@
+"""
+Metrics of the bot in the Prometheus text format.
+
+This module contains a registry of counters and histograms with labels and a small HTTP listener
+serving them on METRICS_HOST:METRICS_PORT at /metrics. Handlers, Telegram API calls and database
+statements update the metrics on the hot path, which costs a dictionary lookup and a few additions
+per observation: samples are kept as plain numbers and formatted only when the endpoint is scraped.
+The counters of the caches, pools and workers are read from their get_stats() by collectors at
+scrape time and exported as gauges.
+
+Metrics are updated from the event loop only, so they are not locked.
+
+Options:
+    _metrics_registry (MetricsRegistry): A single instance of the registry used by the application.
+    _metrics_server (MetricsServer): A single instance of the listener used by the application.
+"""
+
+import asyncio
+import bisect
+import logging
+import math
+from typing import Callable, Iterator
+
+from app import config
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds of the latency histogram buckets in seconds, the +Inf bucket is added when exported
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+# Maximum size of the request line and headers read by the listener
+MAX_REQUEST_SIZE = 8192
+
+
+def format_labels(label_names: tuple[str, ...], label_values: tuple) -> str:
+    """
+    Format the labels of a sample.
+
+    Options:
+        label_names (tuple[str, ...]): Label names.
+        label_values (tuple): Label values in the order of the names.
+
+    Returns:
+        str: Labels in braces with escaped values, an empty string without labels.
+    """
+    if not label_names:
+        return ""
+    labels = ",".join(
+        '{}="{}"'.format(name, str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for name, value in zip(label_names, label_values)
+    )
+    return "{" + labels + "}"
+
+
+def format_value(value: float) -> str:
+    """Format a sample value, integers without a fraction."""
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Counter:
+    """
+    Monotonic counter with labels.
+
+    Options:
+        name (str): Metric name.
+        documentation (str): Help text of the metric.
+        label_names (tuple[str, ...]): Label names.
+
+    Methods:
+        inc(*label_values, amount: float = 1) -> None: Increases the counter of the labels.
+        export() -> Iterator[str]: Formats the samples.
+    """
+
+    def __init__(self, name: str, documentation: str, label_names: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = label_names
+        self.__values: dict[tuple, float] = dict()
+
+    def inc(self, *label_values, amount: float = 1) -> None:
+        """
+        Increase the counter of the labels.
+
+        Options:
+            *label_values: Label values in the order of label_names.
+            amount (float): Increase of the counter.
+        """
+        self.__values[label_values] = self.__values.get(label_values, 0) + amount
+
+    def export(self) -> Iterator[str]:
+        """Format the samples of the counter."""
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} counter"
+        for label_values, value in list(self.__values.items()):
+            yield f"{self.name}{format_labels(self.label_names, label_values)} {format_value(value)}"
+
+
+class Histogram:
+    """
+    Histogram with labels.
+
+    Options:
+        name (str): Metric name.
+        documentation (str): Help text of the metric.
+        label_names (tuple[str, ...]): Label names.
+        buckets (tuple[float, ...]): Upper bounds of the buckets.
+
+    Methods:
+        observe(value: float, *label_values) -> None: Counts an observation of the labels.
+        export() -> Iterator[str]: Formats the samples.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = label_names
+        self.buckets = buckets
+        # Count per bucket with the +Inf bucket last, then the sum of the observations
+        self.__values: dict[tuple, list] = dict()
+
+    def observe(self, value: float, *label_values) -> None:
+        """
+        Count an observation of the labels.
+
+        Options:
+            value (float): Observed value, for example a duration in seconds.
+            *label_values: Label values in the order of label_names.
+        """
+        values = self.__values.get(label_values)
+        if values is None:
+            values = self.__values[label_values] = [0] * (len(self.buckets) + 1) + [0.0]
+        values[bisect.bisect_left(self.buckets, value)] += 1
+        values[-1] += value
+
+    def export(self) -> Iterator[str]:
+        """Format the samples of the histogram with cumulative buckets."""
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} histogram"
+        label_names = (*self.label_names, "le")
+        for label_values, values in list(self.__values.items()):
+            count = 0
+            for upper_bound, bucket_count in zip((*self.buckets, math.inf), values):
+                count += bucket_count
+                labels = format_labels(label_names, (*label_values, format_value(upper_bound)))
+                yield f"{self.name}_bucket{labels} {count}"
+            labels = format_labels(self.label_names, label_values)
+            yield f"{self.name}_sum{labels} {format_value(values[-1])}"
+            yield f"{self.name}_count{labels} {count}"
+
+
+class MetricsRegistry:
+    """
+    Registry of the metrics exported by the bot.
+
+    Methods:
+        counter(name: str, documentation: str, label_names: tuple[str, ...] = ()) -> Counter:
+            Registers a counter.
+        histogram(name: str, documentation: str, label_names: tuple[str, ...] = (), buckets=LATENCY_BUCKETS)
+            -> Histogram: Registers a histogram.
+        register_collector(prefix: str, get_stats: Callable[[], dict], label_keys: dict[str, str] | None = None)
+            -> None: Exports the numbers of a get_stats() as gauges.
+        export() -> str: Formats every metric in the Prometheus text format.
+    """
+
+    def __init__(self):
+        self.__metrics: dict[str, Counter | Histogram] = dict()
+        self.__collectors: list[tuple[str, Callable[[], dict], dict[str, str]]] = list()
+
+    def __register(self, metric: Counter | Histogram) -> Counter | Histogram:
+        if metric.name in self.__metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self.__metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, label_names: tuple[str, ...] = ()) -> Counter:
+        """
+        Register a counter.
+
+        Options:
+            name (str): Unique metric name.
+            documentation (str): Help text of the metric.
+            label_names (tuple[str, ...]): Label names.
+
+        Returns:
+            Counter: The registered counter.
+        """
+        return self.__register(Counter(name=name, documentation=documentation, label_names=label_names))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        label_names: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS
+    ) -> Histogram:
+        """
+        Register a histogram.
+
+        Options:
+            name (str): Unique metric name.
+            documentation (str): Help text of the metric.
+            label_names (tuple[str, ...]): Label names.
+            buckets (tuple[float, ...]): Upper bounds of the buckets.
+
+        Returns:
+            Histogram: The registered histogram.
+        """
+        return self.__register(
+            Histogram(name=name, documentation=documentation, label_names=label_names, buckets=buckets)
+        )
+
+    def register_collector(
+        self,
+        prefix: str,
+        get_stats: Callable[[], dict],
+        label_keys: dict[str, str] | None = None
+    ) -> None:
+        """
+        Export the numbers of a get_stats() as gauges named by the prefix and the keys of the numbers.
+
+        Options:
+            prefix (str): Prefix of the gauge names, for example "tasks_cache".
+            get_stats (Callable[[], dict]): Function returning the counters, called at every scrape.
+            label_keys (dict[str, str] | None): Keys of the dictionaries keyed by data, such as handler
+                or replica names, with the label name their keys are exported as.
+        """
+        self.__collectors.append((prefix, get_stats, label_keys or dict()))
+
+    def __flatten(
+        self,
+        prefix: str,
+        stats: dict,
+        label_keys: dict[str, str],
+        labels: tuple[tuple[str, str], ...] = ()
+    ) -> Iterator[tuple[str, tuple[tuple[str, str], ...], float]]:
+        """Flatten nested counters into gauge names, labels and values."""
+        for key, value in stats.items():
+            name = f"{prefix}_{key}"
+            if isinstance(value, dict) and key in label_keys:
+                for label_value, label_stats in value.items():
+                    sample_labels = (*labels, (label_keys[key], str(label_value)))
+                    if isinstance(label_stats, dict):
+                        yield from self.__flatten(name, label_stats, label_keys, sample_labels)
+                    elif isinstance(label_stats, (int, float)):
+                        yield name, sample_labels, float(label_stats)
+            elif isinstance(value, dict):
+                yield from self.__flatten(name, value, label_keys, labels)
+            elif isinstance(value, (int, float)):
+                yield name, labels, float(value)
+
+    def __export_collectors(self) -> Iterator[str]:
+        """Format the gauges of the collectors."""
+        gauges: dict[str, list[str]] = dict()
+        for prefix, get_stats, label_keys in self.__collectors:
+            try:
+                stats = get_stats()
+            except Exception as error:
+                logger.warning("Metrics collector %s failed: %r", prefix, error)
+                continue
+            for name, labels, value in self.__flatten(prefix, stats, label_keys):
+                label_names, label_values = zip(*labels) if labels else ((), ())
+                gauges.setdefault(name, list()).append(
+                    f"{name}{format_labels(label_names, label_values)} {format_value(value)}"
+                )
+        for name, samples in gauges.items():
+            yield f"# TYPE {name} gauge"
+            yield from samples
+
+    def export(self) -> str:
+        """
+        Format every metric in the Prometheus text format.
+
+        Returns:
+            str: Exposition of the counters, histograms and collector gauges.
+        """
+        lines = [line for metric in list(self.__metrics.values()) for line in metric.export()]
+        lines.extend(self.__export_collectors())
+        return "\n".join(lines) + "\n"
+
+
+_metrics_registry: MetricsRegistry = MetricsRegistry()
+
+
+def get_metrics_registry() -> MetricsRegistry:
+    return _metrics_registry
+
+
+class MetricsServer:
+    """
+    HTTP listener serving the metrics at /metrics.
+
+    Options:
+        host (str): Listened address, the loopback interface by default.
+        port (int): Listened port, 0 disables the listener.
+
+    Methods:
+        start() -> None: Starts listening.
+        stop() -> None: Stops listening.
+    """
+
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+        self.__server: asyncio.Server | None = None
+        self.scrapes = 0
+
+    async def start(self) -> None:
+        """Start listening, unless the port is 0."""
+        if not self.port:
+            return
+        self.__server = await asyncio.start_server(
+            self.__handle, host=self.host, port=self.port, limit=MAX_REQUEST_SIZE
+        )
+        logger.info("Metrics are served on http://%s:%d/metrics", self.host, self.port)
+
+    async def stop(self) -> None:
+        """Stop listening."""
+        if self.__server is not None:
+            self.__server.close()
+            await self.__server.wait_closed()
+            self.__server = None
+
+    async def __handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Answer one HTTP request and close the connection."""
+        try:
+            request = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), timeout=config.METRICS_TIMEOUT)
+            method, path, *_ = request.decode("latin-1").split(" ", 2)
+            if method == "GET" and path.split("?", 1)[0] == "/metrics":
+                self.scrapes += 1
+                status, content_type, body = "200 OK", CONTENT_TYPE, get_metrics_registry().export().encode()
+            else:
+                status, content_type, body = "404 Not Found", "text/plain", b"Not Found\n"
+            writer.write(
+                f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\n"
+                f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body
+            )
+            await writer.drain()
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, TimeoutError, ValueError, OSError):
+            pass
+        finally:
+            writer.close()
+
+
+_metrics_server: MetricsServer = MetricsServer(host=config.METRICS_HOST, port=config.METRICS_PORT)
+
+
+def get_metrics_server() -> MetricsServer:
+    return _metrics_server
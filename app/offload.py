@@ -0,0 +1,259 @@
+"""
+Running blocking calls in a bounded thread or process pool.
+
+This module contains the executor used to run blocking functions (Fernet operations, synchronous
+database code) outside the event loop. The pool is sized to the database connection pool, the number
+of queued calls is limited, and every call has a timeout, so a slow dependency turns into explicit
+OffloadRejectedError / OffloadTimeoutError errors instead of a frozen event loop. CPU-bound functions
+that hold the GIL (password hashing) run in an executor backed by worker processes instead of threads.
+
+Options:
+    _blocking_executor (BlockingExecutor): A single instance of the executor used by the application.
+"""
+
+import asyncio
+import contextvars
+import functools
+import logging
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Awaitable, Callable, TypeVar
+
+from app import config
+from app.db.db_config import POOL_SIZE, MAX_OVERFLOW
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class OffloadError(Exception):
+    """Base error of the blocking executor."""
+
+
+class OffloadRejectedError(OffloadError):
+    """The executor queue is full and the call was rejected."""
+
+
+class OffloadTimeoutError(OffloadError):
+    """The call did not finish within the executor timeout."""
+
+
+def run_timed(function: Callable[..., T], args: tuple, kwargs: dict) -> tuple[T, float, float]:
+    """Run the function in a worker process and return its result with its start and finish times."""
+    started_at = time.perf_counter()
+    result = function(*args, **kwargs)
+    return result, started_at, time.perf_counter()
+
+
+class BlockingExecutor:
+    """
+    Bounded thread or process pool for blocking calls with queue-wait metrics.
+
+    Worker processes are forked, so they inherit the imported modules: a spawned worker would import
+    the app package again and connect to the database. A process forked while other threads run may
+    inherit a lock held by one of them, so start() forks all workers at startup, before the
+    application starts any thread. A pool broken by a dead worker is replaced by a new one, the calls
+    that failed with it raise OffloadError. Functions and arguments passed to a process executor must be
+    picklable, and context variables are not propagated to the workers.
+
+    Options:
+        max_workers (int): Number of worker threads or processes.
+        max_queue_size (int): Maximum number of calls waiting for a free worker.
+        timeout (float): Maximum time in seconds a caller waits for the result.
+        processes (bool): Run the calls in worker processes instead of threads (default False).
+
+    Methods:
+        start() -> None: Starts the worker processes of a process executor.
+        run(function, *args, **kwargs) -> Any: Runs the function in the pool and returns its result.
+        get_stats() -> dict: Gets the executor counters.
+        shutdown() -> None: Stops the workers.
+    """
+
+    def __init__(self, max_workers: int, max_queue_size: int, timeout: float, processes: bool = False):
+        self.max_workers = max_workers
+        self.max_queue_size = max_queue_size
+        self.timeout = timeout
+        self.processes = processes
+        self.__executor: Executor = self.__create_executor()
+        self.__lock = threading.Lock()
+        self.__pending = 0
+        self.submitted = 0
+        self.completed = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self.restarts = 0
+        self.queue_wait_total = 0.0
+        self.queue_wait_max = 0.0
+        self.run_time_total = 0.0
+        self.run_time_max = 0.0
+
+    def __create_executor(self) -> Executor:
+        """Create the pool of worker processes or threads."""
+        if self.processes:
+            return ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("fork")
+            )
+        return ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="offload")
+
+    def __restart(self, broken_executor: Executor) -> None:
+        """Replace a broken process pool, unless another call has already replaced it."""
+        with self.__lock:
+            if self.__executor is not broken_executor:
+                return
+            self.__executor = self.__create_executor()
+            self.restarts += 1
+        logger.warning("Blocking executor worker process died, the process pool was restarted")
+        broken_executor.shutdown(wait=False, cancel_futures=True)
+
+    def __submit(self, function: Callable[..., Any], *args: Any) -> Future:
+        """Submit a call to the pool, freeing its slot if the pool does not accept it."""
+        executor = self.__executor
+        try:
+            future = executor.submit(function, *args)
+        except BaseException as error:
+            self.__release(None)
+            if isinstance(error, BrokenProcessPool):
+                self.__restart(broken_executor=executor)
+                raise OffloadError(f"Blocking executor was broken, {function.__qualname__} was not run") from error
+            raise
+        future.add_done_callback(self.__release)
+        return future
+
+    def start(self) -> None:
+        """Fork the worker processes now, a fork pool starts all of them on its first call."""
+        if not self.processes:
+            return
+        if threading.active_count() > 1:
+            logger.warning("Worker processes are forked while %d threads are running", threading.active_count())
+        self.__executor.submit(int).result()
+
+    def __release(self, _) -> None:
+        """Free the slot of a finished or cancelled call."""
+        with self.__lock:
+            self.__pending -= 1
+
+    def __record(self, queue_wait: float, run_time: float) -> None:
+        """Record the queue wait and run time of a finished call."""
+        with self.__lock:
+            self.completed += 1
+            self.queue_wait_total += queue_wait
+            self.queue_wait_max = max(self.queue_wait_max, queue_wait)
+            self.run_time_total += run_time
+            self.run_time_max = max(self.run_time_max, run_time)
+
+    async def run(self, function: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """
+        Run a blocking function in the pool.
+
+        Options:
+            function (Callable[..., T]): Blocking function.
+            *args, **kwargs: Arguments of the function.
+
+        Returns:
+            T: Result of the function.
+
+        Raises:
+            OffloadRejectedError: All workers are busy and the queue is full.
+            OffloadTimeoutError: The result was not received within the timeout.
+            OffloadError: The worker process running the call died.
+        """
+        with self.__lock:
+            if self.__pending >= self.max_workers + self.max_queue_size:
+                self.rejected += 1
+                raise OffloadRejectedError(f"Blocking executor is full, {function.__qualname__} rejected")
+            self.__pending += 1
+            self.submitted += 1
+        submitted_at = time.perf_counter()
+        try:
+            if self.processes:
+                # perf_counter is system-wide on Linux, so the worker's times are comparable with ours
+                executor = self.__executor
+                future = self.__submit(run_timed, function, args, kwargs)
+                try:
+                    result, started_at, finished_at = await asyncio.wait_for(
+                        asyncio.wrap_future(future),
+                        timeout=self.timeout
+                    )
+                except BrokenProcessPool as error:
+                    self.__restart(broken_executor=executor)
+                    raise OffloadError(f"Worker process of {function.__qualname__} died") from error
+                self.__record(queue_wait=started_at - submitted_at, run_time=finished_at - started_at)
+                return result
+            context = contextvars.copy_context()
+
+            def call() -> T:
+                started_at = time.perf_counter()
+                try:
+                    return context.run(function, *args, **kwargs)
+                finally:
+                    finished_at = time.perf_counter()
+                    self.__record(queue_wait=started_at - submitted_at, run_time=finished_at - started_at)
+
+            future = self.__submit(call)
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            with self.__lock:
+                self.timeouts += 1
+            logger.warning("Blocking call %s timed out after %s s", function.__qualname__, self.timeout)
+            raise OffloadTimeoutError(f"{function.__qualname__} did not finish in {self.timeout} s")
+
+    def get_stats(self) -> dict:
+        """
+        Get the executor counters.
+
+        Returns:
+            dict: Pool size, pending calls, call counters, queue wait and run time statistics in seconds.
+        """
+        with self.__lock:
+            return {
+                "processes": self.processes,
+                "max_workers": self.max_workers,
+                "max_queue_size": self.max_queue_size,
+                "pending": self.__pending,
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "timeouts": self.timeouts,
+                "restarts": self.restarts,
+                "queue_wait_avg": self.queue_wait_total / self.completed if self.completed else 0.0,
+                "queue_wait_max": self.queue_wait_max,
+                "run_time_avg": self.run_time_total / self.completed if self.completed else 0.0,
+                "run_time_max": self.run_time_max
+            }
+
+    def shutdown(self) -> None:
+        """Stop the workers without waiting for queued calls."""
+        self.__executor.shutdown(wait=False, cancel_futures=True)
+
+
+_blocking_executor: BlockingExecutor = BlockingExecutor(
+    max_workers=POOL_SIZE + MAX_OVERFLOW,
+    max_queue_size=config.OFFLOAD_MAX_QUEUE_SIZE,
+    timeout=config.OFFLOAD_TIMEOUT
+)
+
+
+def get_blocking_executor() -> BlockingExecutor:
+    return _blocking_executor
+
+
+def offload(function: Callable[..., T]) -> Callable[..., Awaitable[T]]:
+    """
+    Turn a blocking function into a coroutine function that runs it in the blocking executor.
+
+    Options:
+    - function (Callable[..., T]): Blocking function.
+
+    Returns:
+    - Callable[..., Awaitable[T]]: Coroutine function with the same arguments.
+    """
+    @functools.wraps(function)
+    async def wrapper(*args: Any, **kwargs: Any) -> T:
+        return await get_blocking_executor().run(function, *args, **kwargs)
+
+    return wrapper
@@ -0,0 +1,305 @@
+"""
+Database functions of the deadline reminders.
+
+This module contains the queries used by the reminder scheduler: loading the next window of pending
+deadlines in (end_time, id_task) order, loading open recurring tasks whose occurrences the scheduler
+expands itself and advancing their stored next occurrence, reloading the deadlines of changed owners,
+checking due reminders before they are sent, and reading and writing the persisted watermark in the service_state table.
+"""
+
+from datetime import datetime
+
+from app.db.db_config import AsyncSession
+from app.db.models import UserTasks
+from app.db.router import read_session
+from app.db.statements import get_statement_registry
+
+REMINDER_COLUMNS = (
+    "id_task, owner_telegram_id, task_name, description, start_time, end_time, recurrence_unit, "
+    "recurrence_interval, row_version"
+)
+
+# Keyset pagination over the partial index ix_user_tasks_end_time_pending
+GET_PENDING_DEADLINES = get_statement_registry().register(
+    name="reminders.get_pending",
+    sql=(
+        f"SELECT {REMINDER_COLUMNS} FROM user_tasks "
+        "WHERE status = false AND (end_time, id_task) > (:after_time, :after_id_task) "
+        "AND end_time <= :until_time AND recurrence_unit IS NULL "
+        "ORDER BY end_time, id_task "
+        "LIMIT :limit"
+    )
+)
+GET_OWNERS_PENDING_DEADLINES = get_statement_registry().register(
+    name="reminders.get_owners_pending",
+    sql=(
+        f"SELECT {REMINDER_COLUMNS} FROM user_tasks "
+        "WHERE owner_telegram_id = ANY(:owners_telegram_ids) AND status = false "
+        "AND (end_time, id_task) > (:after_time, :after_id_task) "
+        "AND (end_time, id_task) <= (:until_time, :until_id_task) "
+        "AND recurrence_unit IS NULL"
+    )
+)
+# Keyset pagination over the partial index ix_user_tasks_recurring, read when the scheduler catches up
+GET_RECURRING_TASKS = get_statement_registry().register(
+    name="reminders.get_recurring",
+    sql=(
+        f"SELECT {REMINDER_COLUMNS} FROM user_tasks "
+        "WHERE task_status = 'recurring' AND id_task > :after_id_task AND start_time <= :until_time "
+        "ORDER BY id_task "
+        "LIMIT :limit"
+    )
+)
+# Keyset pagination over the partial index ix_user_tasks_recurring_next_occurrence, series whose next
+# occurrence ends after the window are not read
+GET_NEXT_RECURRING_TASKS = get_statement_registry().register(
+    name="reminders.get_next_recurring",
+    sql=(
+        f"SELECT {REMINDER_COLUMNS}, next_occurrence_end FROM user_tasks "
+        "WHERE task_status = 'recurring' "
+        "AND (next_occurrence_end, id_task) > (:after_time, :after_id_task) "
+        "AND next_occurrence_end <= :until_time "
+        "ORDER BY next_occurrence_end, id_task "
+        "LIMIT :limit"
+    )
+)
+# A series edited since it was read keeps next_occurrence_end reset by the trigger
+SET_NEXT_OCCURRENCE_ENDS = get_statement_registry().register(
+    name="reminders.set_next_occurrence_ends",
+    sql=(
+        "UPDATE user_tasks SET next_occurrence_end = next_occurrences.next_occurrence_end "
+        "FROM unnest(CAST(:ids_tasks AS integer[]), CAST(:row_versions AS integer[]), "
+        "CAST(:next_occurrence_ends AS timestamptz[])) "
+        "AS next_occurrences (id_task, row_version, next_occurrence_end) "
+        "WHERE user_tasks.id_task = next_occurrences.id_task "
+        "AND user_tasks.row_version = next_occurrences.row_version"
+    )
+)
+GET_OWNERS_RECURRING_TASKS = get_statement_registry().register(
+    name="reminders.get_owners_recurring",
+    sql=(
+        f"SELECT {REMINDER_COLUMNS} FROM user_tasks "
+        "WHERE owner_telegram_id = ANY(:owners_telegram_ids) AND task_status = 'recurring' "
+        "AND id_task > :after_id_task AND start_time <= :until_time "
+        "ORDER BY id_task "
+        "LIMIT :limit"
+    )
+)
+GET_DUE_DEADLINES = get_statement_registry().register(
+    name="reminders.get_due",
+    sql=(
+        f"SELECT {', '.join(f'user_tasks.{x}' for x in REMINDER_COLUMNS.split(', '))} "
+        "FROM user_tasks JOIN users ON users.owner_telegram_id = user_tasks.owner_telegram_id "
+        "WHERE user_tasks.id_task = ANY(:ids_tasks) AND user_tasks.status = false AND users.is_login = true"
+    )
+)
+GET_SERVICE_STATE = get_statement_registry().register(
+    name="service_state.get",
+    sql="SELECT value FROM service_state WHERE name =:name"
+)
+SET_SERVICE_STATE = get_statement_registry().register(
+    name="service_state.set",
+    sql=(
+        "INSERT INTO service_state (name, value) VALUES (:name, :value) "
+        "ON CONFLICT (name) DO UPDATE SET value = EXCLUDED.value"
+    )
+)
+
+
+async def get_pending_deadlines(
+    after_time: datetime,
+    after_id_task: int,
+    until_time: datetime,
+    limit: int
+) -> list[UserTasks]:
+    """
+    Get the next pending deadlines after the position in (end_time, id_task) order.
+
+    Options:
+        after_time (datetime): End time of the position.
+        after_id_task (int): Task ID of the position.
+        until_time (datetime): Latest end time to load.
+        limit (int): Maximum number of tasks.
+
+    Returns:
+        list[UserTasks]: Tasks with id_task, owner_telegram_id, task_name, times and recurrence rule.
+    """
+    async with read_session(GET_PENDING_DEADLINES) as session:
+        list_tasks: list[UserTasks] = (await GET_PENDING_DEADLINES.execute(
+            session,
+            {
+                "after_time": after_time,
+                "after_id_task": after_id_task,
+                "until_time": until_time,
+                "limit": limit
+            }
+        )).all()
+    return list_tasks
+
+
+async def get_owners_pending_deadlines(
+    owners_telegram_ids: list[int],
+    after: tuple[datetime, int],
+    until: tuple[datetime, int]
+) -> list[UserTasks]:
+    """
+    Get the pending deadlines of the owners between two positions in (end_time, id_task) order.
+
+    Options:
+        owners_telegram_ids (list[int]): Telegram user IDs.
+        after (tuple[datetime, int]): Exclusive start position.
+        until (tuple[datetime, int]): Inclusive end position.
+
+    Returns:
+        list[UserTasks]: Tasks with id_task, owner_telegram_id, task_name, times and recurrence rule.
+    """
+    async with read_session(GET_OWNERS_PENDING_DEADLINES) as session:
+        list_tasks: list[UserTasks] = (await GET_OWNERS_PENDING_DEADLINES.execute(
+            session,
+            {
+                "owners_telegram_ids": owners_telegram_ids,
+                "after_time": after[0],
+                "after_id_task": after[1],
+                "until_time": until[0],
+                "until_id_task": until[1]
+            }
+        )).all()
+    return list_tasks
+
+
+async def get_recurring_tasks(
+    until_time: datetime,
+    after_id_task: int,
+    limit: int,
+    owners_telegram_ids: list[int] | None = None
+) -> list[UserTasks]:
+    """
+    Get the next open recurring tasks after the task ID whose series starts before the time.
+
+    Options:
+        until_time (datetime): Latest start time of the series.
+        after_id_task (int): Task ID of the position, 0 for the first page.
+        limit (int): Maximum number of tasks.
+        owners_telegram_ids (list[int] | None): Telegram user IDs, None for the tasks of all users.
+
+    Returns:
+        list[UserTasks]: Tasks with id_task, owner_telegram_id, task_name, times and recurrence rule.
+    """
+    async with read_session(GET_RECURRING_TASKS, GET_OWNERS_RECURRING_TASKS) as session:
+        if owners_telegram_ids is None:
+            result = await GET_RECURRING_TASKS.execute(
+                session,
+                {
+                    "after_id_task": after_id_task,
+                    "until_time": until_time,
+                    "limit": limit
+                }
+            )
+        else:
+            result = await GET_OWNERS_RECURRING_TASKS.execute(
+                session,
+                {
+                    "owners_telegram_ids": owners_telegram_ids,
+                    "after_id_task": after_id_task,
+                    "until_time": until_time,
+                    "limit": limit
+                }
+            )
+        list_tasks: list[UserTasks] = result.all()
+    return list_tasks
+
+
+async def get_next_recurring_tasks(
+    after: tuple[datetime, int],
+    until_time: datetime,
+    limit: int
+) -> list[UserTasks]:
+    """
+    Get the next open recurring tasks after the position in (next_occurrence_end, id_task) order.
+
+    Options:
+        after (tuple[datetime, int]): Exclusive start position, (datetime.min, 0) for the first page.
+        until_time (datetime): Latest end time of the next occurrence.
+        limit (int): Maximum number of tasks.
+
+    Returns:
+        list[UserTasks]: Tasks with id_task, owner_telegram_id, task_name, times, recurrence rule and
+        next_occurrence_end.
+    """
+    async with read_session(GET_NEXT_RECURRING_TASKS) as session:
+        list_tasks: list[UserTasks] = (await GET_NEXT_RECURRING_TASKS.execute(
+            session,
+            {
+                "after_time": after[0],
+                "after_id_task": after[1],
+                "until_time": until_time,
+                "limit": limit
+            }
+        )).all()
+    return list_tasks
+
+
+async def set_next_occurrence_ends(list_tasks: list[UserTasks], next_occurrence_ends: list[datetime]) -> None:
+    """
+    Save the end times of the next occurrences of recurring tasks that were not edited since they were read.
+
+    Options:
+        list_tasks (list[UserTasks]): Recurring tasks with id_task and row_version.
+        next_occurrence_ends (list[datetime]): End times of the next occurrences of the tasks.
+    """
+    async with AsyncSession() as session:
+        await SET_NEXT_OCCURRENCE_ENDS.execute(
+            session,
+            {
+                "ids_tasks": [x.id_task for x in list_tasks],
+                "row_versions": [x.row_version for x in list_tasks],
+                "next_occurrence_ends": next_occurrence_ends
+            }
+        )
+        await session.commit()
+
+
+async def get_due_deadlines(ids_tasks: list[int]) -> list[UserTasks]:
+    """
+    Get the tasks that still need a reminder: not completed and owned by a logged in user.
+
+    Options:
+        ids_tasks (list[int]): IDs of the tasks.
+
+    Returns:
+        list[UserTasks]: Tasks with id_task, owner_telegram_id, task_name, times and recurrence rule.
+    """
+    async with read_session(GET_DUE_DEADLINES) as session:
+        list_tasks: list[UserTasks] = (await GET_DUE_DEADLINES.execute(
+            session,
+            {"ids_tasks": ids_tasks}
+        )).all()
+    return list_tasks
+
+
+async def get_service_state(name: str) -> str | None:
+    """
+    Get a persisted value of a background service.
+
+    Options:
+        name (str): Name of the value.
+
+    Returns:
+        str | None: The value, or None if it was never saved.
+    """
+    # A lagging replica could return an older watermark after a restart and repeat sent reminders
+    async with AsyncSession() as session:
+        return (await GET_SERVICE_STATE.execute(session, {"name": name})).scalar()
+
+
+async def set_service_state(name: str, value: str) -> None:
+    """
+    Save a value of a background service.
+
+    Options:
+        name (str): Name of the value.
+        value (str): New value.
+    """
+    async with AsyncSession() as session:
+        await SET_SERVICE_STATE.execute(session, {"name": name, "value": value})
+        await session.commit()
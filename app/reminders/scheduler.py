@@ -0,0 +1,419 @@
+"""
+Deadline reminder scheduler.
+
+The scheduler keeps only the next window of pending deadlines in memory, in a min-heap ordered by
+the time the reminder fires (end_time minus the lead time). The window is loaded from the partial
+index on (end_time, id_task) with keyset pagination and refilled when it runs low, so the table is
+not polled: the scheduler sleeps until the next reminder or the next refill.
+
+Every reminder is identified by its position (end_time, id_task). The position of the last handled
+reminder is the watermark, which is persisted in the service_state table, so after a restart the
+scheduler continues from the watermark and catches up on reminders missed while it was down.
+
+Recurring tasks have no stored occurrences, their occurrences inside the new part of the window are
+expanded into the heap and identified by the position (occurrence end_time, id_task) like single tasks.
+Every series stores the end time of its next occurrence, reset to the first occurrence by a trigger when
+the series is edited, so a refill reads from the partial index only the series whose next occurrence ends
+inside the window and advances the stored end time of the series whose next occurrence has passed.
+Only a refill that catches up on a window starting in the past reads all open series.
+
+Task edits reach the scheduler through the tasks cache invalidation. Owners whose deadlines may have
+moved are collected into a set, and one worker reloads their deadlines inside the loaded window in
+batches, so a burst of writes costs a few queries instead of a query per write. Writes that only
+complete, rename or delete tasks or advance their stored status are ignored: heap entries are never
+removed in place, an entry whose task was moved, completed or deleted, or whose occurrence was
+completed, is skipped when it becomes due.
+
+Options:
+    _reminder_sender (RateLimitedSender): A single instance of the reminder message queue.
+    _reminder_schedulers (list[DeadlineScheduler]): Schedulers of the approaching and overdue reminders.
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+from datetime import datetime, timedelta, UTC
+from typing import Callable
+
+from app import config
+from app.bot_init.bot_init import client_bot
+from app.db.models import UserTasks
+from app.reminders import reminders_controller
+from app.reminders.sender import RateLimitedSender
+from app.tasks_manager import recurrence
+from app.tasks_manager.recurrence import TaskOccurrence
+from app.tasks_manager.tasks_cache import get_tasks_cache, TasksChange
+
+logger = logging.getLogger(__name__)
+
+# id_task is a serial column, so no task position is after (end_time, MAX_ID_TASK)
+MAX_ID_TASK = 2 ** 31 - 1
+RETRY_DELAY = 5
+# Maximum number of changed owners whose deadlines are reloaded by one query
+RELOAD_BATCH_SIZE = 100
+
+
+class DeadlineScheduler:
+    """
+    Scheduler of reminders that fire a fixed time before task deadlines.
+
+    Options:
+        name (str): Name of the scheduler, used as the key of the persisted watermark.
+        lead_time (timedelta): How long before the deadline the reminder fires.
+        format_text (Callable[[UserTasks | TaskOccurrence], str]): Function creating the reminder text.
+        sender (RateLimitedSender): Queue of outgoing messages.
+        window (timedelta): How far ahead of the current time deadlines are loaded.
+        batch_size (int): Maximum number of deadlines loaded by one query.
+        max_lateness (timedelta): Reminders later than this (after a long downtime) are skipped.
+        clock (Callable[[], datetime]): Clock returning the current UTC time.
+
+    Methods:
+        start() -> None: Loads the watermark and subscribes to task changes.
+        run_due() -> float: Sends the due reminders and returns the seconds until the next wakeup.
+        run() -> None: Runs the scheduler until cancelled.
+        save_watermark() -> None: Persists the watermark.
+        get_stats() -> dict: Gets the scheduler counters.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        lead_time: timedelta,
+        format_text: Callable[[UserTasks | TaskOccurrence], str],
+        sender: RateLimitedSender,
+        window: timedelta,
+        batch_size: int,
+        max_lateness: timedelta,
+        clock: Callable[[], datetime] = lambda: datetime.now(UTC)
+    ):
+        self.name = name
+        self.lead_time = lead_time
+        self.window = window
+        self.batch_size = batch_size
+        self.max_lateness = max_lateness
+        self.__format_text = format_text
+        self.__sender = sender
+        self.__clock = clock
+        self.__heap: list[tuple[datetime, datetime, int]] = list()
+        self.__scheduled: set[tuple[datetime, int]] = set()
+        self.__watermark: tuple[datetime, int] | None = None
+        self.__loaded: tuple[datetime, int] | None = None
+        self.__saved_watermark: tuple[datetime, int] | None = None
+        self.__wakeup = asyncio.Event()
+        self.__changed_owners: set[int] = set()
+        self.__owners_changed = asyncio.Event()
+        self.sent = 0
+        self.skipped = 0
+        self.refills = 0
+        self.reloads = 0
+
+    @property
+    def watermark_key(self) -> str:
+        return f"reminders.{self.name}.watermark"
+
+    async def start(self) -> None:
+        """Load the persisted watermark and subscribe to task changes."""
+        value = await reminders_controller.get_service_state(name=self.watermark_key)
+        if value:
+            end_time, id_task = value.rsplit("|", 1)
+            self.__watermark = (datetime.fromisoformat(end_time), int(id_task))
+        else:
+            # On the first start reminders that are already due are not sent
+            self.__watermark = (self.__clock() + self.lead_time, 0)
+        self.__saved_watermark = self.__watermark
+        self.__loaded = self.__watermark
+        get_tasks_cache().subscribe(self.__on_owner_changed)
+
+    def __push(self, id_task: int, end_time: datetime) -> bool:
+        """Add the deadline to the heap unless it is already scheduled."""
+        if (end_time, id_task) in self.__scheduled:
+            return False
+        self.__scheduled.add((end_time, id_task))
+        heapq.heappush(self.__heap, (end_time - self.lead_time, end_time, id_task))
+        return True
+
+    def __push_occurrences(
+        self,
+        list_tasks: list[UserTasks],
+        after: tuple[datetime, int],
+        until: tuple[datetime, int]
+    ) -> bool:
+        """Add the occurrences of recurring tasks with positions between after and until to the heap."""
+        is_pushed = False
+        for task in list_tasks:
+            for start_time, end_time in recurrence.iter_occurrences(
+                task=task,
+                window_start=after[0] - timedelta(microseconds=1),
+                window_end=until[0]
+            ):
+                if after < (end_time, task.id_task) <= until:
+                    is_pushed |= self.__push(id_task=task.id_task, end_time=end_time)
+        return is_pushed
+
+    async def __push_recurring(
+        self,
+        after: tuple[datetime, int],
+        until: tuple[datetime, int],
+        owners_telegram_ids: list[int] | None = None
+    ) -> bool:
+        """Load the open series page by page and add their occurrences between after and until to the heap."""
+        is_pushed = False
+        after_id_task = 0
+        while True:
+            list_tasks = await reminders_controller.get_recurring_tasks(
+                until_time=until[0],
+                after_id_task=after_id_task,
+                limit=self.batch_size,
+                owners_telegram_ids=owners_telegram_ids
+            )
+            is_pushed |= self.__push_occurrences(list_tasks=list_tasks, after=after, until=until)
+            if len(list_tasks) < self.batch_size:
+                return is_pushed
+            after_id_task = list_tasks[-1].id_task
+
+    async def __push_next_recurring(
+        self,
+        after: tuple[datetime, int],
+        until: tuple[datetime, int],
+        now: datetime
+    ) -> None:
+        """Add the occurrences between after and until of the series whose next occurrence ends before until."""
+        position = (datetime.min.replace(tzinfo=UTC), 0)
+        while True:
+            list_tasks = await reminders_controller.get_next_recurring_tasks(
+                after=position,
+                until_time=until[0],
+                limit=self.batch_size
+            )
+            self.__push_occurrences(list_tasks=list_tasks, after=after, until=until)
+            passed_tasks = [x for x in list_tasks if x.next_occurrence_end <= now]
+            if passed_tasks:
+                await reminders_controller.set_next_occurrence_ends(
+                    list_tasks=passed_tasks,
+                    next_occurrence_ends=[
+                        recurrence.get_next_occurrence_end(task=x, after_time=now) for x in passed_tasks
+                    ]
+                )
+            if len(list_tasks) < self.batch_size:
+                return
+            position = (list_tasks[-1].next_occurrence_end, list_tasks[-1].id_task)
+
+    async def __refill(self, now: datetime) -> None:
+        """Load the next deadlines of the window if the heap runs low."""
+        until_time = now + self.lead_time + self.window
+        if self.__loaded >= (until_time, 0) or len(self.__heap) >= self.batch_size // 2:
+            return
+        list_tasks = await reminders_controller.get_pending_deadlines(
+            after_time=self.__loaded[0],
+            after_id_task=self.__loaded[1],
+            until_time=until_time,
+            limit=self.batch_size
+        )
+        self.refills += 1
+        for task in list_tasks:
+            self.__push(id_task=task.id_task, end_time=task.end_time)
+        loaded = self.__loaded
+        if len(list_tasks) == self.batch_size:
+            self.__loaded = (list_tasks[-1].end_time, list_tasks[-1].id_task)
+        else:
+            self.__loaded = (until_time, MAX_ID_TASK)
+        if loaded[0] >= now:
+            await self.__push_next_recurring(after=loaded, until=self.__loaded, now=now)
+        else:
+            # Stored next occurrences are only advanced up to the current time, older ones may have passed them
+            await self.__push_recurring(after=loaded, until=self.__loaded)
+
+    def __on_owner_changed(self, owner_telegram_id: int, change: TasksChange) -> None:
+        """Queue the owner for a reload of the deadlines inside the loaded window."""
+        if not change.moves_deadlines or self.__loaded is None or self.__loaded <= self.__watermark:
+            return
+        self.__changed_owners.add(owner_telegram_id)
+        self.__owners_changed.set()
+
+    async def __reload_owners(self, owners_telegram_ids: list[int]) -> None:
+        """Add new and moved deadlines of the owners inside the loaded window to the heap."""
+        list_tasks = await reminders_controller.get_owners_pending_deadlines(
+            owners_telegram_ids=owners_telegram_ids,
+            after=self.__watermark,
+            until=self.__loaded
+        )
+        self.reloads += 1
+        is_pushed = any([self.__push(id_task=task.id_task, end_time=task.end_time) for task in list_tasks])
+        is_pushed |= await self.__push_recurring(
+            after=self.__watermark,
+            until=self.__loaded,
+            owners_telegram_ids=owners_telegram_ids
+        )
+        if is_pushed:
+            self.__wakeup.set()
+
+    async def __run_reloads(self) -> None:
+        """Reload the deadlines of the changed owners in batches until cancelled."""
+        while True:
+            await self.__owners_changed.wait()
+            self.__owners_changed.clear()
+            while self.__changed_owners:
+                owners_telegram_ids = list(itertools.islice(self.__changed_owners, RELOAD_BATCH_SIZE))
+                self.__changed_owners.difference_update(owners_telegram_ids)
+                try:
+                    await self.__reload_owners(owners_telegram_ids=owners_telegram_ids)
+                except Exception:
+                    logger.exception(
+                        "Reminder scheduler %s failed to reload %d owners, retrying in %s s",
+                        self.name, len(owners_telegram_ids), RETRY_DELAY
+                    )
+                    self.__changed_owners.update(owners_telegram_ids)
+                    await asyncio.sleep(RETRY_DELAY)
+
+    async def run_due(self) -> float:
+        """
+        Send the due reminders.
+
+        Returns:
+            float: Seconds until the next reminder or the next refill of the window.
+        """
+        now = self.__clock()
+        await self.__refill(now=now)
+        due: list[tuple[datetime, datetime, int]] = list()
+        while self.__heap and self.__heap[0][0] <= now:
+            fire_time, end_time, id_task = heapq.heappop(self.__heap)
+            self.__scheduled.discard((end_time, id_task))
+            due.append((fire_time, end_time, id_task))
+        if due:
+            # Tasks may have been completed or moved since they were loaded
+            list_tasks = await reminders_controller.get_due_deadlines(ids_tasks=list({
+                id_task for fire_time, end_time, id_task in due if now - fire_time <= self.max_lateness
+            }))
+            tasks_by_id = {task.id_task: task for task in list_tasks}
+            list_occurrences = {
+                (id_task, end_time - (tasks_by_id[id_task].end_time - tasks_by_id[id_task].start_time))
+                for fire_time, end_time, id_task in due
+                if id_task in tasks_by_id and tasks_by_id[id_task].recurrence_unit
+            }
+            exceptions = await recurrence.get_occurrence_exceptions(
+                ids_tasks=list({id_task for id_task, _ in list_occurrences}),
+                start_time=min((start_time for _, start_time in list_occurrences), default=now),
+                end_time=max((start_time for _, start_time in list_occurrences), default=now)
+            )
+            for fire_time, end_time, id_task in due:
+                task = tasks_by_id.get(id_task)
+                if task and task.recurrence_unit:
+                    start_time = end_time - (task.end_time - task.start_time)
+                    if (id_task, start_time) in exceptions or not recurrence.is_occurrence_start(
+                        task=task,
+                        start_time=start_time
+                    ):
+                        task = None
+                    else:
+                        task = recurrence.make_occurrence(task=task, start_time=start_time, end_time=end_time)
+                elif task and task.end_time != end_time:
+                    task = None
+                if task and now - fire_time <= self.max_lateness:
+                    self.__sender.put(chat_id=task.owner_telegram_id, text=self.__format_text(task))
+                    self.sent += 1
+                else:
+                    self.skipped += 1
+            self.__watermark = max(self.__watermark, (due[-1][1], due[-1][2]))
+            await self.save_watermark()
+        next_wakeup = self.window / 2
+        if self.__heap:
+            next_wakeup = min(next_wakeup, self.__heap[0][0] - now)
+        return max(next_wakeup.total_seconds(), 0)
+
+    async def run(self) -> None:
+        """Run the scheduler and the reloads of changed owners until cancelled."""
+        await self.start()
+        reloads = asyncio.create_task(self.__run_reloads())
+        try:
+            while True:
+                try:
+                    timeout = await self.run_due()
+                except Exception:
+                    logger.exception("Reminder scheduler %s failed, retrying in %s s", self.name, RETRY_DELAY)
+                    timeout = RETRY_DELAY
+                try:
+                    await asyncio.wait_for(self.__wakeup.wait(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    pass
+                self.__wakeup.clear()
+        finally:
+            reloads.cancel()
+
+    async def save_watermark(self) -> None:
+        """Persist the watermark if it has changed."""
+        if self.__watermark is None or self.__watermark == self.__saved_watermark:
+            return
+        await reminders_controller.set_service_state(
+            name=self.watermark_key,
+            value=f"{self.__watermark[0].isoformat()}|{self.__watermark[1]}"
+        )
+        self.__saved_watermark = self.__watermark
+
+    def get_stats(self) -> dict:
+        """
+        Get the scheduler counters.
+
+        Returns:
+            dict: Heap size, number of owners waiting for a reload and the numbers of sent and skipped
+            reminders, window refills and owner reloads.
+        """
+        return {
+            "heap_size": len(self.__heap),
+            "scheduled": len(self.__scheduled),
+            "changed_owners": len(self.__changed_owners),
+            "sent": self.sent,
+            "skipped": self.skipped,
+            "refills": self.refills,
+            "reloads": self.reloads
+        }
+
+
+def format_approaching_reminder(task: UserTasks | TaskOccurrence) -> str:
+    """Create the text of the reminder about an approaching deadline."""
+    return (
+        f"Напоминание: срок выполнения задачи {task.task_name} № {task.id_task} "
+        f"истекает {task.end_time.astimezone(UTC).strftime('%d.%m.%Y %H:%M')} по Гринвичу"
+    )
+
+
+def format_overdue_reminder(task: UserTasks | TaskOccurrence) -> str:
+    """Create the text of the reminder about a passed deadline."""
+    return (
+        f"Срок выполнения задачи {task.task_name} № {task.id_task} истек "
+        f"{task.end_time.astimezone(UTC).strftime('%d.%m.%Y %H:%M')} по Гринвичу"
+    )
+
+
+async def send_reminder(chat_id: int, text: str) -> None:
+    await client_bot.send_message(chat_id=chat_id, text=text)
+
+
+_reminder_sender: RateLimitedSender = RateLimitedSender(
+    send=send_reminder,
+    rate=config.REMINDER_SEND_RATE,
+    max_queue_size=config.REMINDER_QUEUE_SIZE
+)
+_reminder_schedulers: list[DeadlineScheduler] = [
+    DeadlineScheduler(
+        name=name,
+        lead_time=timedelta(seconds=lead_time),
+        format_text=format_text,
+        sender=_reminder_sender,
+        window=timedelta(seconds=config.REMINDER_WINDOW),
+        batch_size=config.REMINDER_BATCH_SIZE,
+        max_lateness=timedelta(seconds=config.REMINDER_MAX_LATENESS)
+    )
+    for name, lead_time, format_text in (
+        ("approaching", config.REMINDER_LEAD_TIME, format_approaching_reminder),
+        ("overdue", 0, format_overdue_reminder)
+    )
+]
+
+
+def get_reminder_sender() -> RateLimitedSender:
+    return _reminder_sender
+
+
+def get_reminder_schedulers() -> list[DeadlineScheduler]:
+    return _reminder_schedulers
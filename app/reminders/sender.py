@@ -0,0 +1,116 @@
+"""
+Rate-limited queue of outgoing reminder messages.
+
+Telegram limits how many messages a bot may send per second, so reminders are not sent directly by
+the scheduler. They are put into a bounded queue, and a single worker sends them at a fixed rate,
+waiting out FloodWait errors. Any other error fails only the message being sent, never the worker.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable
+
+from pyrogram.errors import FloodWait, RPCError
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimitedSender:
+    """
+    Bounded queue of messages sent at a fixed rate.
+
+    Options:
+        send (Callable[[int, str], Awaitable]): Function sending a text to a chat.
+        rate (float): Maximum number of messages per second.
+        max_queue_size (int): Maximum number of queued messages, new messages are dropped when it is full.
+        clock (Callable[[], float]): Clock used for the rate limit (time.monotonic by default).
+
+    Methods:
+        put(chat_id: int, text: str) -> bool: Queues a message.
+        run() -> None: Sends queued messages until cancelled.
+        get_stats() -> dict: Gets the queue counters.
+    """
+
+    def __init__(
+        self,
+        send: Callable[[int, str], Awaitable],
+        rate: float,
+        max_queue_size: int,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.__send = send
+        self.__interval = 1 / rate
+        self.__clock = clock
+        self.__queue: asyncio.Queue[tuple[int, str]] = asyncio.Queue(maxsize=max_queue_size)
+        self.queued = 0
+        self.sent = 0
+        self.dropped = 0
+        self.failed = 0
+        self.flood_waits = 0
+
+    def put(self, chat_id: int, text: str) -> bool:
+        """
+        Queue a message.
+
+        Options:
+            chat_id (int): Chat ID.
+            text (str): Message text.
+
+        Returns:
+            bool: False if the queue is full and the message was dropped.
+        """
+        try:
+            self.__queue.put_nowait((chat_id, text))
+        except asyncio.QueueFull:
+            self.dropped += 1
+            logger.warning("Reminder queue is full, message to %s dropped", chat_id)
+            return False
+        self.queued += 1
+        return True
+
+    async def run(self) -> None:
+        """Send queued messages at the configured rate until cancelled."""
+        next_send_at = self.__clock()
+        while True:
+            chat_id, text = await self.__queue.get()
+            delay = next_send_at - self.__clock()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            try:
+                await self.__send(chat_id, text)
+                self.sent += 1
+            except FloodWait as error:
+                self.flood_waits += 1
+                logger.warning("Flood wait of %s s while sending reminders", error.value)
+                await asyncio.sleep(error.value)
+                if self.__queue.full():
+                    self.dropped += 1
+                else:
+                    self.__queue.put_nowait((chat_id, text))
+            except RPCError as error:
+                self.failed += 1
+                logger.warning("Reminder to %s was not sent: %s", chat_id, error)
+            except Exception:
+                # Network errors must not stop the worker, the queue would only fill up and drop messages
+                self.failed += 1
+                logger.exception("Reminder to %s was not sent", chat_id)
+            finally:
+                self.__queue.task_done()
+            next_send_at = max(next_send_at + self.__interval, self.__clock())
+
+    def get_stats(self) -> dict:
+        """
+        Get the queue counters.
+
+        Returns:
+            dict: Queue size and the numbers of queued, sent, dropped and failed messages.
+        """
+        return {
+            "size": self.__queue.qsize(),
+            "queued": self.queued,
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "flood_waits": self.flood_waits
+        }
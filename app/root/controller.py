@@ -48,8 +48,8 @@ async def send_message_start(
     data = dict()
     data["list_messages_delete_ids"] = get_fsm_context().get_data(
         telegram_id=message.from_user.id).get('list_messages_delete_ids')
-    get_fsm_context().clear(telegram_id=message.from_user.id)
-    user: Users | None = auth_controller.get_user(owner_telegram_id=owner_telegram_id)
+    await get_fsm_context().clear(telegram_id=message.from_user.id)
+    user: Users | None = await auth_controller.get_user(owner_telegram_id=owner_telegram_id)
     if not user or not user.is_login:
         text_message = (
             f"Привет {message.from_user.first_name}.\n\n"
@@ -78,8 +78,8 @@ async def send_message_start(
         reply_markup = types.ReplyKeyboardMarkup(keyboard=keyboard)
         state = "main_menu"
         data["owner_telegram_id"] = int(owner_telegram_id)
-    get_fsm_context().update_data(telegram_id=message.from_user.id, data=data)
-    get_fsm_context().update_state(telegram_id=message.from_user.id, state=state)
+    await get_fsm_context().update_data(telegram_id=message.from_user.id, data=data)
+    await get_fsm_context().update_state(telegram_id=message.from_user.id, state=state)
     telegram_utils = TelegramUtils(
         text=text_message,
         reply_markup=reply_markup,
@@ -7,12 +7,12 @@ This module contains code for processing various events and commands, such as st
 from pyrogram import filters, Client, types
 
 from app.auth_manager import auth_controller
+from app.auth_manager.account_purge import purge_account
 from app.bot_init.bot_init import client_bot
 from app.db.models import Users
 from app.fsm_context.fsm_context import get_fsm_context
 from app.root.controller import send_message_start
 from app.root.filters import get_filters
-from app.tasks_manager import tasks_controller
 from app.utils import TelegramUtils
 
 
@@ -32,7 +32,7 @@ async def confirm_delete_account_user(_: Client, message: types.Message) -> None
     """Confirmation of user account deletion."""
     data = get_fsm_context().get_data(telegram_id=message.from_user.id)
     reply_markup = None
-    user: Users | None = auth_controller.get_user(owner_telegram_id=message.from_user.id)
+    user: Users | None = await auth_controller.get_user(owner_telegram_id=message.from_user.id)
     if not user or (data.get('owner_telegram_id') and auth_controller.check_user_is_owner(
             user_telegram_id=message.from_user.id, owner_telegram_id=data.get('owner_telegram_id'))):
         text_message = "Вы не имеете доступ к данному функционалу"
@@ -56,7 +56,7 @@ async def confirm_delete_account_user(_: Client, message: types.Message) -> None
             )
         ])
         reply_markup = types.InlineKeyboardMarkup(inline_keyboard=inline_keyboard)
-    get_fsm_context().update_state(telegram_id=message.from_user.id, state="main_menu")
+    await get_fsm_context().update_state(telegram_id=message.from_user.id, state="main_menu")
     telegram_utils = TelegramUtils(
         text=text_message,
         reply_markup=reply_markup,
@@ -76,16 +76,15 @@ async def delete_account_user(client: Client, message: types.CallbackQuery) -> N
         user_telegram_id=message.from_user.id,
         owner_telegram_id=owner_telegram_id
     ):
-        auth_controller.delete_user(owner_telegram_id=owner_telegram_id)
-        tasks_controller.delete_task(owner_telegram_id=owner_telegram_id)
+        await purge_account(owner_telegram_id=owner_telegram_id)
         text_message = (
             "Привязанный аккаунт был успешно удален"
         )
         data = dict()
         data["list_messages_delete_ids"] = get_fsm_context().get_data(
             telegram_id=message.from_user.id).get('list_messages_delete_ids')
-        get_fsm_context().clear(telegram_id=message.from_user.id)
-        get_fsm_context().update_data(
+        await get_fsm_context().clear(telegram_id=message.from_user.id)
+        await get_fsm_context().update_data(
             telegram_id=message.from_user.id,
             data=data
         )
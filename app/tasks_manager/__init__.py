@@ -1 +1,2 @@
-from . import create_tasks_handlers, edit_tasks_handlers, view_tasks_handlers, handlers
+from . import create_tasks_handlers, edit_tasks_handlers, view_tasks_handlers, select_tasks_handlers, \
+    search_tasks_handlers, import_tasks_handlers, export_tasks_handlers, statistics_tasks_handlers, handlers
@@ -3,7 +3,7 @@ from app.auth_manager import auth_controller
 from app.bot_init.bot_init import client_bot
 from app.fsm_context.fsm_context import get_fsm_context
 from app.root.filters import get_filters
-from app.tasks_manager import tasks_controller
+from app.tasks_manager import recurrence, tasks_controller
 from app.tasks_manager.handlers import get_back_buttons, tasks_menu
 from app.utils import TelegramUtils
 
@@ -25,7 +25,7 @@ async def create_task(_: Client, message: types.CallbackQuery) -> None:
             "Введите название вашей новой задачи"
         )
         reply_markup = get_back_buttons(owner_telegram_id=owner_telegram_id)
-        get_fsm_context().update_state(
+        await get_fsm_context().update_state(
             telegram_id=message.from_user.id,
             state="tasks:create:set_name"
         )
@@ -51,14 +51,14 @@ async def create_task_set_name(_: Client, message: types.Message) -> None:
     """Handler for setting the name of the new task."""
     data = get_fsm_context().get_data(telegram_id=message.from_user.id)
     data['task_name'] = message.text
-    get_fsm_context().update_data(telegram_id=message.from_user.id, data=data)
+    await get_fsm_context().update_data(telegram_id=message.from_user.id, data=data)
     text_message = (
         "Введите описание вашей новой задачи"
     )
     reply_markup = get_back_buttons(
         owner_telegram_id=data.get('owner_telegram_id')
     )
-    get_fsm_context().update_state(
+    await get_fsm_context().update_state(
         telegram_id=message.from_user.id,
         state="tasks:create:set_description"
     )
@@ -81,12 +81,12 @@ async def create_task_set_description(
     """Handler for setting the description of a new task."""
     data = get_fsm_context().get_data(telegram_id=message.from_user.id)
     data['task_description'] = message.text
-    get_fsm_context().update_data(telegram_id=message.from_user.id, data=data)
+    await get_fsm_context().update_data(telegram_id=message.from_user.id, data=data)
     text_message = tasks_controller.get_text_set_time()
     reply_markup = get_back_buttons(
         owner_telegram_id=data.get('owner_telegram_id')
     )
-    get_fsm_context().update_state(
+    await get_fsm_context().update_state(
         telegram_id=message.from_user.id,
         state="tasks:create:set_start_time"
     )
@@ -112,14 +112,14 @@ async def create_task_set_start_time(
         text_message = tasks_controller.get_text_set_time(is_error=True)
     else:
         data['task_start_time'] = message.text
-        get_fsm_context().update_data(
+        await get_fsm_context().update_data(
             telegram_id=message.from_user.id,
             data=data
         )
         text_message = tasks_controller.get_text_set_time(
             start_time=data.get('task_start_time')
         )
-        get_fsm_context().update_state(
+        await get_fsm_context().update_state(
             telegram_id=message.from_user.id,
             state="tasks:create:set_end_time"
         )
@@ -141,8 +141,6 @@ async def create_task_set_start_time(
 async def create_task_set_end_time(_: Client, message: types.Message) -> None:
     """Handler for setting the completion time of a new task."""
     data = get_fsm_context().get_data(telegram_id=message.from_user.id)
-    is_task_create: bool = False
-    reply_markup = None
     if not tasks_controller.check_valid_date(
         start_time=data.get('task_start_time'),
         end_time=message.text.strip()
@@ -155,26 +153,132 @@ async def create_task_set_end_time(_: Client, message: types.Message) -> None:
             owner_telegram_id=data.get('owner_telegram_id')
         )
     else:
-        start_time = tasks_controller.transform_utc_time(
-            time=data.get('task_start_time')
+        data['task_end_time'] = message.text.strip()
+        await get_fsm_context().update_data(
+            telegram_id=message.from_user.id,
+            data=data
         )
-        end_time = tasks_controller.transform_utc_time(
-            time=message.text.strip()
+        text_message = get_text_set_recurrence()
+        reply_markup = get_recurrence_buttons(
+            owner_telegram_id=data.get('owner_telegram_id')
         )
-        tasks_controller.set_task(
-            owner_telegram_id=data.get('owner_telegram_id'),
-            start_time=start_time,
-            end_time=end_time,
-            task_name=data.get('task_name'),
-            description=data.get('task_description')
+        await get_fsm_context().update_state(
+            telegram_id=message.from_user.id,
+            state="tasks:create:set_recurrence"
         )
-        text_message = "Новая задача упешно создана"
-        is_task_create = True
     telegram_utils = TelegramUtils(
         text=text_message,
         reply_markup=reply_markup,
         message=message
     )
     await telegram_utils.send_messages()
-    if is_task_create:
-        await tasks_menu(_=_, message=message)
+
+
+@client_bot.on_callback_query(
+    filters.regex("tasks:create:no_recurrence:") &
+    get_filters().message_filter(state="tasks:create:set_recurrence")
+)
+async def create_task_without_recurrence(_: Client, message: types.CallbackQuery) -> None:
+    """Handler for creating a new task that does not repeat."""
+    await save_new_task(_=_, message=message)
+
+
+@client_bot.on_message(
+    filters.text &
+    get_filters().message_filter(state="tasks:create:set_recurrence")
+)
+async def create_task_set_recurrence(_: Client, message: types.Message) -> None:
+    """Handler for setting the recurrence rule of a new task."""
+    rule = recurrence.parse_recurrence(text=message.text)
+    if rule is None:
+        data = get_fsm_context().get_data(telegram_id=message.from_user.id)
+        telegram_utils = TelegramUtils(
+            text=get_text_set_recurrence(is_error=True),
+            reply_markup=get_recurrence_buttons(
+                owner_telegram_id=data.get('owner_telegram_id')
+            ),
+            message=message
+        )
+        await telegram_utils.send_messages()
+        return
+    recurrence_unit, recurrence_interval = rule
+    await save_new_task(
+        _=_,
+        message=message,
+        recurrence_unit=recurrence_unit,
+        recurrence_interval=recurrence_interval
+    )
+
+
+async def save_new_task(
+    _: Client,
+    message: types.Message | types.CallbackQuery,
+    recurrence_unit: str | None = None,
+    recurrence_interval: int = 1
+) -> None:
+    """
+       Function for saving the new task from the FSM data and returning to the task menu.
+
+       Options:
+       - message: CallbackQuery or Message object
+       - recurrence_unit: Unit of the recurrence rule, None for a task that does not repeat
+       - recurrence_interval: Interval of the recurrence rule in units
+    """
+    data = get_fsm_context().get_data(telegram_id=message.from_user.id)
+    await tasks_controller.set_task(
+        owner_telegram_id=data.get('owner_telegram_id'),
+        start_time=tasks_controller.transform_utc_time(time=data.get('task_start_time')),
+        end_time=tasks_controller.transform_utc_time(time=data.get('task_end_time')),
+        task_name=data.get('task_name'),
+        description=data.get('task_description'),
+        recurrence_unit=recurrence_unit,
+        recurrence_interval=recurrence_interval
+    )
+    text_message = "Новая задача упешно создана"
+    if recurrence_unit:
+        text_message += (
+            f". Задача повторяется "
+            f"{recurrence.get_text_recurrence(recurrence_unit=recurrence_unit, recurrence_interval=recurrence_interval)}"
+        )
+    telegram_utils = TelegramUtils(
+        text=text_message,
+        message=message
+    )
+    await telegram_utils.send_messages()
+    await tasks_menu(_=_, message=message)
+
+
+def get_text_set_recurrence(is_error: bool = False) -> str:
+    """
+        Generate a text message to set the recurrence rule of the task.
+
+        Options:
+        - is_error (bool): Error flag in the rule format (default False).
+
+        Returns:
+        - str: Text message with instructions for setting the recurrence rule.
+    """
+    return (
+        f"{('Вы ввели неверное правило повторения!!!' if is_error else '')}\n"
+        "Если задача повторяется, введите правило повторения: d - каждый день, w - каждую неделю, "
+        "m - каждый месяц. Перед буквой можно указать число, например 3d - каждые 3 дня, 2w - каждые 2 недели.\n"
+        "Если задача не повторяется, нажмите кнопку ниже или введите 0"
+    )
+
+
+def get_recurrence_buttons(owner_telegram_id: int) -> types.InlineKeyboardMarkup:
+    """
+        Returns a keyboard with a "Do not repeat" button and the "Back" buttons.
+
+        Options:
+        - `owner_telegram_id`: ID of the task owner.
+
+        Returns:
+        - types.InlineKeyboardMarkup: Keyboard for the recurrence rule step.
+    """
+    inline_keyboard = [[types.InlineKeyboardButton(
+        text="Не повторять",
+        callback_data=f"tasks:create:no_recurrence:{owner_telegram_id}"
+    )]]
+    inline_keyboard += get_back_buttons(owner_telegram_id=owner_telegram_id).inline_keyboard
+    return types.InlineKeyboardMarkup(inline_keyboard=inline_keyboard)
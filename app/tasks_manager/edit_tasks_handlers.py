@@ -18,7 +18,7 @@ async def edit_tasks(_: Client, message: types.CallbackQuery | types.Message) ->
     owner_telegram_id = (int(message.data.split(":")[-1])
                          if isinstance(message, types.CallbackQuery) and message.data.split(":")[-1].isdigit()
                          else data.get('owner_telegram_id'))
-    list_user_tasks: list[UserTasks] = tasks_controller.get_all_tasks(
+    list_user_tasks: list[UserTasks] = await tasks_controller.get_all_tasks(
         owner_telegram_id=owner_telegram_id
     )
     reply_markup = None
@@ -31,7 +31,7 @@ async def edit_tasks(_: Client, message: types.CallbackQuery | types.Message) ->
         if not data.get('editor_task_pagination'):
             data['editor_task_pagination'] = 0
         data['editor_task_list_ids'] = list_ids_tasks
-        get_fsm_context().update_data(telegram_id=message.from_user.id, data=data)
+        await get_fsm_context().update_data(telegram_id=message.from_user.id, data=data)
         pagination = data.get("editor_task_pagination")
         button_previous = types.InlineKeyboardButton(
             text="Предыдущие SKU",
@@ -61,12 +61,16 @@ async def edit_tasks(_: Client, message: types.CallbackQuery | types.Message) ->
             list_ids_tasks) else [button_previous] if pagination else [button_next]
             if pagination + 10 < len(list_ids_tasks) else [])
         inline_keyboard.append([button_start, button_end])
+        inline_keyboard.append([types.InlineKeyboardButton(
+            text="Выбрать несколько задач",
+            callback_data=f"tasks:select:start:{owner_telegram_id}"
+        )])
         inline_keyboard += get_back_buttons(owner_telegram_id=owner_telegram_id).inline_keyboard
         text_message = (
             "Введите номер вашей задачи, или выберите ее из списка доступных вам"
         )
         reply_markup = types.InlineKeyboardMarkup(inline_keyboard=inline_keyboard)
-        get_fsm_context().update_state(telegram_id=message.from_user.id, state="tasks:edit")
+        await get_fsm_context().update_state(telegram_id=message.from_user.id, state="tasks:edit")
     telegram_utils = TelegramUtils(text=text_message, reply_markup=reply_markup, message=message)
     await telegram_utils.send_messages()
     if not list_user_tasks:
@@ -83,7 +87,7 @@ async def pagination_button(_: Client, message: types.CallbackQuery) -> None:
         else data.get("editor_task_pagination") + 10 if message.data == "tasks:edit_task:button:next"
         else 0 if message.data == "tasks:edit_task:button:start" else
         len(data.get("editor_task_list_ids")) - len(data.get("editor_task_list_ids")) % 10)
-    get_fsm_context().update_data(telegram_id=message.from_user.id, data=data)
+    await get_fsm_context().update_data(telegram_id=message.from_user.id, data=data)
     await edit_tasks(_=_, message=message)
 
 
@@ -106,7 +110,7 @@ async def choice_task(_: Client, message: types.Message | types.CallbackQuery) -
         )
     else:
         id_task = int(id_task)
-        task = tasks_controller.get_task_by_id(
+        task = await tasks_controller.get_task_by_id(
             id_task=id_task,
             owner_telegram_id=owner_telegram_id
         )
@@ -116,7 +120,7 @@ async def choice_task(_: Client, message: types.Message | types.CallbackQuery) -
             )
         else:
             data['editor_task_id'] = id_task
-            get_fsm_context().update_data(
+            await get_fsm_context().update_data(
                 telegram_id=message.from_user.id,
                 data=data
             )
@@ -125,7 +129,7 @@ async def choice_task(_: Client, message: types.Message | types.CallbackQuery) -
             text_message, inline_keyboard = create_text_and_buttons_edit(
                 owner_telegram_id=owner_telegram_id, is_owner=is_owner)
             reply_markup = types.InlineKeyboardMarkup(inline_keyboard=inline_keyboard)
-            get_fsm_context().update_state(
+            await get_fsm_context().update_state(
                 telegram_id=message.from_user.id,
                 state="tasks:edit:edit_task"
             )
@@ -163,7 +167,7 @@ async def call_menu_editor(_: Client, message: types.Message | types.CallbackQue
         message=message
     )
     await telegram_utils.send_messages()
-    get_fsm_context().update_state(
+    await get_fsm_context().update_state(
         telegram_id=message.from_user.id,
         state="tasks:edit:edit_task"
     )
@@ -178,7 +182,7 @@ async def update_status_task(_: Client, message: types.CallbackQuery) -> None:
     data: dict = get_fsm_context().get_data(telegram_id=message.from_user.id)
     owner_telegram_id = int(message.data.split(":")[-1])
     id_task = data.get('editor_task_id')
-    task = tasks_controller.get_task_by_id(
+    task = await tasks_controller.get_task_by_id(
         owner_telegram_id=owner_telegram_id,
         id_task=id_task
     )
@@ -198,14 +202,14 @@ async def update_status_task(_: Client, message: types.CallbackQuery) -> None:
     data: dict = get_fsm_context().get_data(telegram_id=message.from_user.id)
     owner_telegram_id = int(message.data.split(":")[-1])
     id_task = data.get('editor_task_id')
-    status = tasks_controller.update_task_completion(
+    task: UserTasks | None = await tasks_controller.update_task_completion(
         owner_telegram_id=owner_telegram_id,
         id_task=id_task
     )
     text_message = (
         f"Статут задания с номером {id_task} успешно изменен на "
-        f"{'\'Завершена\'' if status else '\'Не завершена\''}"
-    )
+        f"{'\'Завершена\'' if task.status else '\'Не завершена\''}"
+    ) if task else get_text_task_not_found(id_task=id_task)
     telegram_utils = TelegramUtils(text=text_message, message=message)
     await telegram_utils.send_messages()
     await call_menu_editor(_=_, message=message)
@@ -232,15 +236,15 @@ async def update_name_task(_: Client, message: types.CallbackQuery) -> None:
 async def set_task_name(_: Client, message: types.Message) -> None:
     """Handler for setting a new task name when editing."""
     data: dict = get_fsm_context().get_data(telegram_id=message.from_user.id)
-    tasks_controller.update_task_name(
+    task: UserTasks | None = await tasks_controller.update_task_name(
         id_task=data.get('editor_task_id'),
         owner_telegram_id=data.get('owner_telegram_id'),
         task_name=message.text
     )
     text_message = (
-        f"Название задачи под номером {data.get('editor_task_id')} "
-        f"было успешно изменено на {message.text}"
-    )
+        f"Название задачи под номером {task.id_task} "
+        f"было успешно изменено на {task.task_name}"
+    ) if task else get_text_task_not_found(id_task=data.get('editor_task_id'))
     telegram_utils = TelegramUtils(text=text_message, message=message)
     await telegram_utils.send_messages()
     await call_menu_editor(_=_, message=message)
@@ -267,15 +271,15 @@ async def update_description_task(_: Client, message: types.CallbackQuery) -> No
 async def set_description_task(_: Client, message: types.Message) -> None:
     """Handler for setting a new task description when editing."""
     data: dict = get_fsm_context().get_data(telegram_id=message.from_user.id)
-    tasks_controller.update_task_description(
+    task: UserTasks | None = await tasks_controller.update_task_description(
         id_task=data.get('editor_task_id'),
         owner_telegram_id=data.get('owner_telegram_id'),
         description=message.text
     )
     text_message = (
-        f"Описание задачи под номером {data.get('editor_task_id')} "
-        f"было успешно изменено на:\n{message.text}"
-    )
+        f"Описание задачи под номером {task.id_task} "
+        f"было успешно изменено на:\n{task.description}"
+    ) if task else get_text_task_not_found(id_task=data.get('editor_task_id'))
     telegram_utils = TelegramUtils(text=text_message, message=message)
     await telegram_utils.send_messages()
     await call_menu_editor(_=_, message=message)
@@ -302,20 +306,22 @@ async def update_start_date_task(_: Client, message: types.CallbackQuery) -> Non
 async def set_start_date_task(_: Client, message: types.Message) -> None:
     """Handler for setting a new start date and time for a task when editing."""
     data: dict = get_fsm_context().get_data(telegram_id=message.from_user.id)
-    if not tasks_controller.check_valid_date(start_time=message.text.strip()):
+    # The start time is compared with the end time by the update statement itself
+    task: UserTasks | None = await tasks_controller.update_task_start_time(
+        id_task=data.get('editor_task_id'),
+        owner_telegram_id=data.get('owner_telegram_id'),
+        start_time=message.text.strip()
+    ) if tasks_controller.check_valid_date(start_time=message.text.strip()) else None
+    if not task:
         text_message = tasks_controller.get_text_set_time(is_error=True)
         return await call_send_state(
             message=message,
             state="tasks:edit:edit_task:set_start_date",
             text_message=text_message
         )
-    tasks_controller.update_task_start_time(
-        id_task=data.get('editor_task_id'),
-        owner_telegram_id=data.get('owner_telegram_id'),
-        start_time=message.text.strip()
-    )
     text_message = (
-        f"Дата старта задачи по Гринвичу была успешно обновлена на {message.text}"
+        "Дата старта задачи по Гринвичу была успешно обновлена на "
+        f"{task.start_time.strftime('%d.%m.%Y %H:%M')}"
     )
     telegram_utils = TelegramUtils(text=text_message, message=message)
     await telegram_utils.send_messages()
@@ -329,7 +335,7 @@ async def set_start_date_task(_: Client, message: types.Message) -> None:
 async def update_end_date_task(_: Client, message: types.CallbackQuery) -> None:
     """Handler for changing the end date and time of a task when editing."""
     data: dict = get_fsm_context().get_data(telegram_id=message.from_user.id)
-    task: UserTasks = tasks_controller.get_task_by_id(
+    task: UserTasks = await tasks_controller.get_task_by_id(
         id_task=data.get('editor_task_id'),
         owner_telegram_id=data.get('owner_telegram_id')
     )
@@ -348,28 +354,22 @@ async def update_end_date_task(_: Client, message: types.CallbackQuery) -> None:
 async def set_end_date_task(_: Client, message: types.Message) -> None:
     """Handler for setting a new end date and time for a task when editing."""
     data: dict = get_fsm_context().get_data(telegram_id=message.from_user.id)
-    task: UserTasks = tasks_controller.get_task_by_id(
+    # The end time is compared with the start time by the update statement itself
+    task: UserTasks | None = await tasks_controller.update_task_end_time(
         id_task=data.get('editor_task_id'),
-        owner_telegram_id=data.get('owner_telegram_id')
-    )
-    start_time = task.start_time.strftime(format='%d.%m.%Y %H:%M')
-    if not tasks_controller.check_valid_date(
-        start_time=start_time,
+        owner_telegram_id=data.get('owner_telegram_id'),
         end_time=message.text.strip()
-    ):
+    ) if tasks_controller.check_valid_date(start_time=message.text.strip()) else None
+    if not task:
         text_message = tasks_controller.get_text_set_time(is_error=True)
         return await call_send_state(
             message=message,
             state="tasks:edit:edit_task:set_end_date",
             text_message=text_message
         )
-    tasks_controller.update_task_end_time(
-        id_task=data.get('editor_task_id'),
-        owner_telegram_id=data.get('owner_telegram_id'),
-        end_time=message.text.strip()
-    )
     text_message = (
-        f"Дата завершения задачи по Гринвичу была успешно обновлена на {message.text}"
+        "Дата завершения задачи по Гринвичу была успешно обновлена на "
+        f"{task.end_time.strftime('%d.%m.%Y %H:%M')}"
     )
     telegram_utils = TelegramUtils(text=text_message, message=message)
     await telegram_utils.send_messages()
@@ -408,7 +408,7 @@ async def delete_task(_: Client, message: types.CallbackQuery) -> None:
         reply_markup=reply_markup
     )
     await telegram_utils.send_messages()
-    get_fsm_context().update_state(
+    await get_fsm_context().update_state(
         telegram_id=message.from_user.id,
         state="tasks:edit:edit_task:delete"
     )
@@ -421,7 +421,7 @@ async def delete_task(_: Client, message: types.CallbackQuery) -> None:
 async def confirm_delete_task(_: Client, message: types.Message) -> None:
     """Handler for confirming the deletion of a task when editing."""
     data: dict = get_fsm_context().get_data(telegram_id=message.from_user.id)
-    tasks_controller.delete_task(
+    await tasks_controller.delete_task(
         owner_telegram_id=data.get('owner_telegram_id'),
         id_task=data.get('editor_task_id')
     )
@@ -433,6 +433,18 @@ async def confirm_delete_task(_: Client, message: types.Message) -> None:
     await edit_tasks(_=_, message=message)
 
 
+def get_text_task_not_found(id_task: int) -> str:
+    """
+        Function for creating the text sent when the edited task no longer exists.
+
+        Options:
+        - id_task: ID of the task
+
+        Returns: Message text
+    """
+    return f"Задача под номером {id_task} не была найдена в базе данных"
+
+
 def create_text_and_buttons_edit(
     owner_telegram_id: int,
     is_owner: bool = False
@@ -518,7 +530,7 @@ async def call_send_state(
         reply_markup=reply_markup
     )
     await telegram_utils.send_messages()
-    get_fsm_context().update_state(
+    await get_fsm_context().update_state(
         telegram_id=message.from_user.id,
         state=state
     )
@@ -0,0 +1,63 @@
+from pyrogram import filters, Client, types
+
+from app.bot_init.bot_init import client_bot
+from app.fsm_context.fsm_context import get_fsm_context
+from app.root.filters import get_filters
+from app.tasks_manager import tasks_export
+from app.tasks_manager.handlers import get_back_buttons
+from app.utils import TelegramUtils
+
+
+@client_bot.on_callback_query(
+    filters.regex("tasks:export_tasks:") &
+    get_filters().message_filter(state="tasks", is_regex=True)
+)
+async def export_tasks(_: Client, message: types.CallbackQuery) -> None:
+    """Handler for the task export button in the menu."""
+    owner_telegram_id = int(message.data.split(":")[-1])
+    text_message = (
+        "Выберите формат документа для экспорта задач:\n\n"
+        "1) CSV - таблица, которую можно снова импортировать в бота\n"
+        "2) iCalendar - файл .ics для добавления задач в календарь\n"
+    )
+    inline_keyboard = list()
+    inline_keyboard.append([types.InlineKeyboardButton(
+        text="Экспортировать в CSV",
+        callback_data=f"tasks:export:csv:{owner_telegram_id}"
+    )])
+    inline_keyboard.append([types.InlineKeyboardButton(
+        text="Экспортировать в iCalendar",
+        callback_data=f"tasks:export:ics:{owner_telegram_id}"
+    )])
+    inline_keyboard += get_back_buttons(owner_telegram_id=owner_telegram_id).inline_keyboard
+    reply_markup = types.InlineKeyboardMarkup(inline_keyboard=inline_keyboard)
+    telegram_utils = TelegramUtils(
+        text=text_message,
+        reply_markup=reply_markup,
+        message=message
+    )
+    await telegram_utils.send_messages()
+    await get_fsm_context().update_state(
+        telegram_id=message.from_user.id,
+        state="tasks:export"
+    )
+
+
+@client_bot.on_callback_query(
+    filters.regex("tasks:export:") &
+    get_filters().message_filter(state="tasks:export")
+)
+async def send_export_document(client: Client, message: types.CallbackQuery) -> None:
+    """Handler for sending the document with exported tasks."""
+    export_format = message.data.split(":")[-2]
+    owner_telegram_id = int(message.data.split(":")[-1])
+    with await tasks_export.export_tasks(
+        owner_telegram_id=owner_telegram_id,
+        export_format=export_format
+    ) as document:
+        await client.send_document(
+            chat_id=message.from_user.id,
+            document=document,
+            file_name=f"tasks.{export_format}"
+        )
+    await export_tasks(_=client, message=message)
@@ -33,8 +33,12 @@ async def tasks_menu(
             "ИМЕЕТ ВОЗМОЖНОСТЬ СОЗДАВАТЬ НОВЫЕ ЗАДАЧИ;\n"
             "Данное меню позволяет выполнить следующие действия:\n\n"
             "1) Создать новую задачу;\n"
-            "2) Посмотреть созданные задачи;\n"
-            "3) Редактировать созданные задачи;\n"
+            "2) Импортировать задачи из документа;\n"
+            "3) Посмотреть созданные задачи;\n"
+            "4) Найти задачу по названию или описанию;\n"
+            "5) Редактировать созданные задачи;\n"
+            "6) Экспортировать задачи в CSV или iCalendar;\n"
+            "7) Посмотреть статистику выполнения задач;\n"
         )
         inline_keyboard = list()
         if is_owner:
@@ -42,14 +46,31 @@ async def tasks_menu(
                 text="Создать новую задачу",
                 callback_data=f"tasks:create_task:{data.get('owner_telegram_id')}"
             )])
+            inline_keyboard.append([types.InlineKeyboardButton(
+                text="Импортировать задачи",
+                callback_data=f"tasks:import_tasks:{data.get('owner_telegram_id')}"
+            )])
         inline_keyboard.append([types.InlineKeyboardButton(
             text="Просмотреть созданные задачи",
             callback_data=f"tasks:view_tasks:{data.get('owner_telegram_id')}"
         )])
+        inline_keyboard.append([types.InlineKeyboardButton(
+            text="Найти задачу",
+            callback_data=f"tasks:search_tasks:{data.get('owner_telegram_id')}"
+        )])
         inline_keyboard.append([types.InlineKeyboardButton(
             text="Редактировать созданные задачи",
             callback_data=f"tasks:edit_tasks:{data.get('owner_telegram_id')}"
         )])
+        inline_keyboard.append([types.InlineKeyboardButton(
+            text="Экспортировать задачи",
+            callback_data=f"tasks:export_tasks:{data.get('owner_telegram_id')}"
+        )])
+        if is_owner:
+            inline_keyboard.append([types.InlineKeyboardButton(
+                text="Статистика задач",
+                callback_data=f"tasks:statistics:{data.get('owner_telegram_id')}"
+            )])
         inline_keyboard.append([types.InlineKeyboardButton(
             text="Вернуться в главное меню",
             callback_data=f"main_menu:{data.get('owner_telegram_id')}"
@@ -58,7 +79,7 @@ async def tasks_menu(
             inline_keyboard=inline_keyboard
         )
         state = "tasks"
-        get_fsm_context().update_state(
+        await get_fsm_context().update_state(
             telegram_id=message.from_user.id,
             state=state
         )
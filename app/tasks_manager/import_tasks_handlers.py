@@ -0,0 +1,138 @@
+import io
+import os
+import tempfile
+
+from pyrogram import filters, Client, types
+
+from app import config
+from app.auth_manager import auth_controller
+from app.bot_init.bot_init import client_bot
+from app.fsm_context.fsm_context import get_fsm_context
+from app.offload import OffloadRejectedError, OffloadTimeoutError
+from app.root.filters import get_filters
+from app.tasks_manager import tasks_import
+from app.tasks_manager.handlers import get_back_buttons, tasks_menu
+from app.utils import TelegramUtils
+
+MAX_REPORT_ERRORS = 10
+
+
+@client_bot.on_callback_query(
+    filters.regex("tasks:import_tasks:") &
+    get_filters().message_filter(state="tasks")
+)
+async def import_tasks(_: Client, message: types.CallbackQuery) -> None:
+    """Handler for the bulk task import button in the menu."""
+    owner_telegram_id = int(message.data.split(":")[-1])
+    reply_markup = None
+    is_owner = auth_controller.check_user_is_owner(
+        user_telegram_id=message.from_user.id,
+        owner_telegram_id=owner_telegram_id
+    )
+    if is_owner:
+        text_message = (
+            "Отправьте документ с задачами в формате CSV, JSON или JSONL.\n\n"
+            "CSV файл должен содержать заголовок с колонками task_name, description, "
+            "start_time, end_time и необязательными status, completion_time. "
+            "JSON файл должен содержать массив объектов с такими же ключами, "
+            "JSONL файл - по одному объекту на строку.\n\n"
+            "Даты указываются в формате DD.MM.YYYY HH:MM по Гринвичу или в формате ISO 8601"
+        )
+        reply_markup = get_back_buttons(owner_telegram_id=owner_telegram_id)
+        await get_fsm_context().update_state(
+            telegram_id=message.from_user.id,
+            state="tasks:import"
+        )
+    else:
+        text_message = (
+            "Вы не имеете доступ к данному функционалу"
+        )
+    telegram_utils = TelegramUtils(
+        text=text_message,
+        reply_markup=reply_markup,
+        message=message
+    )
+    await telegram_utils.send_messages()
+    if not is_owner:
+        return await tasks_menu(_=_, message=message)
+
+
+@client_bot.on_message(
+    filters.document &
+    get_filters().message_filter(state="tasks:import")
+)
+async def import_tasks_document(client: Client, message: types.Message) -> None:
+    """Handler for the uploaded document with tasks."""
+    data = get_fsm_context().get_data(telegram_id=message.from_user.id)
+    file_name = message.document.file_name or str()
+    if os.path.splitext(file_name.lower())[1] not in tasks_import.IMPORT_FORMATS:
+        text_message = "Поддерживаются только документы в формате CSV, JSON или JSONL"
+    elif message.document.file_size > config.IMPORT_MAX_FILE_SIZE:
+        text_message = (
+            f"Размер документа не должен превышать {config.IMPORT_MAX_FILE_SIZE // (1024 * 1024)} МБ"
+        )
+    else:
+        with tempfile.TemporaryDirectory() as directory:
+            path = await client.download_media(
+                message=message,
+                file_name=os.path.join(directory, "tasks_import")
+            )
+            try:
+                with open(path, "rb") as document:
+                    report = await tasks_import.import_tasks(
+                        owner_telegram_id=data.get('owner_telegram_id'),
+                        document=document,
+                        file_name=file_name
+                    )
+            except tasks_import.ImportFormatError as error:
+                report = None
+                text_message = f"Задачи не были импортированы: {error}"
+            except (OffloadRejectedError, OffloadTimeoutError):
+                report = None
+                text_message = "Бот сейчас перегружен, задачи не были импортированы. Попробуйте позже"
+        if report:
+            text_message = get_text_import_report(report=report)
+            if len(report.errors) > MAX_REPORT_ERRORS:
+                await send_import_errors(chat_id=message.from_user.id, report=report)
+    reply_markup = get_back_buttons(owner_telegram_id=data.get('owner_telegram_id'))
+    telegram_utils = TelegramUtils(
+        text=text_message,
+        reply_markup=reply_markup,
+        message=message
+    )
+    await telegram_utils.send_messages()
+
+
+def get_text_import_report(report: tasks_import.ImportReport) -> str:
+    """
+        Function for creating the text of the import report.
+
+        Options:
+        - report: Import report
+
+        Returns: Message text
+    """
+    text_message = f"Импортировано задач: {report.imported}\n"
+    if report.errors:
+        text_message += f"Пропущено строк с ошибками: {len(report.errors)}\n\n"
+        text_message += "\n".join(
+            f"Строка {row_number}: {error}" for row_number, error in report.errors[:MAX_REPORT_ERRORS]
+        )
+        if len(report.errors) > MAX_REPORT_ERRORS:
+            text_message += "\n\nПолный список ошибок отправлен отдельным документом"
+    return text_message
+
+
+async def send_import_errors(chat_id: int, report: tasks_import.ImportReport) -> None:
+    """
+        Function for sending the full list of import errors as a document.
+
+        Options:
+        - chat_id: ID of the chat
+        - report: Import report
+    """
+    document = io.BytesIO("\n".join(
+        f"Строка {row_number}: {error}" for row_number, error in report.errors
+    ).encode())
+    document.name = "import_errors.txt"
+    await client_bot.send_document(chat_id=chat_id, document=document)
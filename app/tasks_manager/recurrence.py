@@ -0,0 +1,355 @@
+"""
+Recurring tasks.
+
+A recurring task is stored once: its row keeps the first occurrence (start_time and end_time) and the
+recurrence rule (recurrence_unit and recurrence_interval), and the row stays in the "recurring" status
+until the whole series is completed. Occurrences are never stored. They are produced lazily by
+a generator for the requested time window, so a series without an end costs one row however far
+ahead it is listed. The only stored occurrences are the completed ones, as exception rows of the
+task_occurrence_exceptions table keyed by (id_task, occurrence_start).
+"""
+
+import calendar
+import re
+from dataclasses import dataclass
+from datetime import datetime, timedelta, UTC
+from typing import Iterator
+
+from app.db.db_config import AsyncSession
+from app.db.models import UserTasks
+from app.db.router import read_session
+from app.db.statements import get_statement_registry
+
+RECURRENCE_UNITS = {
+    "d": "day",
+    "д": "day",
+    "w": "week",
+    "н": "week",
+    "m": "month",
+    "м": "month"
+}
+RECURRENCE_UNIT_WORDS = {
+    "day": ("каждый день", ("день", "дня", "дней")),
+    "week": ("каждую неделю", ("неделю", "недели", "недель")),
+    "month": ("каждый месяц", ("месяц", "месяца", "месяцев"))
+}
+RECURRENCE_RULE_REGEX = re.compile(r'^(\d{0,3})\s*([a-zа-я])$')
+
+GET_OCCURRENCE_EXCEPTIONS = get_statement_registry().register(
+    name="tasks.get_occurrence_exceptions",
+    sql=(
+        "SELECT id_task, occurrence_start, completion_time FROM task_occurrence_exceptions "
+        "WHERE id_task = ANY(:ids_tasks) "
+        "AND occurrence_start >= :start_time AND occurrence_start <= :end_time"
+    )
+)
+# Only occurrences of the owner's open series can be completed
+INSERT_OCCURRENCE_EXCEPTION = get_statement_registry().register(
+    name="tasks.insert_occurrence_exception",
+    sql=(
+        "INSERT INTO task_occurrence_exceptions (id_task, occurrence_start) "
+        "SELECT id_task, :occurrence_start FROM user_tasks "
+        "WHERE id_task =:id_task AND owner_telegram_id =:owner_telegram_id "
+        "AND task_status = 'recurring' "
+        "ON CONFLICT DO NOTHING "
+        "RETURNING id_task"
+    )
+)
+
+
+@dataclass
+class TaskOccurrence:
+    """
+    Occurrence of a recurring task, with the same attributes as a task row.
+
+    Options:
+        id_task (int): ID of the recurring task.
+        owner_telegram_id (int): Telegram user ID.
+        task_name (str): Name of the task.
+        description (str): Description of the task.
+        start_time (datetime): Start time of the occurrence.
+        end_time (datetime): End time of the occurrence.
+        completion_time (datetime | None): Completion time of the occurrence.
+        status (bool): Whether the occurrence is completed.
+        task_status (str): State of the occurrence: pending, active, overdue or done.
+        recurrence_unit (str): Unit of the recurrence rule.
+        recurrence_interval (int): Interval of the recurrence rule in units.
+        row_version (int): Version of the recurring task row.
+    """
+    id_task: int
+    owner_telegram_id: int
+    task_name: str
+    description: str
+    start_time: datetime
+    end_time: datetime
+    completion_time: datetime | None
+    status: bool
+    task_status: str
+    recurrence_unit: str
+    recurrence_interval: int
+    row_version: int
+
+
+def parse_recurrence(text: str) -> tuple[str | None, int] | None:
+    """
+    Parse a recurrence rule entered by the user.
+
+    The rule is a unit letter (d/д - days, w/н - weeks, m/м - months) with an optional interval
+    before it, for example "d" or "3d". "0" means that the task does not repeat.
+
+    Options:
+        text (str): Entered rule.
+
+    Returns:
+        tuple[str | None, int] | None: Unit and interval, (None, 1) for a task that does not repeat,
+        or None if the rule is invalid.
+    """
+    text = text.strip().lower()
+    if text == "0":
+        return None, 1
+    match = RECURRENCE_RULE_REGEX.match(text)
+    if not match or match.group(2) not in RECURRENCE_UNITS or match.group(1).startswith("0"):
+        return None
+    return RECURRENCE_UNITS[match.group(2)], int(match.group(1) or 1)
+
+
+def get_text_recurrence(recurrence_unit: str, recurrence_interval: int) -> str:
+    """
+    Describe a recurrence rule, for example "каждые 3 дня".
+
+    Options:
+        recurrence_unit (str): Unit of the rule.
+        recurrence_interval (int): Interval of the rule in units.
+
+    Returns:
+        str: Description of the rule.
+    """
+    every_one, forms = RECURRENCE_UNIT_WORDS[recurrence_unit]
+    if recurrence_interval == 1:
+        return every_one
+    if recurrence_interval % 10 == 1 and recurrence_interval % 100 != 11:
+        form = forms[0]
+    elif recurrence_interval % 10 in (2, 3, 4) and recurrence_interval % 100 not in (12, 13, 14):
+        form = forms[1]
+    else:
+        form = forms[2]
+    return f"каждые {recurrence_interval} {form}"
+
+
+def add_months(time: datetime, months: int) -> datetime:
+    """Move the time by a number of months, the day is clamped to the length of the month."""
+    month_index = time.month - 1 + months
+    year, month = time.year + month_index // 12, month_index % 12 + 1
+    return time.replace(year=year, month=month, day=min(time.day, calendar.monthrange(year, month)[1]))
+
+
+def get_occurrence_start(task: UserTasks, index: int) -> datetime:
+    """Get the start time of the occurrence with the index, counted from the first one."""
+    if task.recurrence_unit == "month":
+        return add_months(task.start_time, task.recurrence_interval * index)
+    days = 7 if task.recurrence_unit == "week" else 1
+    return task.start_time + timedelta(days=days * task.recurrence_interval * index)
+
+
+def get_first_index(task: UserTasks, window_start: datetime) -> int:
+    """Estimate the index of the first occurrence ending after the window start, never overestimating it."""
+    if window_start <= task.end_time:
+        return 0
+    if task.recurrence_unit == "month":
+        months = (window_start.year - task.end_time.year) * 12 + window_start.month - task.end_time.month
+        return max(months // task.recurrence_interval - 1, 0)
+    days = 7 if task.recurrence_unit == "week" else 1
+    return (window_start - task.end_time) // timedelta(days=days * task.recurrence_interval)
+
+
+def iter_occurrences(
+    task: UserTasks,
+    window_start: datetime,
+    window_end: datetime
+) -> Iterator[tuple[datetime, datetime]]:
+    """
+    Generate the occurrences of a recurring task that overlap the window.
+
+    Occurrences before the window are skipped arithmetically, so the cost depends on the size
+    of the window and not on the age of the series. Every occurrence is computed from the first one,
+    so monthly occurrences do not drift after short months.
+
+    Options:
+        task (UserTasks): Recurring task.
+        window_start (datetime): Occurrences ending at or before this time are skipped.
+        window_end (datetime): Occurrences starting at or after this time are not generated.
+
+    Yields:
+        tuple[datetime, datetime]: Start and end time of an occurrence.
+    """
+    duration = task.end_time - task.start_time
+    index = get_first_index(task=task, window_start=window_start)
+    while True:
+        start_time = get_occurrence_start(task=task, index=index)
+        if start_time >= window_end:
+            return
+        if start_time + duration > window_start:
+            yield start_time, start_time + duration
+        index += 1
+
+
+def get_next_occurrence_end(task: UserTasks, after_time: datetime) -> datetime:
+    """Get the end time of the first occurrence of a recurring task ending after the time."""
+    duration = task.end_time - task.start_time
+    index = get_first_index(task=task, window_start=after_time)
+    while get_occurrence_start(task=task, index=index) + duration <= after_time:
+        index += 1
+    return get_occurrence_start(task=task, index=index) + duration
+
+
+def is_occurrence_start(task: UserTasks, start_time: datetime) -> bool:
+    """Check that an occurrence of the recurring task starts at the time."""
+    return any(
+        occurrence_start == start_time
+        for occurrence_start, _ in iter_occurrences(
+            task=task,
+            window_start=start_time,
+            window_end=start_time + timedelta(microseconds=1)
+        )
+    )
+
+
+def make_occurrence(
+    task: UserTasks,
+    start_time: datetime,
+    end_time: datetime,
+    completion_time: datetime | None = None,
+    now: datetime | None = None
+) -> TaskOccurrence:
+    """
+    Create an occurrence of a recurring task.
+
+    Options:
+        task (UserTasks): Recurring task.
+        start_time (datetime): Start time of the occurrence.
+        end_time (datetime): End time of the occurrence.
+        completion_time (datetime | None): Completion time if the occurrence is completed.
+        now (datetime | None): Current time used for the state of the occurrence.
+
+    Returns:
+        TaskOccurrence: The occurrence.
+    """
+    now = now or datetime.now(UTC)
+    return TaskOccurrence(
+        id_task=task.id_task,
+        owner_telegram_id=task.owner_telegram_id,
+        task_name=task.task_name,
+        description=task.description,
+        start_time=start_time,
+        end_time=end_time,
+        completion_time=completion_time,
+        status=completion_time is not None,
+        task_status=(
+            "done" if completion_time else "overdue" if end_time <= now
+            else "active" if start_time <= now else "pending"
+        ),
+        recurrence_unit=task.recurrence_unit,
+        recurrence_interval=task.recurrence_interval,
+        row_version=task.row_version
+    )
+
+
+async def get_occurrence_exceptions(
+    ids_tasks: list[int],
+    start_time: datetime,
+    end_time: datetime
+) -> dict[tuple[int, datetime], datetime]:
+    """
+    Get the completed occurrences of recurring tasks.
+
+    Options:
+        ids_tasks (list[int]): IDs of the recurring tasks.
+        start_time (datetime): Earliest occurrence start.
+        end_time (datetime): Latest occurrence start.
+
+    Returns:
+        dict[tuple[int, datetime], datetime]: Completion times by (id_task, occurrence_start).
+    """
+    if not ids_tasks:
+        return dict()
+    async with read_session(GET_OCCURRENCE_EXCEPTIONS) as session:
+        list_exceptions = (await GET_OCCURRENCE_EXCEPTIONS.execute(
+            session,
+            {
+                "ids_tasks": ids_tasks,
+                "start_time": start_time,
+                "end_time": end_time
+            }
+        )).all()
+    return {(x.id_task, x.occurrence_start): x.completion_time for x in list_exceptions}
+
+
+async def get_occurrences(
+    list_tasks: list[UserTasks],
+    window_start: datetime,
+    window_end: datetime,
+    now: datetime | None = None
+) -> list[TaskOccurrence]:
+    """
+    Expand recurring tasks into their occurrences overlapping the window.
+
+    Options:
+        list_tasks (list[UserTasks]): Recurring tasks.
+        window_start (datetime): Start of the window.
+        window_end (datetime): End of the window.
+        now (datetime | None): Current time used for the state of the occurrences.
+
+    Returns:
+        list[TaskOccurrence]: Occurrences ordered by start time, completed ones included.
+    """
+    list_occurrences = [
+        (task, start_time, end_time)
+        for task in list_tasks
+        for start_time, end_time in iter_occurrences(task=task, window_start=window_start, window_end=window_end)
+    ]
+    if not list_occurrences:
+        return list()
+    exceptions = await get_occurrence_exceptions(
+        ids_tasks=list({task.id_task for task, _, _ in list_occurrences}),
+        start_time=min(start_time for _, start_time, _ in list_occurrences),
+        end_time=max(start_time for _, start_time, _ in list_occurrences)
+    )
+    return sorted(
+        (
+            make_occurrence(
+                task=task,
+                start_time=start_time,
+                end_time=end_time,
+                completion_time=exceptions.get((task.id_task, start_time)),
+                now=now
+            )
+            for task, start_time, end_time in list_occurrences
+        ),
+        key=lambda x: (x.start_time, x.id_task)
+    )
+
+
+async def complete_occurrence(id_task: int, owner_telegram_id: int, occurrence_start: datetime) -> bool:
+    """
+    Mark an occurrence of a recurring task as completed.
+
+    Options:
+        id_task (int): ID of the recurring task.
+        owner_telegram_id (int): Telegram user ID.
+        occurrence_start (datetime): Start time of the occurrence.
+
+    Returns:
+        bool: False if the task is not an open recurring task of the owner
+        or the occurrence was already completed.
+    """
+    async with AsyncSession() as session:
+        is_completed = (await INSERT_OCCURRENCE_EXCEPTION.execute(
+            session,
+            {
+                "id_task": id_task,
+                "owner_telegram_id": owner_telegram_id,
+                "occurrence_start": occurrence_start
+            }
+        )).first() is not None
+        await session.commit()
+    return is_completed
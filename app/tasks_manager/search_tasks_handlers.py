@@ -0,0 +1,131 @@
+from pyrogram import filters, Client, types
+
+from app.bot_init.bot_init import client_bot
+from app.fsm_context.fsm_context import get_fsm_context
+from app.root.filters import get_filters
+from app.tasks_manager import tasks_search
+from app.tasks_manager.edit_tasks_handlers import choice_task
+from app.tasks_manager.handlers import get_back_buttons
+from app.utils import TelegramUtils
+
+MAX_TASK_NAME_LENGTH = 50
+
+
+@client_bot.on_callback_query(
+    filters.regex("tasks:search_tasks:") &
+    get_filters().message_filter(state="tasks", is_regex=True)
+)
+async def search_tasks(_: Client, message: types.CallbackQuery) -> None:
+    """Handler for the task search button in the menu."""
+    owner_telegram_id = int(message.data.split(":")[-1])
+    text_message = (
+        "Введите слова из названия или описания задачи.\n\n"
+        "Фразу можно взять в кавычки, а слово, которого не должно быть в задаче, "
+        "указать со знаком минус"
+    )
+    reply_markup = get_back_buttons(owner_telegram_id=owner_telegram_id)
+    telegram_utils = TelegramUtils(
+        text=text_message,
+        reply_markup=reply_markup,
+        message=message
+    )
+    await telegram_utils.send_messages()
+    await get_fsm_context().update_state(
+        telegram_id=message.from_user.id,
+        state="tasks:search"
+    )
+
+
+@client_bot.on_message(
+    filters.text &
+    get_filters().message_filter(state="tasks:search", is_regex=True)
+)
+async def set_search_query(_: Client, message: types.Message) -> None:
+    """Handler for the search query."""
+    data: dict = get_fsm_context().get_data(telegram_id=message.from_user.id)
+    data['search_query'] = message.text.strip()
+    data['search_page'] = 0
+    await get_fsm_context().update_data(telegram_id=message.from_user.id, data=data)
+    await send_search_results(message=message)
+
+
+@client_bot.on_callback_query(
+    filters.regex("tasks:search:page:") &
+    get_filters().message_filter(state="tasks:search:results")
+)
+async def search_pagination_button(_: Client, message: types.CallbackQuery) -> None:
+    """Handler for pagination buttons of the search results."""
+    data: dict = get_fsm_context().get_data(telegram_id=message.from_user.id)
+    data['search_page'] = max(int(message.data.split(":")[-2]), 0)
+    await get_fsm_context().update_data(telegram_id=message.from_user.id, data=data)
+    await send_search_results(message=message)
+
+
+@client_bot.on_callback_query(
+    filters.regex("tasks:search:open:") &
+    get_filters().message_filter(state="tasks:search:results")
+)
+async def open_found_task(_: Client, message: types.CallbackQuery) -> None:
+    """Handler for opening a found task in the task editor."""
+    await get_fsm_context().update_state(
+        telegram_id=message.from_user.id,
+        state="tasks:edit"
+    )
+    await choice_task(_=_, message=message)
+
+
+async def send_search_results(message: types.Message | types.CallbackQuery) -> None:
+    """
+       Function for sending a page of the search results.
+
+       Options:
+       - message: CallbackQuery or Message object
+    """
+    data: dict = get_fsm_context().get_data(telegram_id=message.from_user.id)
+    owner_telegram_id = int(data.get('owner_telegram_id'))
+    search_page = await tasks_search.search_tasks(
+        owner_telegram_id=owner_telegram_id,
+        query=data.get('search_query', str()),
+        page=data.get('search_page', 0)
+    )
+    inline_keyboard = list()
+    if not search_page.list_tasks:
+        text_message = "По вашему запросу задачи не найдены. Попробуйте изменить запрос"
+    else:
+        text_message = f"Результаты поиска, страница {search_page.page + 1}:\n\n" + "\n".join(
+            f"№ {task.id_task} - {task.task_name[:MAX_TASK_NAME_LENGTH]}"
+            f"{'...' if len(task.task_name) > MAX_TASK_NAME_LENGTH else ''}"
+            for task in search_page.list_tasks
+        )
+        inline_keyboard += [
+            [types.InlineKeyboardButton(
+                text=str(task.id_task),
+                callback_data=f"tasks:search:open:{task.id_task}:{owner_telegram_id}"
+            ) for task in search_page.list_tasks[x:x + 2]]
+            for x in range(0, len(search_page.list_tasks), 2)
+        ]
+        page_buttons = list()
+        if search_page.page:
+            page_buttons.append(types.InlineKeyboardButton(
+                text="Предыдущие результаты",
+                callback_data=f"tasks:search:page:{search_page.page - 1}:{owner_telegram_id}"
+            ))
+        if search_page.has_next:
+            page_buttons.append(types.InlineKeyboardButton(
+                text="Следующие результаты",
+                callback_data=f"tasks:search:page:{search_page.page + 1}:{owner_telegram_id}"
+            ))
+        inline_keyboard.append(page_buttons)
+        text_message += "\n\nВыберите задачу или отправьте новый запрос"
+    inline_keyboard += get_back_buttons(owner_telegram_id=owner_telegram_id).inline_keyboard
+    reply_markup = types.InlineKeyboardMarkup(inline_keyboard=inline_keyboard)
+    telegram_utils = TelegramUtils(
+        text=text_message,
+        reply_markup=reply_markup,
+        message=message
+    )
+    await telegram_utils.send_messages()
+    await get_fsm_context().update_state(
+        telegram_id=message.from_user.id,
+        state="tasks:search:results"
+    )
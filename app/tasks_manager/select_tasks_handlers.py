@@ -0,0 +1,321 @@
+from pyrogram import filters, Client, types
+
+from app.auth_manager import auth_controller
+from app.bot_init.bot_init import client_bot
+from app.db.models import UserTasks
+from app.fsm_context.fsm_context import get_fsm_context
+from app.root.filters import get_filters
+from app.tasks_manager import tasks_controller
+from app.tasks_manager.handlers import get_back_buttons
+from app.tasks_manager.task_selection import TaskSelection
+from app.utils import TelegramUtils
+
+PAGE_SIZE = 10
+# Largest number of days the end time of the selected tasks can be moved by
+MAX_SHIFT_DAYS = 3650
+
+
+@client_bot.on_callback_query(
+    filters.regex("tasks:select:start:") &
+    get_filters().message_filter(state="tasks:edit", is_regex=True)
+)
+async def select_tasks(_: Client, message: types.CallbackQuery) -> None:
+    """Handler for switching the task editor to the multi-select mode."""
+    owner_telegram_id = int(message.data.split(":")[-1])
+    await reload_selection(message=message, owner_telegram_id=owner_telegram_id)
+    await send_selection_menu(message=message, owner_telegram_id=owner_telegram_id)
+
+
+@client_bot.on_callback_query(
+    filters.regex("tasks:select:(toggle|all|none|page|show):") &
+    get_filters().message_filter(state="tasks:edit:select", is_regex=True)
+)
+async def change_selection(_: Client, message: types.CallbackQuery) -> None:
+    """Handler for selecting tasks and turning pages in the multi-select mode."""
+    data: dict = get_fsm_context().get_data(telegram_id=message.from_user.id)
+    action = message.data.split(":")[2]
+    owner_telegram_id = int(message.data.split(":")[-1])
+    selection = TaskSelection.from_hex(data.get('editor_task_selection'))
+    list_ids_tasks: list[int] = data.get('editor_task_list_ids', list())
+    if action == "toggle":
+        index = int(message.data.split(":")[-2])
+        if index < len(list_ids_tasks):
+            selection.toggle(index=index)
+    elif action == "all":
+        selection.select_all(size=len(list_ids_tasks))
+    elif action == "none":
+        selection.clear()
+    elif action == "page":
+        pagination = data.get('selector_task_pagination', 0) + (
+            -PAGE_SIZE if message.data.split(":")[-2] == "previous" else PAGE_SIZE)
+        data['selector_task_pagination'] = min(max(pagination, 0), max(len(list_ids_tasks) - 1, 0))
+    data['editor_task_selection'] = selection.to_hex()
+    await get_fsm_context().update_data(telegram_id=message.from_user.id, data=data)
+    await send_selection_menu(message=message, owner_telegram_id=owner_telegram_id)
+
+
+@client_bot.on_callback_query(
+    filters.regex("tasks:select:complete:") &
+    get_filters().message_filter(state="tasks:edit:select")
+)
+async def complete_selected_tasks(_: Client, message: types.CallbackQuery) -> None:
+    """Handler for completing all selected tasks."""
+    owner_telegram_id = int(message.data.split(":")[-1])
+    completed_ids_tasks: list[int] = await tasks_controller.complete_tasks(
+        owner_telegram_id=owner_telegram_id,
+        ids_tasks=get_selected_ids_tasks(telegram_id=message.from_user.id)
+    )
+    text_message = f"Завершено задач: {len(completed_ids_tasks)}"
+    telegram_utils = TelegramUtils(text=text_message, message=message)
+    await telegram_utils.send_messages()
+    await send_selection_menu(message=message, owner_telegram_id=owner_telegram_id)
+
+
+@client_bot.on_callback_query(
+    filters.regex("tasks:select:delete:") &
+    get_filters().message_filter(state="tasks:edit:select")
+)
+async def delete_selected_tasks(_: Client, message: types.CallbackQuery) -> None:
+    """Handler for deleting all selected tasks."""
+    owner_telegram_id = int(message.data.split(":")[-1])
+    text_message = (
+        "Вы точно хотите удалить выбранные задачи "
+        f"({len(get_selected_ids_tasks(telegram_id=message.from_user.id))} шт.)"
+    )
+    inline_keyboard = list()
+    inline_keyboard.append([
+        types.InlineKeyboardButton(
+            text="Да",
+            callback_data=f"tasks:select:confirm_delete:{owner_telegram_id}"
+        ),
+        types.InlineKeyboardButton(
+            text="Нет",
+            callback_data=f"tasks:select:show:{owner_telegram_id}"
+        )
+    ])
+    reply_markup = types.InlineKeyboardMarkup(inline_keyboard=inline_keyboard)
+    telegram_utils = TelegramUtils(
+        text=text_message,
+        message=message,
+        reply_markup=reply_markup
+    )
+    await telegram_utils.send_messages()
+
+
+@client_bot.on_callback_query(
+    filters.regex("tasks:select:confirm_delete:") &
+    get_filters().message_filter(state="tasks:edit:select")
+)
+async def confirm_delete_selected_tasks(_: Client, message: types.CallbackQuery) -> None:
+    """Handler for confirming the deletion of all selected tasks."""
+    owner_telegram_id = int(message.data.split(":")[-1])
+    if auth_controller.check_user_is_owner(
+        user_telegram_id=message.from_user.id,
+        owner_telegram_id=owner_telegram_id
+    ):
+        deleted_ids_tasks: list[int] = await tasks_controller.delete_tasks(
+            owner_telegram_id=owner_telegram_id,
+            ids_tasks=get_selected_ids_tasks(telegram_id=message.from_user.id)
+        )
+        text_message = f"Удалено задач: {len(deleted_ids_tasks)}"
+    else:
+        text_message = "Вы не имеете доступ к данному функционалу"
+    telegram_utils = TelegramUtils(text=text_message, message=message)
+    await telegram_utils.send_messages()
+    await reload_selection(message=message, owner_telegram_id=owner_telegram_id)
+    await send_selection_menu(message=message, owner_telegram_id=owner_telegram_id)
+
+
+@client_bot.on_callback_query(
+    filters.regex("tasks:select:shift:") &
+    get_filters().message_filter(state="tasks:edit:select")
+)
+async def shift_selected_tasks(_: Client, message: types.CallbackQuery) -> None:
+    """Handler for moving the end time of all selected tasks."""
+    owner_telegram_id = int(message.data.split(":")[-1])
+    text_message = (
+        "Введите количество дней, на которое нужно перенести срок завершения выбранных задач. "
+        "Чтобы перенести срок на более ранний, введите отрицательное число"
+    )
+    inline_keyboard = [[types.InlineKeyboardButton(
+        text="Вернуться назад",
+        callback_data=f"tasks:select:show:{owner_telegram_id}"
+    )]]
+    reply_markup = types.InlineKeyboardMarkup(inline_keyboard=inline_keyboard)
+    telegram_utils = TelegramUtils(
+        text=text_message,
+        message=message,
+        reply_markup=reply_markup
+    )
+    await telegram_utils.send_messages()
+    await get_fsm_context().update_state(
+        telegram_id=message.from_user.id,
+        state="tasks:edit:select:shift"
+    )
+
+
+@client_bot.on_message(
+    filters.text &
+    get_filters().message_filter(state="tasks:edit:select:shift")
+)
+async def set_shift_selected_tasks(_: Client, message: types.Message) -> None:
+    """Handler for setting the number of days to move the end time of the selected tasks."""
+    data: dict = get_fsm_context().get_data(telegram_id=message.from_user.id)
+    owner_telegram_id = int(data.get('owner_telegram_id'))
+    try:
+        days = int(message.text.strip())
+    except ValueError:
+        days = 0
+    if not days or abs(days) > MAX_SHIFT_DAYS:
+        text_message = (
+            "Неверный формат ввода данных. Введите целое число дней, отличное от нуля, "
+            f"от -{MAX_SHIFT_DAYS} до {MAX_SHIFT_DAYS}"
+        )
+        inline_keyboard = [[types.InlineKeyboardButton(
+            text="Вернуться назад",
+            callback_data=f"tasks:select:show:{owner_telegram_id}"
+        )]]
+        telegram_utils = TelegramUtils(
+            text=text_message,
+            message=message,
+            reply_markup=types.InlineKeyboardMarkup(inline_keyboard=inline_keyboard)
+        )
+        return await telegram_utils.send_messages()
+    if auth_controller.check_user_is_owner(
+        user_telegram_id=message.from_user.id,
+        owner_telegram_id=owner_telegram_id
+    ):
+        selected_ids_tasks = get_selected_ids_tasks(telegram_id=message.from_user.id)
+        shifted_ids_tasks: list[int] = await tasks_controller.shift_tasks_end_time(
+            owner_telegram_id=owner_telegram_id,
+            ids_tasks=selected_ids_tasks,
+            days=days
+        )
+        text_message = f"Срок завершения перенесен у задач: {len(shifted_ids_tasks)}"
+        if len(shifted_ids_tasks) < len(selected_ids_tasks):
+            text_message += (
+                f"\nНе перенесено задач: {len(selected_ids_tasks) - len(shifted_ids_tasks)}, "
+                "срок завершения не может быть раньше даты старта"
+            )
+    else:
+        text_message = "Вы не имеете доступ к данному функционалу"
+    telegram_utils = TelegramUtils(text=text_message, message=message)
+    await telegram_utils.send_messages()
+    await send_selection_menu(message=message, owner_telegram_id=owner_telegram_id)
+
+
+def get_selected_ids_tasks(telegram_id: int) -> list[int]:
+    """
+        Function for getting the IDs of the tasks selected by the user.
+
+        Options:
+        - telegram_id: ID of the user
+
+        Returns: IDs of the selected tasks
+    """
+    data: dict = get_fsm_context().get_data(telegram_id=telegram_id)
+    return TaskSelection.from_hex(data.get('editor_task_selection')).get_selected_ids(
+        list_ids_tasks=data.get('editor_task_list_ids', list())
+    )
+
+
+async def reload_selection(
+    message: types.CallbackQuery | types.Message,
+    owner_telegram_id: int
+) -> None:
+    """
+        Function for loading the task list of the multi-select mode and clearing the selection.
+
+        Options:
+        - message: CallbackQuery or Message object
+        - owner_telegram_id: ID of the task owner
+    """
+    data: dict = get_fsm_context().get_data(telegram_id=message.from_user.id)
+    list_user_tasks: list[UserTasks] = await tasks_controller.get_all_tasks(
+        owner_telegram_id=owner_telegram_id
+    )
+    data['editor_task_list_ids'] = [x.id_task for x in list_user_tasks]
+    data['editor_task_selection'] = TaskSelection().to_hex()
+    data['selector_task_pagination'] = 0
+    await get_fsm_context().update_data(telegram_id=message.from_user.id, data=data)
+
+
+async def send_selection_menu(
+    message: types.CallbackQuery | types.Message,
+    owner_telegram_id: int
+) -> None:
+    """
+        Function for sending the task list of the multi-select mode with the bulk action buttons.
+
+        Options:
+        - message: CallbackQuery or Message object
+        - owner_telegram_id: ID of the task owner
+    """
+    data: dict = get_fsm_context().get_data(telegram_id=message.from_user.id)
+    list_ids_tasks: list[int] = data.get('editor_task_list_ids', list())
+    selection = TaskSelection.from_hex(data.get('editor_task_selection'))
+    pagination = data.get('selector_task_pagination', 0)
+    is_owner: bool = auth_controller.check_user_is_owner(
+        user_telegram_id=message.from_user.id,
+        owner_telegram_id=owner_telegram_id
+    )
+    text_message = (
+        "Отметьте задачи, с которыми нужно выполнить действие.\n"
+        f"Выбрано задач: {len(selection)} из {len(list_ids_tasks)}"
+    )
+    page_indexes = list(range(pagination, min(pagination + PAGE_SIZE, len(list_ids_tasks))))
+    inline_keyboard = [
+        [types.InlineKeyboardButton(
+            text=f"{'✅ ' if selection.is_selected(index=index) else ''}{list_ids_tasks[index]}",
+            callback_data=f"tasks:select:toggle:{index}:{owner_telegram_id}"
+        ) for index in page_indexes[x:x + 2]]
+        for x in range(0, len(page_indexes), 2)
+    ]
+    page_buttons = list()
+    if pagination:
+        page_buttons.append(types.InlineKeyboardButton(
+            text="Предыдущие задачи",
+            callback_data=f"tasks:select:page:previous:{owner_telegram_id}"
+        ))
+    if pagination + PAGE_SIZE < len(list_ids_tasks):
+        page_buttons.append(types.InlineKeyboardButton(
+            text="Следующие задачи",
+            callback_data=f"tasks:select:page:next:{owner_telegram_id}"
+        ))
+    inline_keyboard.append(page_buttons)
+    inline_keyboard.append([
+        types.InlineKeyboardButton(
+            text="Выбрать все",
+            callback_data=f"tasks:select:all:{owner_telegram_id}"
+        ),
+        types.InlineKeyboardButton(
+            text="Снять выбор",
+            callback_data=f"tasks:select:none:{owner_telegram_id}"
+        )
+    ])
+    if len(selection):
+        inline_keyboard.append([types.InlineKeyboardButton(
+            text="Завершить выбранные",
+            callback_data=f"tasks:select:complete:{owner_telegram_id}"
+        )])
+        if is_owner:
+            inline_keyboard.append([types.InlineKeyboardButton(
+                text="Перенести срок выбранных",
+                callback_data=f"tasks:select:shift:{owner_telegram_id}"
+            )])
+            inline_keyboard.append([types.InlineKeyboardButton(
+                text="Удалить выбранные",
+                callback_data=f"tasks:select:delete:{owner_telegram_id}"
+            )])
+    inline_keyboard += get_back_buttons(owner_telegram_id=owner_telegram_id).inline_keyboard
+    reply_markup = types.InlineKeyboardMarkup(inline_keyboard=inline_keyboard)
+    telegram_utils = TelegramUtils(
+        text=text_message,
+        reply_markup=reply_markup,
+        message=message
+    )
+    await telegram_utils.send_messages()
+    await get_fsm_context().update_state(
+        telegram_id=message.from_user.id,
+        state="tasks:edit:select"
+    )
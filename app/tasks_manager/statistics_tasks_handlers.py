@@ -0,0 +1,80 @@
+from pyrogram import filters, Client, types
+
+from app.auth_manager import auth_controller
+from app.bot_init.bot_init import client_bot
+from app.root.filters import get_filters
+from app.tasks_manager import tasks_analytics
+from app.tasks_manager.handlers import get_back_buttons, tasks_menu
+from app.utils import TelegramUtils
+
+WEEKDAYS = ("Пн", "Вт", "Ср", "Чт", "Пт", "Сб", "Вс")
+
+
+@client_bot.on_callback_query(
+    filters.regex("tasks:statistics:") &
+    get_filters().message_filter(state="tasks", is_regex=True)
+)
+async def task_statistics(_: Client, message: types.CallbackQuery) -> None:
+    """Handler for the task statistics button in the menu."""
+    owner_telegram_id = int(message.data.split(":")[-1])
+    is_owner = auth_controller.check_user_is_owner(
+        user_telegram_id=message.from_user.id,
+        owner_telegram_id=owner_telegram_id
+    )
+    reply_markup = None
+    if is_owner:
+        statistics = await tasks_analytics.get_statistics(owner_telegram_id=owner_telegram_id)
+        text_message = get_text_statistics(statistics=statistics)
+        reply_markup = get_back_buttons(owner_telegram_id=owner_telegram_id)
+    else:
+        text_message = (
+            "Вы не имеете доступ к данному функционалу"
+        )
+    telegram_utils = TelegramUtils(
+        text=text_message,
+        reply_markup=reply_markup,
+        message=message
+    )
+    await telegram_utils.send_messages()
+    if not is_owner:
+        return await tasks_menu(_=_, message=message)
+
+
+def get_text_statistics(statistics: tasks_analytics.TaskStatistics) -> str:
+    """
+        Generate a text message with the task statistics.
+
+        Options:
+        - statistics (TaskStatistics): Statistics of the owner's tasks.
+
+        Returns:
+        - str: Text message with the statistics.
+    """
+    if not statistics.total:
+        return "У вас пока нет задач для статистики. Повторяющиеся задачи в статистике не учитываются"
+    on_time = (
+        f"{statistics.on_time_ratio:.0%}" if statistics.on_time_ratio is not None else "нет выполненных задач"
+    )
+    lateness = (
+        get_text_duration(seconds=statistics.median_lateness)
+        if statistics.median_lateness is not None else "нет задач, выполненных с опозданием"
+    )
+    return (
+        "Статистика ваших задач (без повторяющихся задач):\n\n"
+        f"Всего задач: {statistics.total}\n"
+        f"Выполнено: {statistics.completed} ({statistics.completion_rate:.0%})\n"
+        f"Выполнено в срок: {on_time}\n"
+        f"Медианное опоздание: {lateness}\n\n"
+        "Задачи по дням недели (по времени старта по Гринвичу):\n" + "\n".join(
+            f"{weekday}: {count}" for weekday, count in zip(WEEKDAYS, statistics.tasks_per_weekday)
+        )
+    )
+
+
+def get_text_duration(seconds: float) -> str:
+    """Format a duration as days, hours and minutes."""
+    minutes = int(seconds // 60)
+    days, hours, minutes = minutes // (24 * 60), minutes // 60 % 24, minutes % 60
+    return " ".join(
+        f"{value} {unit}" for value, unit in ((days, "дн."), (hours, "ч"), (minutes, "мин")) if value
+    ) or "меньше минуты"
@@ -0,0 +1,175 @@
+"""
+Background sweeper of the stored task status.
+
+The task_status column is set by a trigger on every write, but pending tasks become active and
+active tasks become overdue without any write, just because time passes. The sweeper advances
+these tasks in batches read from the partial indexes on start_time and end_time, invalidates the
+cached tasks of the affected owners and sleeps until the next status change is due. A task write wakes
+the sweeper up early only when a written start or end time falls before the planned wakeup; the
+sweeper's own invalidations and writes that do not move deadlines are ignored.
+
+Options:
+    _status_sweeper (StatusSweeper): A single instance of the sweeper used by the application.
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta, UTC
+from typing import Callable
+
+from app import config
+from app.db.db_config import AsyncSession
+from app.db.statements import get_statement_registry, Statement
+from app.tasks_manager.tasks_cache import get_tasks_cache, TasksChange
+
+logger = logging.getLogger(__name__)
+
+RETRY_DELAY = 5
+
+# The trigger recomputes task_status, so a pending task whose end time has also passed becomes overdue
+ACTIVATE_PENDING_TASKS = get_statement_registry().register(
+    name="tasks.sweep_pending",
+    sql=(
+        "UPDATE user_tasks SET task_status = 'active' "
+        "WHERE id_task IN ("
+        "SELECT id_task FROM user_tasks "
+        "WHERE task_status = 'pending' AND start_time <= current_timestamp "
+        "ORDER BY start_time LIMIT :limit FOR UPDATE SKIP LOCKED) "
+        "RETURNING owner_telegram_id"
+    )
+)
+EXPIRE_ACTIVE_TASKS = get_statement_registry().register(
+    name="tasks.sweep_active",
+    sql=(
+        "UPDATE user_tasks SET task_status = 'overdue' "
+        "WHERE id_task IN ("
+        "SELECT id_task FROM user_tasks "
+        "WHERE task_status = 'active' AND end_time <= current_timestamp "
+        "ORDER BY end_time LIMIT :limit FOR UPDATE SKIP LOCKED) "
+        "RETURNING owner_telegram_id"
+    )
+)
+GET_NEXT_STATUS_CHANGE = get_statement_registry().register(
+    name="tasks.next_status_change",
+    sql=(
+        "SELECT least("
+        "(SELECT min(start_time) FROM user_tasks WHERE task_status = 'pending'), "
+        "(SELECT min(end_time) FROM user_tasks WHERE task_status = 'active'))"
+    )
+)
+
+
+class StatusSweeper:
+    """
+    Sweeper advancing pending and active tasks as their start and end times pass.
+
+    Options:
+        batch_size (int): Maximum number of tasks updated by one statement.
+        max_interval (float): Maximum time in seconds between two sweeps.
+        clock (Callable[[], datetime]): Clock returning the current UTC time.
+
+    Methods:
+        sweep() -> float: Advances all due tasks and returns the seconds until the next status change.
+        run() -> None: Runs the sweeper until cancelled.
+        get_stats() -> dict: Gets the sweeper counters.
+    """
+
+    def __init__(
+        self,
+        batch_size: int,
+        max_interval: float,
+        clock: Callable[[], datetime] = lambda: datetime.now(UTC)
+    ):
+        self.batch_size = batch_size
+        self.max_interval = max_interval
+        self.__clock = clock
+        self.__wakeup = asyncio.Event()
+        self.__planned_wakeup: datetime | None = None
+        self.sweeps = 0
+        self.updated = 0
+
+    async def __advance(self, statement: Statement) -> set[int]:
+        """Run the statement batch by batch until no due tasks are left."""
+        owners_telegram_ids: set[int] = set()
+        while True:
+            async with AsyncSession() as session:
+                list_owners: list[int] = (await statement.execute(
+                    session,
+                    {"limit": self.batch_size}
+                )).scalars().all()
+                await session.commit()
+            self.updated += len(list_owners)
+            owners_telegram_ids.update(list_owners)
+            if len(list_owners) < self.batch_size:
+                return owners_telegram_ids
+
+    async def sweep(self) -> float:
+        """
+        Advance all tasks whose start or end time has passed.
+
+        Returns:
+            float: Seconds until the next status change, at most max_interval.
+        """
+        self.sweeps += 1
+        owners_telegram_ids = await self.__advance(statement=ACTIVATE_PENDING_TASKS)
+        owners_telegram_ids |= await self.__advance(statement=EXPIRE_ACTIVE_TASKS)
+        for owner_telegram_id in owners_telegram_ids:
+            get_tasks_cache().invalidate_owner(
+                owner_telegram_id=owner_telegram_id,
+                change=TasksChange(moves_deadlines=False)
+            )
+        async with AsyncSession() as session:
+            next_change: datetime | None = (await GET_NEXT_STATUS_CHANGE.execute(session)).scalar()
+        if next_change is None:
+            return self.max_interval
+        return min(max((next_change - self.__clock()).total_seconds(), 0), self.max_interval)
+
+    def __on_owner_changed(self, _: int, change: TasksChange) -> None:
+        """Wake the sweeper up if a written task may change its status before the planned sweep."""
+        # The sweeper's own invalidations do not move deadlines either
+        if not change.moves_deadlines:
+            return
+        # During a sweep the next wakeup is not planned yet, the write may be missed by its last query
+        if self.__planned_wakeup is None or change.times is None or any(
+            self.__clock() < time < self.__planned_wakeup for time in change.times
+        ):
+            self.__wakeup.set()
+
+    async def run(self) -> None:
+        """Run the sweeper until cancelled."""
+        get_tasks_cache().subscribe(self.__on_owner_changed)
+        while True:
+            self.__planned_wakeup = None
+            try:
+                timeout = await self.sweep()
+            except Exception:
+                logger.exception("Task status sweep failed, retrying in %s s", RETRY_DELAY)
+                timeout = RETRY_DELAY
+            self.__planned_wakeup = self.__clock() + timedelta(seconds=timeout)
+            try:
+                await asyncio.wait_for(self.__wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+            self.__wakeup.clear()
+
+    def get_stats(self) -> dict:
+        """
+        Get the sweeper counters.
+
+        Returns:
+            dict: Numbers of sweeps and updated tasks.
+        """
+        return {
+            "sweeps": self.sweeps,
+            "updated": self.updated
+        }
+
+
+_status_sweeper: StatusSweeper = StatusSweeper(
+    batch_size=config.STATUS_SWEEPER_BATCH_SIZE,
+    max_interval=config.STATUS_SWEEPER_MAX_INTERVAL
+)
+
+
+def get_status_sweeper() -> StatusSweeper:
+    return _status_sweeper
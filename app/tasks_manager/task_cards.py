@@ -0,0 +1,139 @@
+"""
+Rendering of task cards.
+
+A task card is the text message describing one task in the task lists. Cards are rendered from
+templates prepared once at import, and rendered texts are kept in an LRU cache keyed by
+(id_task, row_version, time bucket). row_version is increased by a trigger on every update of the
+task row, so a written task never hits its old card, and the time bucket limits how long a card
+depending on the current time (the state of a recurring task occurrence) can be reused.
+
+Options:
+    _task_card_renderer (TaskCardRenderer): A single instance of the renderer used by the application.
+"""
+
+import time
+from datetime import UTC
+from typing import Callable, Hashable
+
+from app import config
+from app.cache import LRUCache
+from app.db.models import UserTasks
+from app.tasks_manager import recurrence
+from app.tasks_manager.recurrence import TaskOccurrence
+
+TASK_STATUS_TEXT = {
+    "pending": "ожидает начала",
+    "active": "выполняется",
+    "overdue": "просрочена",
+    "done": "завершена",
+    "recurring": "повторяется"
+}
+CARD_TEMPLATE = (
+    "*                                 Задача {task_name} № {id_task}                     *\n\n"
+    "Описание задачи:\n{description}\n\n"
+    "Время старта данной задачи по Гринвичу:\n{start_time}\n\n"
+    "Время завершения данной задачи по Гринвичу:\n{end_time}\n\n"
+    "{recurrence}"
+    "Статус завершения задачи:\nЗадача {task_status}\n\n"
+    "{completion}"
+).format
+RECURRENCE_TEMPLATE = "Повторение задачи:\n{}\n\n".format
+COMPLETION_TEMPLATE = "Время завершения задачи по Гринвичу:\n{}\n\n".format
+
+
+def render_task_card(task: UserTasks | TaskOccurrence) -> str:
+    """
+    Render the card of a task without the cache.
+
+    Options:
+        task (UserTasks | TaskOccurrence): Task or occurrence of a recurring task.
+
+    Returns:
+        str: Text of the card.
+    """
+    return CARD_TEMPLATE(
+        task_name=task.task_name,
+        id_task=task.id_task,
+        description=task.description,
+        start_time=task.start_time.astimezone(UTC),
+        end_time=task.end_time.astimezone(UTC),
+        recurrence=RECURRENCE_TEMPLATE(recurrence.get_text_recurrence(
+            recurrence_unit=task.recurrence_unit,
+            recurrence_interval=task.recurrence_interval
+        )) if task.recurrence_unit else "",
+        task_status=TASK_STATUS_TEXT.get(task.task_status),
+        completion=COMPLETION_TEMPLATE(task.completion_time.astimezone(UTC)) if task.status else ""
+    )
+
+
+class TaskCardRenderer:
+    """
+    Renderer of task cards with a cache of rendered texts.
+
+    Options:
+        max_size (int): Maximum number of cached cards.
+        bucket_size (float): Length of the time bucket in seconds.
+        clock (Callable[[], float]): Clock used for the time bucket (time.time by default).
+
+    Methods:
+        get_key(task: UserTasks | TaskOccurrence) -> Hashable: Gets the cache key of the card.
+        render(task: UserTasks | TaskOccurrence) -> str: Renders the card, using the cached text if possible.
+        get_stats() -> dict: Gets the cache counters.
+    """
+
+    def __init__(self, max_size: int, bucket_size: float, clock: Callable[[], float] = time.time):
+        self.bucket_size = bucket_size
+        self.__clock = clock
+        self.__cards = LRUCache(max_size=max_size)
+
+    def get_key(self, task: UserTasks | TaskOccurrence) -> Hashable:
+        """
+        Get the cache key of the card.
+
+        Options:
+            task (UserTasks | TaskOccurrence): Task or occurrence of a recurring task.
+
+        Returns:
+            Hashable: (id_task, row_version, time bucket), with the start time and the status
+            of the occurrence added for occurrences of recurring tasks.
+        """
+        key = (task.id_task, task.row_version, int(self.__clock() // self.bucket_size))
+        if isinstance(task, TaskOccurrence):
+            key += (task.start_time, task.status)
+        return key
+
+    def render(self, task: UserTasks | TaskOccurrence) -> str:
+        """
+        Render the card, using the cached text if possible.
+
+        Options:
+            task (UserTasks | TaskOccurrence): Task or occurrence of a recurring task.
+
+        Returns:
+            str: Text of the card.
+        """
+        key = self.get_key(task=task)
+        text_card = self.__cards.get(key)
+        if text_card is None:
+            text_card = render_task_card(task=task)
+            self.__cards.set(key, text_card)
+        return text_card
+
+    def get_stats(self) -> dict:
+        """
+        Get the cache counters.
+
+        Returns:
+            dict: Size, hit and eviction counters of the card cache.
+        """
+        return self.__cards.get_stats()
+
+
+_task_card_renderer: TaskCardRenderer = TaskCardRenderer(
+    max_size=config.TASK_CARDS_CACHE_SIZE,
+    bucket_size=config.TASK_CARDS_BUCKET_SIZE
+)
+
+
+def get_task_card_renderer() -> TaskCardRenderer:
+    return _task_card_renderer
@@ -0,0 +1,68 @@
+"""
+Compact selection of tasks for bulk actions.
+
+The selection refers to positions in the task list shown in the editor (editor_task_list_ids in
+the FSM data): bit N is set when the N-th task of the list is selected. It is stored in the FSM
+data as a hexadecimal string, so selecting hundreds of tasks costs a few dozen bytes per user.
+"""
+
+
+class TaskSelection:
+    """
+    Bitset of selected positions in the editor task list.
+
+    Options:
+        bits (int): Bits of the selected positions.
+
+    Methods:
+        from_hex(value: str | None) -> TaskSelection: Restores a selection from the FSM data.
+        to_hex() -> str: Converts the selection for the FSM data.
+        is_selected(index: int) -> bool: Checks whether the position is selected.
+        toggle(index: int) -> None: Selects or deselects the position.
+        select_all(size: int) -> None: Selects the first size positions.
+        clear() -> None: Deselects all positions.
+        get_selected_ids(list_ids_tasks: list[int]) -> list[int]: Gets the IDs of the selected tasks.
+    """
+
+    def __init__(self, bits: int = 0):
+        self.bits = bits
+
+    def __len__(self) -> int:
+        return self.bits.bit_count()
+
+    @classmethod
+    def from_hex(cls, value: str | None) -> "TaskSelection":
+        """Restore a selection from its hexadecimal form."""
+        return cls(bits=int(value, 16) if value else 0)
+
+    def to_hex(self) -> str:
+        """Convert the selection to its hexadecimal form."""
+        return format(self.bits, "x")
+
+    def is_selected(self, index: int) -> bool:
+        """Check whether the position is selected."""
+        return bool(self.bits >> index & 1)
+
+    def toggle(self, index: int) -> None:
+        """Select or deselect the position."""
+        self.bits ^= 1 << index
+
+    def select_all(self, size: int) -> None:
+        """Select the first size positions."""
+        self.bits = (1 << size) - 1
+
+    def clear(self) -> None:
+        """Deselect all positions."""
+        self.bits = 0
+
+    def get_selected_ids(self, list_ids_tasks: list[int]) -> list[int]:
+        """
+        Get the IDs of the selected tasks.
+
+        Options:
+            list_ids_tasks (list[int]): IDs of the editor task list.
+
+        Returns:
+            list[int]: IDs of the selected tasks.
+        """
+        return [id_task for index, id_task in enumerate(list_ids_tasks) if self.bits >> index & 1]
@@ -0,0 +1,151 @@
+"""
+Productivity analytics of user tasks.
+
+The owner's tasks are loaded as a columnar snapshot: one row with an array per column, aggregated
+by PostgreSQL (times as int64 seconds since the epoch, the status as bool), and every metric is
+computed with vectorized NumPy operations over these arrays instead of a loop over task rows.
+Recurring tasks are left out, their rows describe a series and not a single deadline.
+
+Computed statistics are cached per owner until the owner's next task write. They are stored together
+with the generation of the owner in the tasks cache read before the snapshot, which is increased on
+every invalidation of the owner's tasks, so statistics computed from a snapshot taken before a write
+are never returned under the new generation.
+
+Options:
+    _statistics_cache (LRUCache): A single instance of the cache of computed statistics.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from app import config
+from app.cache import LRUCache
+from app.db.router import read_session
+from app.db.statements import get_statement_registry
+from app.tasks_manager.tasks_cache import get_tasks_cache, TasksChange
+
+SECONDS_PER_DAY = 24 * 3600
+# 1970-01-01 was a Thursday, so Monday is weekday 0 after this shift
+EPOCH_WEEKDAY = 3
+
+GET_TASKS_SNAPSHOT = get_statement_registry().register(
+    name="tasks.analytics_snapshot",
+    sql=(
+        "SELECT "
+        "coalesce(array_agg(extract(epoch FROM start_time)::bigint), '{}') AS start_times, "
+        "coalesce(array_agg(extract(epoch FROM end_time)::bigint), '{}') AS end_times, "
+        "coalesce(array_agg(coalesce(extract(epoch FROM completion_time)::bigint, 0)), '{}') "
+        "AS completion_times, "
+        "coalesce(array_agg(status), '{}') AS statuses "
+        "FROM user_tasks "
+        "WHERE owner_telegram_id =:owner_telegram_id AND recurrence_unit IS NULL"
+    )
+)
+
+
+@dataclass
+class TaskStatistics:
+    """
+    Productivity statistics of the owner's tasks.
+
+    Options:
+        total (int): Number of tasks.
+        completed (int): Number of completed tasks.
+        completion_rate (float): Share of completed tasks.
+        on_time_ratio (float | None): Share of completed tasks completed before the end time,
+            None if no task is completed.
+        median_lateness (float | None): Median lateness in seconds of the tasks completed after
+            the end time, None if there are no such tasks.
+        tasks_per_weekday (list[int]): Number of tasks by the weekday of the start time (UTC),
+            starting from Monday.
+    """
+    total: int
+    completed: int
+    completion_rate: float
+    on_time_ratio: float | None
+    median_lateness: float | None
+    tasks_per_weekday: list[int]
+
+
+_statistics_cache: LRUCache = LRUCache(max_size=config.ANALYTICS_CACHE_SIZE)
+
+
+def invalidate_owner(owner_telegram_id: int, _: TasksChange) -> None:
+    """Remove the cached statistics of the owner."""
+    _statistics_cache.delete(owner_telegram_id)
+
+
+get_tasks_cache().subscribe(invalidate_owner)
+
+
+def compute_statistics(
+    start_times: np.ndarray,
+    end_times: np.ndarray,
+    completion_times: np.ndarray,
+    statuses: np.ndarray
+) -> TaskStatistics:
+    """
+    Compute the statistics from the column arrays of the tasks.
+
+    Options:
+        start_times (np.ndarray): Start times, int64 seconds since the epoch.
+        end_times (np.ndarray): End times, int64 seconds since the epoch.
+        completion_times (np.ndarray): Completion times, int64 seconds since the epoch (0 if not completed).
+        statuses (np.ndarray): Completion statuses, bool.
+
+    Returns:
+        TaskStatistics: The statistics.
+    """
+    total = len(statuses)
+    completed = int(np.count_nonzero(statuses))
+    lateness = (completion_times - end_times)[statuses]
+    late = lateness[lateness > 0]
+    weekdays = (start_times // SECONDS_PER_DAY + EPOCH_WEEKDAY) % 7
+    return TaskStatistics(
+        total=total,
+        completed=completed,
+        completion_rate=completed / total if total else 0.0,
+        on_time_ratio=float(np.count_nonzero(lateness <= 0)) / completed if completed else None,
+        median_lateness=float(np.median(late)) if len(late) else None,
+        tasks_per_weekday=np.bincount(weekdays, minlength=7).tolist()
+    )
+
+
+async def get_statistics(owner_telegram_id: int) -> TaskStatistics:
+    """
+    Get the productivity statistics of the owner's tasks.
+
+    Options:
+        owner_telegram_id (int): Telegram user ID.
+
+    Returns:
+        TaskStatistics: The statistics, from the cache if the owner's tasks have not changed.
+    """
+    generation = get_tasks_cache().get_generation(owner_telegram_id)
+    cached_statistics: tuple[int, TaskStatistics] | None = _statistics_cache.get(owner_telegram_id)
+    if cached_statistics is not None and cached_statistics[0] == generation:
+        return cached_statistics[1]
+    async with read_session(GET_TASKS_SNAPSHOT) as session:
+        snapshot = (await GET_TASKS_SNAPSHOT.execute(
+            session,
+            {"owner_telegram_id": owner_telegram_id}
+        )).first()
+    statistics = compute_statistics(
+        start_times=np.array(snapshot.start_times, dtype=np.int64),
+        end_times=np.array(snapshot.end_times, dtype=np.int64),
+        completion_times=np.array(snapshot.completion_times, dtype=np.int64),
+        statuses=np.array(snapshot.statuses, dtype=bool)
+    )
+    _statistics_cache.set(owner_telegram_id, (generation, statistics))
+    return statistics
+
+
+def get_statistics_cache_stats() -> dict:
+    """
+    Get the statistics cache counters.
+
+    Returns:
+        dict: Size, hit and eviction counters of the statistics cache.
+    """
+    return _statistics_cache.get_stats()
@@ -0,0 +1,216 @@
+"""
+Read-through cache of user tasks.
+
+This module contains the cache placed in front of tasks_controller. It keeps single tasks
+and owner task lists, and every write function of tasks_controller invalidates the owner's entries.
+
+Every invalidation gives the owner a new generation number. A reader captures the generation before
+it reads the database and passes it when storing the result, so a result read before a concurrent
+invalidation is not stored. The caches of search pages and statistics key their entries on the
+generation as well. Generations are kept for a bounded number of owners: an owner without a kept
+generation gets the generation of the latest eviction, which is never lower than the generation the
+owner had, so an entry keyed on an old generation never becomes current again.
+
+Subscribers of the invalidations receive a TasksChange describing the write, so background workers
+can skip the writes that cannot affect them, such as a completed or renamed task.
+
+Options:
+    _tasks_cache (TasksCache): A single instance of the task cache used by the application.
+"""
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Hashable
+
+from app import config
+from app.cache import LRUCache
+from app.db.models import UserTasks
+
+
+@dataclass(frozen=True)
+class TasksChange:
+    """
+    Write of the owner's tasks that caused an invalidation.
+
+    Options:
+        moves_deadlines (bool): Whether pending tasks may have appeared or their start or end times may
+            have moved. False for writes that only complete, rename, delete tasks or advance the stored status.
+        times (tuple[datetime, ...] | None): Start and end times of the written tasks, None if not known.
+    """
+    moves_deadlines: bool = True
+    times: tuple[datetime, ...] | None = None
+
+
+class TasksCache:
+    """
+    Cache of single tasks and owner task lists.
+
+    Options:
+        max_tasks (int): Maximum number of cached tasks.
+        max_lists (int): Maximum number of cached owner task lists.
+        max_generations (int): Maximum number of owners whose generation is kept.
+
+    Methods:
+        get_task(owner_telegram_id: int, id_task: int) -> UserTasks | None: Gets a cached task.
+        set_task(task: UserTasks, generation: int = None) -> None: Stores a task in the cache.
+        get_task_list(owner_telegram_id: int, kind: str) -> list[UserTasks] | None: Gets a cached task list.
+        set_task_list(owner_telegram_id: int, kind: str, list_tasks: list[UserTasks], generation: int = None)
+            -> None: Stores a task list in the cache together with every task in it.
+        get_generation(owner_telegram_id: int) -> int: Gets the generation of the owner's tasks.
+        invalidate_owner(owner_telegram_id: int, change: TasksChange = TasksChange()) -> None: Removes
+            all cached entries of the owner.
+        subscribe(callback: Callable[[int, TasksChange], None]) -> None: Registers a callback called with
+            the owner ID and the change on every invalidation.
+        get_stats() -> dict: Gets the hit-rate counters of the cache.
+    """
+
+    def __init__(self, max_tasks: int, max_lists: int, max_generations: int):
+        self.__owner_keys: dict[int, set[Hashable]] = dict()
+        self.__tasks = LRUCache(max_size=max_tasks, on_evict=self.__forget_key)
+        self.__lists = LRUCache(max_size=max_lists, on_evict=self.__forget_key)
+        self.__generation = 0
+        self.__evicted_generation = 0
+        self.__generations = LRUCache(max_size=max_generations, on_evict=self.__forget_generation)
+        self.__subscribers: list[Callable[[int, TasksChange], None]] = list()
+        self.invalidations = 0
+
+    def __remember_key(self, key: tuple[int, int | str]) -> None:
+        """Add the cache key to the index of the owner's keys."""
+        self.__owner_keys.setdefault(key[0], set()).add(key)
+
+    def __forget_key(self, key: tuple[int, int | str]) -> None:
+        """Remove the cache key from the index of the owner's keys."""
+        owner_keys = self.__owner_keys.get(key[0])
+        if owner_keys is not None:
+            owner_keys.discard(key)
+            if not owner_keys:
+                self.__owner_keys.pop(key[0], None)
+
+    def __forget_generation(self, owner_telegram_id: int) -> None:
+        """Make the latest generation the generation of every owner without a kept generation."""
+        self.__evicted_generation = self.__generation
+
+    def get_generation(self, owner_telegram_id: int) -> int:
+        """
+        Get the generation of the owner's tasks, increased on every invalidation of the owner.
+
+        Options:
+            owner_telegram_id (int): Telegram user ID.
+
+        Returns:
+            int: The generation number.
+        """
+        return self.__generations.get(owner_telegram_id, self.__evicted_generation)
+
+    def get_task(self, owner_telegram_id: int, id_task: int) -> UserTasks | None:
+        """
+        Get a cached task.
+
+        Options:
+            owner_telegram_id (int): Telegram user ID.
+            id_task (int): Task ID.
+
+        Returns:
+            UserTasks | None: The cached task, or None if it is not cached.
+        """
+        return self.__tasks.get((owner_telegram_id, id_task))
+
+    def set_task(self, task: UserTasks, generation: int = None) -> None:
+        """
+        Store a task in the cache.
+
+        Options:
+            task (UserTasks): The task.
+            generation (int, optional): Generation of the owner read before the lookup. The task is not
+                stored if the owner was invalidated since then, the lookup may have read an old row.
+        """
+        if generation is not None and generation != self.get_generation(task.owner_telegram_id):
+            return
+        key = (task.owner_telegram_id, task.id_task)
+        self.__tasks.set(key, task)
+        self.__remember_key(key)
+
+    def get_task_list(self, owner_telegram_id: int, kind: str) -> list[UserTasks] | None:
+        """
+        Get a cached task list.
+
+        Options:
+            owner_telegram_id (int): Telegram user ID.
+            kind (str): Kind of the list, for example "all" or "completed".
+
+        Returns:
+            list[UserTasks] | None: The cached task list, or None if it is not cached.
+        """
+        return self.__lists.get((owner_telegram_id, kind))
+
+    def set_task_list(
+        self,
+        owner_telegram_id: int,
+        kind: str,
+        list_tasks: list[UserTasks],
+        generation: int = None
+    ) -> None:
+        """
+        Store a task list in the cache together with every task in it.
+
+        Options:
+            owner_telegram_id (int): Telegram user ID.
+            kind (str): Kind of the list.
+            list_tasks (list[UserTasks]): The tasks.
+            generation (int, optional): Generation of the owner read before the lookup. The list is not
+                stored if the owner was invalidated since then.
+        """
+        if generation is not None and generation != self.get_generation(owner_telegram_id):
+            return
+        key = (owner_telegram_id, kind)
+        self.__lists.set(key, list_tasks)
+        self.__remember_key(key)
+        for task in list_tasks:
+            self.set_task(task=task)
+
+    def invalidate_owner(self, owner_telegram_id: int, change: TasksChange = TasksChange()) -> None:
+        """
+        Remove all cached tasks and task lists of the owner.
+
+        Options:
+            owner_telegram_id (int): Telegram user ID.
+            change (TasksChange): Description of the write passed to the subscribers, by default a write
+                that may have moved deadlines at unknown times.
+        """
+        self.invalidations += 1
+        self.__generation += 1
+        self.__generations.set(owner_telegram_id, self.__generation)
+        for key in self.__owner_keys.pop(owner_telegram_id, set()):
+            self.__tasks.delete(key)
+            self.__lists.delete(key)
+        for callback in self.__subscribers:
+            callback(owner_telegram_id, change)
+
+    def subscribe(self, callback: Callable[[int, TasksChange], None]) -> None:
+        """Register a callback called with the owner ID and the change on every invalidation."""
+        self.__subscribers.append(callback)
+
+    def get_stats(self) -> dict:
+        """
+        Get the cache counters.
+
+        Returns:
+            dict: Counters of the task, task list and generation caches and the number of invalidations.
+        """
+        return {
+            "tasks": self.__tasks.get_stats(),
+            "lists": self.__lists.get_stats(),
+            "generations": self.__generations.get_stats(),
+            "invalidations": self.invalidations
+        }
+
+
+_tasks_cache: TasksCache = TasksCache(
+    max_tasks=config.TASKS_CACHE_MAX_TASKS,
+    max_lists=config.TASKS_CACHE_MAX_LISTS,
+    max_generations=config.TASKS_CACHE_MAX_GENERATIONS
+)
+
+
+def get_tasks_cache() -> TasksCache:
+    return _tasks_cache
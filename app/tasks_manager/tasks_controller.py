@@ -1,62 +1,317 @@
 import re
-from datetime import datetime, UTC
+from datetime import datetime, timedelta, UTC
 
-import pytz
 from pyrogram import types
-from sqlalchemy import text
 
-from app.db.db_config import Session
+from app import config
+from app.db.db_config import AsyncSession
 from app.db.models import UserTasks
+from app.db.router import read_session
+from app.db.statements import get_statement_registry, Statement
+from app.tasks_manager import recurrence
+from app.tasks_manager.recurrence import TaskOccurrence
+from app.tasks_manager.task_cards import get_task_card_renderer
+from app.tasks_manager.tasks_cache import get_tasks_cache, TasksChange
 from app.utils import TelegramUtils
 
+TASK_COLUMNS = (
+    "id_task, owner_telegram_id, task_name, start_time, "
+    "end_time, completion_time, status, description, task_status, "
+    "recurrence_unit, recurrence_interval, row_version"
+)
+GET_ALL_TASKS = get_statement_registry().register(
+    name="tasks.get_all",
+    sql=(
+        f"SELECT {TASK_COLUMNS} FROM user_tasks "
+        "WHERE owner_telegram_id =:owner_telegram_id"
+    )
+)
+GET_CURRENT_TASKS = get_statement_registry().register(
+    name="tasks.get_current",
+    sql=(
+        f"SELECT {TASK_COLUMNS} FROM user_tasks "
+        "WHERE owner_telegram_id =:owner_telegram_id AND task_status = 'active'"
+    )
+)
+GET_OVERDUE_TASKS = get_statement_registry().register(
+    name="tasks.get_overdue",
+    sql=(
+        f"SELECT {TASK_COLUMNS} FROM user_tasks "
+        "WHERE owner_telegram_id =:owner_telegram_id AND task_status = 'overdue'"
+    )
+)
+GET_COMPLETED_TASKS = get_statement_registry().register(
+    name="tasks.get_completed",
+    sql=(
+        f"SELECT {TASK_COLUMNS} FROM user_tasks "
+        "WHERE owner_telegram_id =:owner_telegram_id AND task_status = 'done'"
+    )
+)
+GET_RECURRING_TASKS = get_statement_registry().register(
+    name="tasks.get_recurring",
+    sql=(
+        f"SELECT {TASK_COLUMNS} FROM user_tasks "
+        "WHERE owner_telegram_id =:owner_telegram_id AND task_status = 'recurring'"
+    )
+)
+GET_COMPLETED_OCCURRENCES = get_statement_registry().register(
+    name="tasks.get_completed_occurrences",
+    sql=(
+        f"SELECT {', '.join(f'user_tasks.{x}' for x in TASK_COLUMNS.split(', '))}, "
+        "task_occurrence_exceptions.occurrence_start, "
+        "task_occurrence_exceptions.completion_time AS occurrence_completion_time "
+        "FROM task_occurrence_exceptions "
+        "JOIN user_tasks ON user_tasks.id_task = task_occurrence_exceptions.id_task "
+        "WHERE user_tasks.owner_telegram_id =:owner_telegram_id "
+        "ORDER BY task_occurrence_exceptions.occurrence_start"
+    )
+)
+GET_TASK_BY_ID = get_statement_registry().register(
+    name="tasks.get_by_id",
+    sql=(
+        f"SELECT {TASK_COLUMNS} FROM user_tasks "
+        "WHERE id_task =:id_task AND owner_telegram_id = :owner_telegram_id"
+    )
+)
+INSERT_TASK = get_statement_registry().register(
+    name="tasks.insert",
+    sql=(
+        "INSERT INTO user_tasks (owner_telegram_id, task_name, "
+        "start_time, end_time, completion_time, status, description, "
+        "recurrence_unit, recurrence_interval) "
+        "VALUES (:owner_telegram_id, :task_name, :start_time, "
+        ":end_time, :completion_time, :status, :description, "
+        ":recurrence_unit, :recurrence_interval)"
+    )
+)
+UPDATE_TASK_NAME = get_statement_registry().register(
+    name="tasks.update_name",
+    sql=(
+        "UPDATE user_tasks SET task_name =:task_name "
+        "WHERE owner_telegram_id =:owner_telegram_id AND id_task = :id_task "
+        f"RETURNING {TASK_COLUMNS}"
+    )
+)
+UPDATE_TASK_DESCRIPTION = get_statement_registry().register(
+    name="tasks.update_description",
+    sql=(
+        "UPDATE user_tasks SET description =:description "
+        "WHERE owner_telegram_id =:owner_telegram_id AND id_task = :id_task "
+        f"RETURNING {TASK_COLUMNS}"
+    )
+)
+# The start time is checked against the stored end time in the same statement
+UPDATE_TASK_START_TIME = get_statement_registry().register(
+    name="tasks.update_start_time",
+    sql=(
+        "UPDATE user_tasks SET start_time =:start_time "
+        "WHERE owner_telegram_id =:owner_telegram_id AND id_task = :id_task "
+        "AND :start_time < end_time "
+        f"RETURNING {TASK_COLUMNS}"
+    )
+)
+# The end time is checked against the stored start time in the same statement
+UPDATE_TASK_END_TIME = get_statement_registry().register(
+    name="tasks.update_end_time",
+    sql=(
+        "UPDATE user_tasks SET end_time =:end_time "
+        "WHERE owner_telegram_id =:owner_telegram_id AND id_task = :id_task "
+        "AND start_time < :end_time "
+        f"RETURNING {TASK_COLUMNS}"
+    )
+)
+# Right-hand sides of SET see the old row, so the status is toggled without reading it first
+UPDATE_TASK_COMPLETION = get_statement_registry().register(
+    name="tasks.update_completion",
+    sql=(
+        "UPDATE user_tasks SET status = NOT status, "
+        "completion_time = CASE WHEN status THEN NULL ELSE current_timestamp END "
+        "WHERE owner_telegram_id =:owner_telegram_id AND id_task = :id_task "
+        f"RETURNING {TASK_COLUMNS}"
+    )
+)
+BULK_COMPLETE_TASKS = get_statement_registry().register(
+    name="tasks.bulk_complete",
+    sql=(
+        "UPDATE user_tasks SET status = true, completion_time = current_timestamp "
+        "WHERE owner_telegram_id =:owner_telegram_id AND id_task = ANY(:ids_tasks) AND status = false "
+        "RETURNING id_task"
+    )
+)
+# Tasks whose end time would not be later than the start time are skipped
+BULK_SHIFT_TASKS_END_TIME = get_statement_registry().register(
+    name="tasks.bulk_shift_end_time",
+    sql=(
+        "UPDATE user_tasks SET end_time = end_time + make_interval(days => :days) "
+        "WHERE owner_telegram_id =:owner_telegram_id AND id_task = ANY(:ids_tasks) "
+        "AND end_time + make_interval(days => :days) > start_time "
+        "RETURNING id_task"
+    )
+)
+BULK_DELETE_TASKS = get_statement_registry().register(
+    name="tasks.bulk_delete",
+    sql=(
+        "DELETE FROM user_tasks "
+        "WHERE owner_telegram_id =:owner_telegram_id AND id_task = ANY(:ids_tasks) "
+        "RETURNING id_task"
+    )
+)
+DELETE_TASK = get_statement_registry().register(
+    name="tasks.delete",
+    sql=(
+        "DELETE FROM user_tasks "
+        "WHERE owner_telegram_id =:owner_telegram_id AND id_task = :id_task"
+    )
+)
+DELETE_OWNER_TASKS = get_statement_registry().register(
+    name="tasks.delete_by_owner",
+    sql=(
+        "DELETE FROM user_tasks "
+        "WHERE owner_telegram_id =:owner_telegram_id"
+    )
+)
+
+
+async def get_cached_tasks(statement: Statement, owner_telegram_id: int, list_kind: str) -> list[UserTasks]:
+    """
+        Get a list of user task rows through the tasks cache.
+
+        Options:
+        - statement (Statement): Registered statement selecting the tasks of the owner.
+        - owner_telegram_id (int): Telegram user ID.
+        - list_kind (str): Kind of the list, the key of the list in the cache.
 
-def get_all_tasks(
+        Returns:
+        - list[UserTasks]: List of user task objects.
+    """
+    cached_tasks_list = get_tasks_cache().get_task_list(
+        owner_telegram_id=owner_telegram_id,
+        kind=list_kind
+    )
+    if cached_tasks_list is not None:
+        return cached_tasks_list
+    generation = get_tasks_cache().get_generation(owner_telegram_id)
+    async with read_session(statement) as session:
+        user_tasks_list: list[UserTasks] = (await statement.execute(
+            session,
+            {"owner_telegram_id": owner_telegram_id}
+        )).all()
+    get_tasks_cache().set_task_list(
+        owner_telegram_id=owner_telegram_id,
+        kind=list_kind,
+        list_tasks=user_tasks_list,
+        generation=generation
+    )
+    return user_tasks_list
+
+
+async def get_all_tasks(
     owner_telegram_id: int,
     current_tasks: bool = False,
     overdue_tasks: bool = False,
     completed_tasks: bool = False
-) -> list[UserTasks]:
+) -> list[UserTasks | TaskOccurrence]:
     """
         Get a list of user tasks depending on the specified parameters.
 
+        Current, overdue and completed lists also contain the matching occurrences of recurring tasks,
+        the list of all tasks contains recurring tasks once, as their rows.
+
         Options:
         - owner_telegram_id (int): Telegram user ID.
-        - current_tasks (bool): Flag for getting current tasks (neither started nor completed).
+        - current_tasks (bool): Flag for getting current tasks (started, not completed and not overdue).
         - overdue_tasks (bool): Flag for receiving overdue tasks.
         - completed_tasks (bool): Flag for receiving completed tasks.
 
         Returns:
-        - list[UserTasks]: List of user task objects.
+        - list[UserTasks | TaskOccurrence]: List of user task and occurrence objects.
     """
-    condition_text = "WHERE owner_telegram_id =:owner_telegram_id"
-    with Session() as session:
-        if current_tasks:
-            condition_text += (
-                " AND start_time AT TIME ZONE 'UTC' < current_timestamp AT TIME ZONE "
-                "'UTC' AND end_time AT TIME ZONE 'UTC' > current_timestamp AT TIME ZONE 'UTC'"
-                " AND status = false;"
-            )
-        elif overdue_tasks:
-            condition_text += (
-                " AND end_time AT TIME ZONE 'UTC' < current_timestamp AT TIME ZONE 'UTC'"
-                " AND status = false;"
-            )
-        elif completed_tasks:
-            condition_text += " AND status = true;"
-        query = text(
-            "SELECT id_task, owner_telegram_id, task_name, start_time, "
-            "end_time, completion_time, status, description "
-            "FROM user_tasks "
-            f"{condition_text}"
-        )
-        user_tasks_list: list[UserTasks] = session.execute(
-            query,
+    # The status sweeper invalidates the owner when task_status changes, so every list can be cached
+    list_kind = (
+        "current" if current_tasks else "overdue" if overdue_tasks
+        else "completed" if completed_tasks else "all"
+    )
+    statement = (
+        GET_CURRENT_TASKS if current_tasks else GET_OVERDUE_TASKS if overdue_tasks
+        else GET_COMPLETED_TASKS if completed_tasks else GET_ALL_TASKS
+    )
+    user_tasks_list = await get_cached_tasks(
+        statement=statement,
+        owner_telegram_id=owner_telegram_id,
+        list_kind=list_kind
+    )
+    if list_kind == "all":
+        return user_tasks_list
+    if completed_tasks:
+        return user_tasks_list + await get_completed_occurrences(owner_telegram_id=owner_telegram_id)
+    # Occurrences depend on the current time, so only the recurring rows are cached
+    recurring_tasks_list = await get_cached_tasks(
+        statement=GET_RECURRING_TASKS,
+        owner_telegram_id=owner_telegram_id,
+        list_kind="recurring"
+    )
+    now = datetime.now(UTC)
+    if current_tasks:
+        window_start, window_end = now, now + timedelta(microseconds=1)
+    else:
+        window_start, window_end = now - timedelta(seconds=config.RECURRENCE_OVERDUE_WINDOW), now
+    list_occurrences = await recurrence.get_occurrences(
+        list_tasks=recurring_tasks_list,
+        window_start=window_start,
+        window_end=window_end,
+        now=now
+    )
+    return user_tasks_list + [
+        occurrence for occurrence in list_occurrences
+        if not occurrence.status and (current_tasks or occurrence.end_time <= now)
+    ]
+
+
+async def get_completed_occurrences(owner_telegram_id: int) -> list[TaskOccurrence]:
+    """
+        Get the completed occurrences of the user's recurring tasks.
+
+        Options:
+        - owner_telegram_id (int): Telegram user ID.
+
+        Returns:
+        - list[TaskOccurrence]: List of completed occurrences ordered by start time.
+    """
+    async with read_session(GET_COMPLETED_OCCURRENCES) as session:
+        list_rows = (await GET_COMPLETED_OCCURRENCES.execute(
+            session,
             {"owner_telegram_id": owner_telegram_id}
-        ).all()
-    return user_tasks_list
+        )).all()
+    return [
+        recurrence.make_occurrence(
+            task=row,
+            start_time=row.occurrence_start,
+            end_time=row.occurrence_start + (row.end_time - row.start_time),
+            completion_time=row.occurrence_completion_time
+        )
+        for row in list_rows
+    ]
+
+
+async def count_tasks(owner_telegram_id: int) -> dict[str, int]:
+    """
+        Count the user tasks of every list.
+
+        Options:
+        - owner_telegram_id (int): Telegram user ID.
+
+        Returns:
+        - dict[str, int]: Numbers of current, completed, overdue and all tasks.
+    """
+    return {
+        "current": len(await get_all_tasks(owner_telegram_id=owner_telegram_id, current_tasks=True)),
+        "completed": len(await get_all_tasks(owner_telegram_id=owner_telegram_id, completed_tasks=True)),
+        "overdue": len(await get_all_tasks(owner_telegram_id=owner_telegram_id, overdue_tasks=True)),
+        "all": len(await get_all_tasks(owner_telegram_id=owner_telegram_id))
+    }
 
 
-def get_task_by_id(id_task: int, owner_telegram_id: int) -> UserTasks | None:
+async def get_task_by_id(id_task: int, owner_telegram_id: int) -> UserTasks | None:
     """
        Get a specific user task by its ID.
 
@@ -67,31 +322,36 @@ def get_task_by_id(id_task: int, owner_telegram_id: int) -> UserTasks | None:
         Returns:
         - Union[UserTasks, None]: The user's task object, or None if the task is not found.
     """
-    with Session() as session:
-        query = text(
-            "SELECT id_task, owner_telegram_id, task_name, start_time, end_time, completion_time, status, "
-            "end_time, completion_time, status, description "
-            "FROM user_tasks "
-            "WHERE id_task =:id_task AND owner_telegram_id = :owner_telegram_id"
-        )
-        user_task: UserTasks = session.execute(
-            query,
+    user_task: UserTasks | None = get_tasks_cache().get_task(
+        owner_telegram_id=owner_telegram_id,
+        id_task=id_task
+    )
+    if user_task:
+        return user_task
+    generation = get_tasks_cache().get_generation(owner_telegram_id)
+    async with read_session(GET_TASK_BY_ID) as session:
+        user_task: UserTasks = (await GET_TASK_BY_ID.execute(
+            session,
             {
                 "id_task": id_task,
                 "owner_telegram_id": owner_telegram_id
             }
-        ).first()
+        )).first()
+    if user_task:
+        get_tasks_cache().set_task(task=user_task, generation=generation)
     return user_task
 
 
-def set_task(
+async def set_task(
     owner_telegram_id: int,
     task_name: str,
     start_time: datetime,
     end_time: datetime,
     description: str,
     completion_time: datetime = None,
-    status: bool = False
+    status: bool = False,
+    recurrence_unit: str | None = None,
+    recurrence_interval: int = 1
 ) -> None:
     """
         Add a new task to the database.
@@ -104,16 +364,13 @@ def set_task(
         - description (str): Description of the task.
         - completion_time (datetime): Task completion time (None by default).
         - status (bool): Task completion status (default False).
+        - recurrence_unit (str | None): Unit of the recurrence rule: day, week or month (None by default,
+          the task does not repeat).
+        - recurrence_interval (int): Interval of the recurrence rule in units (default 1).
     """
-    with Session() as session:
-        query = text(
-            "INSERT INTO user_tasks (owner_telegram_id, task_name, "
-            "start_time, end_time, completion_time, status, description) "
-            "VALUES (:owner_telegram_id, :task_name, :start_time, "
-            ":end_time, :completion_time, :status, :description);"
-        )
-        session.execute(
-            query,
+    async with AsyncSession() as session:
+        await INSERT_TASK.execute(
+            session,
             {
                 "owner_telegram_id": owner_telegram_id,
                 "task_name": task_name,
@@ -121,42 +378,87 @@ def set_task(
                 "end_time": end_time,
                 "completion_time": completion_time,
                 "status": status,
-                "description": description
+                "description": description,
+                "recurrence_unit": recurrence_unit,
+                "recurrence_interval": recurrence_interval
             }
         )
-        session.commit()
+        await session.commit()
+    get_tasks_cache().invalidate_owner(
+        owner_telegram_id=owner_telegram_id,
+        change=TasksChange(moves_deadlines=not status, times=(start_time, end_time))
+    )
 
 
-def update_task_name(id_task: int, owner_telegram_id: int, task_name: str) -> None:
+async def update_task(
+    statement: Statement,
+    id_task: int,
+    owner_telegram_id: int,
+    moves_deadlines: bool = True,
+    **values
+) -> UserTasks | None:
     """
-        Update the task name.
+        Run a task mutation in one statement and return the updated task.
 
         Options:
+        - statement (Statement): Registered UPDATE ... RETURNING statement.
         - id_task (int): Task ID.
         - owner_telegram_id (int): Telegram user ID.
-        - task_name (str): New task name.
+        - moves_deadlines (bool): Whether the mutation may move the deadline of the task or reopen it
+          (True by default).
+        - values: New values of the task columns.
+
+        Returns:
+        - Union[UserTasks, None]: The updated task object, or None if no task was updated.
     """
-    with Session() as session:
-        query = text(
-            "UPDATE user_tasks SET task_name =:task_name "
-            "WHERE owner_telegram_id =:owner_telegram_id;"
-        )
-        session.execute(
-            query,
+    async with AsyncSession() as session:
+        user_task: UserTasks | None = (await statement.execute(
+            session,
             {
                 "id_task": id_task,
                 "owner_telegram_id": owner_telegram_id,
-                "task_name": task_name
+                **values
             }
+        )).first()
+        await session.commit()
+    if user_task:
+        get_tasks_cache().invalidate_owner(
+            owner_telegram_id=owner_telegram_id,
+            change=TasksChange(
+                moves_deadlines=moves_deadlines and not user_task.status,
+                times=(user_task.start_time, user_task.end_time)
+            )
         )
-        session.commit()
+        get_tasks_cache().set_task(task=user_task)
+    return user_task
+
 
+async def update_task_name(id_task: int, owner_telegram_id: int, task_name: str) -> UserTasks | None:
+    """
+        Update the task name.
 
-def update_task_description(
+        Options:
+        - id_task (int): Task ID.
+        - owner_telegram_id (int): Telegram user ID.
+        - task_name (str): New task name.
+
+        Returns:
+        - Union[UserTasks, None]: The updated task object, or None if the task is not found.
+    """
+    return await update_task(
+        statement=UPDATE_TASK_NAME,
+        id_task=id_task,
+        owner_telegram_id=owner_telegram_id,
+        moves_deadlines=False,
+        task_name=task_name
+    )
+
+
+async def update_task_description(
     id_task: int,
     owner_telegram_id: int,
     description: str
-) -> None:
+) -> UserTasks | None:
     """
         Update the task description.
 
@@ -164,116 +466,123 @@ def update_task_description(
         - id_task (int): Task ID.
         - owner_telegram_id (int): Telegram user ID.
         - description (str): New task description.
+
+        Returns:
+        - Union[UserTasks, None]: The updated task object, or None if the task is not found.
     """
-    with Session() as session:
-        query = text(
-            "UPDATE user_tasks SET description =:description "
-            "WHERE owner_telegram_id =:owner_telegram_id;"
-        )
-        session.execute(
-            query,
-            {
-                "id_task": id_task,
-                "owner_telegram_id": owner_telegram_id,
-                "description": description
-            }
-        )
-        session.commit()
+    return await update_task(
+        statement=UPDATE_TASK_DESCRIPTION,
+        id_task=id_task,
+        owner_telegram_id=owner_telegram_id,
+        moves_deadlines=False,
+        description=description
+    )
 
 
-def update_task_start_time(
+async def update_task_start_time(
     id_task: int,
     owner_telegram_id: int,
     start_time: str
-) -> None:
+) -> UserTasks | None:
     """
-        Update the start time of a task.
+        Update the start time of a task if it is earlier than the end time of the task.
 
         Options:
         - id_task (int): Task ID.
         - owner_telegram_id (int): Telegram user ID.
         - start_time (str): New task start time in the format DD.MM.YYYY HH:MM.
+
+        Returns:
+        - Union[UserTasks, None]: The updated task object, or None if the task is not found
+          or the start time is not earlier than the end time.
     """
-    start_time = transform_utc_time(time=start_time)
-    with Session() as session:
-        query = text(
-            "UPDATE user_tasks SET start_time =:start_time "
-            "WHERE owner_telegram_id =:owner_telegram_id;")
-        session.execute(
-            query,
-            {
-                "id_task": id_task,
-                "owner_telegram_id": owner_telegram_id,
-                "start_time": start_time
-            }
-        )
-        session.commit()
+    return await update_task(
+        statement=UPDATE_TASK_START_TIME,
+        id_task=id_task,
+        owner_telegram_id=owner_telegram_id,
+        start_time=transform_utc_time(time=start_time)
+    )
 
 
-def update_task_end_time(
+async def update_task_end_time(
     id_task: int,
     owner_telegram_id: int,
     end_time: str
-) -> None:
+) -> UserTasks | None:
     """
-        Update the completion time of a task.
+        Update the completion time of a task if it is later than the start time of the task.
 
         Options:
         - id_task (int): Task ID.
         - owner_telegram_id (int): Telegram user ID.
         - end_time (str): New task end time in the format DD.MM.YYYY HH:MM.
+
+        Returns:
+        - Union[UserTasks, None]: The updated task object, or None if the task is not found
+          or the end time is not later than the start time.
     """
-    end_time = transform_utc_time(time=end_time)
-    with Session() as session:
-        query = text(
-            "UPDATE user_tasks SET end_time =:end_time "
-            "WHERE owner_telegram_id =:owner_telegram_id AND user_tasks.id_task = :id_task;")
-        session.execute(
-            query,
-            {
-                "id_task": id_task,
-                "owner_telegram_id": owner_telegram_id,
-                "end_time": end_time
-            }
-        )
-        session.commit()
+    return await update_task(
+        statement=UPDATE_TASK_END_TIME,
+        id_task=id_task,
+        owner_telegram_id=owner_telegram_id,
+        end_time=transform_utc_time(time=end_time)
+    )
 
 
-def update_task_completion(id_task: int, owner_telegram_id: int) -> bool:
+async def update_task_completion(id_task: int, owner_telegram_id: int) -> UserTasks | None:
     """
-        Update the status and completion time of a task.
+        Toggle the status of a task and set or reset its completion time.
 
         Options:
         - id_task (int): Task ID.
         - owner_telegram_id (int): Telegram user ID.
 
         Returns:
-        - bool: Task completion status (True - completed, False - not completed).
+        - Union[UserTasks, None]: The updated task object, or None if the task is not found.
     """
-    task: UserTasks = get_task_by_id(
+    return await update_task(
+        statement=UPDATE_TASK_COMPLETION,
         id_task=id_task,
         owner_telegram_id=owner_telegram_id
     )
-    status = True if not task.status else False
-    completion_time = datetime.now(UTC) if status else None
-    with Session() as session:
-        query = text(
-            "UPDATE user_tasks SET completion_time =:completion_time, status=:status "
-            "WHERE owner_telegram_id =:owner_telegram_id AND user_tasks.id_task = :id_task;")
-        session.execute(
-            query,
-            {
-                "id_task": id_task,
-                "owner_telegram_id": owner_telegram_id,
-                "completion_time": completion_time,
-                "status": status
-            }
+
+
+async def complete_task_occurrence(
+    id_task: int,
+    owner_telegram_id: int,
+    occurrence_start: datetime
+) -> bool:
+    """
+        Mark an occurrence of a recurring task as completed.
+
+        Options:
+        - id_task (int): ID of the recurring task.
+        - owner_telegram_id (int): Telegram user ID.
+        - occurrence_start (datetime): Start time of the occurrence.
+
+        Returns:
+        - bool: False if there is no such open occurrence.
+    """
+    user_task = await get_task_by_id(id_task=id_task, owner_telegram_id=owner_telegram_id)
+    if not user_task or user_task.task_status != "recurring" or not recurrence.is_occurrence_start(
+        task=user_task,
+        start_time=occurrence_start
+    ):
+        return False
+    is_completed = await recurrence.complete_occurrence(
+        id_task=id_task,
+        owner_telegram_id=owner_telegram_id,
+        occurrence_start=occurrence_start
+    )
+    if is_completed:
+        get_tasks_cache().invalidate_owner(
+            owner_telegram_id=owner_telegram_id,
+            change=TasksChange(moves_deadlines=False)
         )
-        session.commit()
-    return status
+    return is_completed
 
 
-def delete_task(owner_telegram_id: int, id_task: int = None) -> None:
+async def delete_task(owner_telegram_id: int, id_task: int = None) -> None:
     """
         Remove a user's task from the database.
 
@@ -281,26 +590,121 @@ def delete_task(owner_telegram_id: int, id_task: int = None) -> None:
         - owner_telegram_id (int): Telegram user ID.
         - id_task (int): Task ID (optional).
     """
-    with Session() as session:
+    async with AsyncSession() as session:
         if id_task:
-            query = text(
-                "DELETE FROM user_tasks "
-                "WHERE owner_telegram_id =:owner_telegram_id AND id_task = :id_task;"
-            )
-            session.execute(
-                query,
+            await DELETE_TASK.execute(
+                session,
                 {
                     "owner_telegram_id": owner_telegram_id,
                     "id_task": id_task
                 }
             )
         else:
-            query = text(
-                "DELETE FROM user_tasks "
-                "WHERE owner_telegram_id =:owner_telegram_id;"
-            )
-            session.execute(query, {"owner_telegram_id": owner_telegram_id})
-        session.commit()
+            await DELETE_OWNER_TASKS.execute(session, {"owner_telegram_id": owner_telegram_id})
+        await session.commit()
+    get_tasks_cache().invalidate_owner(
+        owner_telegram_id=owner_telegram_id,
+        change=TasksChange(moves_deadlines=False)
+    )
+
+
+async def bulk_update_tasks(
+    statement: Statement,
+    owner_telegram_id: int,
+    ids_tasks: list[int],
+    moves_deadlines: bool = True,
+    **values
+) -> list[int]:
+    """
+        Run a bulk task action in one statement.
+
+        Options:
+        - statement (Statement): Registered statement returning the IDs of the changed tasks.
+        - owner_telegram_id (int): Telegram user ID.
+        - ids_tasks (list[int]): IDs of the tasks.
+        - moves_deadlines (bool): Whether the action may move the deadlines of the tasks (True by default).
+        - values: Other statement parameters.
+
+        Returns:
+        - list[int]: IDs of the changed tasks.
+    """
+    if not ids_tasks:
+        return list()
+    async with AsyncSession() as session:
+        changed_ids_tasks: list[int] = (await statement.execute(
+            session,
+            {
+                "owner_telegram_id": owner_telegram_id,
+                "ids_tasks": ids_tasks,
+                **values
+            }
+        )).scalars().all()
+        await session.commit()
+    if changed_ids_tasks:
+        get_tasks_cache().invalidate_owner(
+            owner_telegram_id=owner_telegram_id,
+            change=TasksChange(moves_deadlines=moves_deadlines)
+        )
+    return changed_ids_tasks
+
+
+async def complete_tasks(owner_telegram_id: int, ids_tasks: list[int]) -> list[int]:
+    """
+        Mark the tasks as completed.
+
+        Options:
+        - owner_telegram_id (int): Telegram user ID.
+        - ids_tasks (list[int]): IDs of the tasks.
+
+        Returns:
+        - list[int]: IDs of the tasks that were not completed before.
+    """
+    return await bulk_update_tasks(
+        statement=BULK_COMPLETE_TASKS,
+        owner_telegram_id=owner_telegram_id,
+        ids_tasks=ids_tasks,
+        moves_deadlines=False
+    )
+
+
+async def shift_tasks_end_time(owner_telegram_id: int, ids_tasks: list[int], days: int) -> list[int]:
+    """
+        Move the end time of the tasks by a number of days.
+
+        Options:
+        - owner_telegram_id (int): Telegram user ID.
+        - ids_tasks (list[int]): IDs of the tasks.
+        - days (int): Number of days, negative to move the end time back.
+
+        Returns:
+        - list[int]: IDs of the moved tasks. Tasks whose end time would not be later
+          than the start time are not moved.
+    """
+    return await bulk_update_tasks(
+        statement=BULK_SHIFT_TASKS_END_TIME,
+        owner_telegram_id=owner_telegram_id,
+        ids_tasks=ids_tasks,
+        days=days
+    )
+
+
+async def delete_tasks(owner_telegram_id: int, ids_tasks: list[int]) -> list[int]:
+    """
+        Remove the tasks from the database.
+
+        Options:
+        - owner_telegram_id (int): Telegram user ID.
+        - ids_tasks (list[int]): IDs of the tasks.
+
+        Returns:
+        - list[int]: IDs of the removed tasks.
+    """
+    return await bulk_update_tasks(
+        statement=BULK_DELETE_TASKS,
+        owner_telegram_id=owner_telegram_id,
+        ids_tasks=ids_tasks,
+        moves_deadlines=False
+    )
 
 
 def check_valid_date(start_time: str, end_time: str = None) -> bool:
@@ -362,33 +766,21 @@ def get_text_set_time(start_time: datetime | str = None, is_error: bool = False)
 
 
 async def send_messages_get_all_tasks(
-    list_tasks: list[UserTasks],
+    list_tasks: list[UserTasks | TaskOccurrence],
     message: types.CallbackQuery
 ) -> None:
     """
         Asynchronously sends messages with information about tasks.
 
         Options:
-        - list_tasks (list[UserTasks]): List of user task objects.
+        - list_tasks (list[UserTasks | TaskOccurrence]): List of user task and occurrence objects.
         - message (types.CallbackQuery) -> None: Telegram message object.
     """
     list_text_messages = list()
     if not list_tasks:
         list_text_messages.append("Задачи данного типа у вас отсутствуют")
     else:
-        for count, task in enumerate(list_tasks):
-            message_text = (
-                f"*                                 Задача {task.task_name} № {task.id_task}                     *\n\n"
-                f"Описание задачи:\n{task.description}\n\n"
-                f"Время старта данной задачи по Гринвичу:\n{task.start_time.astimezone(pytz.timezone('UTC'))}\n\n"
-                f"Время завершения данной задачи по Гринвичу:\n{task.end_time.astimezone(pytz.timezone('UTC'))}\n\n"
-                f"Статус завершения задачи:\nЗадача {(
-                    'завершена' if task.status else 'просрочена' if 
-                    task.end_time < datetime.now(UTC) else 'выполняется')}\n\n"
-                f"{(f'Время завершения задачи по Гринвичу:\n{task.completion_time.astimezone(pytz.timezone('UTC'))}\n\n' 
-                    if task.status else '')}"
-            )
-            list_text_messages.append(message_text)
+        list_text_messages += [get_task_card_renderer().render(task=task) for task in list_tasks]
     for count, text_message in enumerate(list_text_messages):
         telegram_utils = TelegramUtils(text=text_message, message=message)
         await telegram_utils.send_messages()
@@ -0,0 +1,190 @@
+"""
+Streaming export of user tasks to CSV and iCalendar documents.
+
+This module contains the functions that read the owner's tasks with a server-side cursor and write
+them chunk by chunk to a spooled temporary file. The file stays in memory while it is small and
+is moved to disk when it grows, so memory use does not depend on the number of tasks.
+
+The CSV document uses the same columns as the bulk import, so an exported file can be imported back.
+The iCalendar document (RFC 5545) contains one VEVENT per task, a recurring task is one VEVENT with
+an RRULE built from its recurrence rule, ending at the completion of the series.
+"""
+
+import csv
+import io
+from datetime import datetime, UTC
+from tempfile import SpooledTemporaryFile
+from typing import Callable, Iterable
+
+from app import config
+from app.db.models import UserTasks
+from app.db.router import read_session
+from app.db.statements import get_statement_registry
+
+EXPORT_FORMATS = ("csv", "ics")
+EXPORT_CSV_COLUMNS = ("task_name", "description", "start_time", "end_time", "status", "completion_time")
+ICS_LINE_LENGTH = 75
+ICS_FREQUENCIES = {
+    "day": "DAILY",
+    "week": "WEEKLY",
+    "month": "MONTHLY"
+}
+
+EXPORT_TASKS = get_statement_registry().register(
+    name="tasks.export",
+    sql=(
+        "SELECT id_task, task_name, description, start_time, end_time, completion_time, status, "
+        "recurrence_unit, recurrence_interval "
+        "FROM user_tasks "
+        "WHERE owner_telegram_id =:owner_telegram_id "
+        "ORDER BY id_task"
+    )
+)
+
+
+def format_csv_chunk(list_tasks: Iterable[UserTasks]) -> str:
+    """
+    Format a chunk of tasks as CSV rows.
+
+    Options:
+        list_tasks (Iterable[UserTasks]): Tasks of the chunk.
+
+    Returns:
+        str: CSV rows of the chunk.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for task in list_tasks:
+        writer.writerow((
+            task.task_name,
+            task.description,
+            task.start_time.isoformat(),
+            task.end_time.isoformat(),
+            "true" if task.status else "false",
+            task.completion_time.isoformat() if task.completion_time else ""
+        ))
+    return buffer.getvalue()
+
+
+def escape_ics_text(text: str) -> str:
+    """Escape a TEXT value of an iCalendar property."""
+    return (
+        text.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,")
+        .replace("\r\n", "\\n").replace("\n", "\\n")
+    )
+
+
+def format_ics_time(time: datetime) -> str:
+    """Format a date as an iCalendar UTC DATE-TIME value."""
+    return time.astimezone(UTC).strftime("%Y%m%dT%H%M%SZ")
+
+
+def fold_ics_line(line: str) -> str:
+    """
+    Fold an iCalendar content line into lines of at most 75 octets.
+
+    Options:
+        line (str): Content line without the line break.
+
+    Returns:
+        str: Folded content line with CRLF line breaks.
+    """
+    encoded = line.encode()
+    if len(encoded) <= ICS_LINE_LENGTH:
+        return line + "\r\n"
+    parts = list()
+    start = 0
+    limit = ICS_LINE_LENGTH
+    while start < len(encoded):
+        end = min(start + limit, len(encoded))
+        # Do not split a multibyte UTF-8 character
+        while end < len(encoded) and encoded[end] & 0xC0 == 0x80:
+            end -= 1
+        parts.append(encoded[start:end].decode())
+        start = end
+        limit = ICS_LINE_LENGTH - 1
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def format_ics_rule(task: UserTasks) -> str:
+    """
+    Format the recurrence rule of a recurring task as an RRULE value.
+
+    Monthly occurrences are clamped to the last day of shorter months, as the occurrences listed by the bot,
+    instead of being skipped, which is the default of RFC 5545.
+
+    Options:
+        task (UserTasks): Recurring task.
+
+    Returns:
+        str: Value of the RRULE property.
+    """
+    rule = f"FREQ={ICS_FREQUENCIES[task.recurrence_unit]};INTERVAL={task.recurrence_interval}"
+    start_day = task.start_time.astimezone(UTC).day
+    if task.recurrence_unit == "month" and start_day > 28:
+        rule += f";BYMONTHDAY={start_day},-1;BYSETPOS=1"
+    if task.status and task.completion_time:
+        rule += f";UNTIL={format_ics_time(task.completion_time)}"
+    return rule
+
+
+def format_ics_chunk(list_tasks: Iterable[UserTasks]) -> str:
+    """
+    Format a chunk of tasks as iCalendar events.
+
+    Options:
+        list_tasks (Iterable[UserTasks]): Tasks of the chunk.
+
+    Returns:
+        str: VEVENT components of the chunk.
+    """
+    timestamp = format_ics_time(datetime.now(UTC))
+    lines = list()
+    for task in list_tasks:
+        lines += [
+            "BEGIN:VEVENT",
+            f"UID:task-{task.id_task}@pyrogram_test",
+            f"DTSTAMP:{timestamp}",
+            f"DTSTART:{format_ics_time(task.start_time)}",
+            f"DTEND:{format_ics_time(task.end_time)}",
+            *([f"RRULE:{format_ics_rule(task)}"] if task.recurrence_unit else []),
+            f"SUMMARY:{escape_ics_text(task.task_name)}",
+            f"DESCRIPTION:{escape_ics_text(task.description)}",
+            f"CATEGORIES:{'Завершена' if task.status else 'Не завершена'}",
+            "END:VEVENT"
+        ]
+    return "".join(fold_ics_line(line) for line in lines)
+
+
+async def export_tasks(owner_telegram_id: int, export_format: str) -> SpooledTemporaryFile:
+    """
+    Export all tasks of the owner to a temporary file.
+
+    Options:
+        owner_telegram_id (int): Telegram user ID.
+        export_format (str): Format of the document, "csv" or "ics".
+
+    Returns:
+        SpooledTemporaryFile: Binary file with the document, positioned at the beginning.
+            The caller is responsible for closing it.
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format {export_format}")
+    format_chunk: Callable[[Iterable[UserTasks]], str] = (
+        format_csv_chunk if export_format == "csv" else format_ics_chunk
+    )
+    document = SpooledTemporaryFile(max_size=config.EXPORT_SPOOL_MAX_SIZE, mode="w+b")
+    if export_format == "csv":
+        document.write((",".join(EXPORT_CSV_COLUMNS) + "\r\n").encode())
+    else:
+        document.write("".join(fold_ics_line(line) for line in (
+            "BEGIN:VCALENDAR", "VERSION:2.0", "PRODID:-//pyrogram_test//tasks//RU", "CALSCALE:GREGORIAN"
+        )).encode())
+    async with read_session(EXPORT_TASKS) as session:
+        result = await EXPORT_TASKS.stream(session, {"owner_telegram_id": owner_telegram_id})
+        async for list_tasks in result.partitions(config.EXPORT_CHUNK_SIZE):
+            document.write(format_chunk(list_tasks).encode())
+    if export_format == "ics":
+        document.write(fold_ics_line("END:VCALENDAR").encode())
+    document.seek(0)
+    return document
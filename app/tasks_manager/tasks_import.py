@@ -0,0 +1,304 @@
+"""
+Bulk import of user tasks from CSV and JSON documents.
+
+This module contains the functions that read an uploaded document row by row, validate every row
+and load the valid rows into the user_tasks table with the PostgreSQL COPY protocol. The document
+is never loaded into memory as a whole: rows are parsed in batches in the blocking executor,
+and every batch is copied inside one transaction, so either all valid rows are imported or none.
+
+Supported formats:
+    - .csv: a header row with the columns task_name, description, start_time, end_time
+      and optional status, completion_time.
+    - .json: an array of objects with the same keys.
+    - .jsonl: one object with the same keys per line.
+
+Dates are accepted in the bot format DD.MM.YYYY HH:MM or in ISO 8601.
+"""
+
+import csv
+import io
+import itertools
+import json
+import os
+from dataclasses import dataclass, field
+from datetime import datetime, UTC
+from functools import lru_cache
+from typing import BinaryIO, Iterator
+
+from app import config
+from app.db.db_config import async_engine
+from app.db.router import get_session_router
+from app.offload import get_blocking_executor
+from app.tasks_manager.tasks_cache import get_tasks_cache
+
+IMPORT_FORMATS = (".csv", ".json", ".jsonl")
+IMPORT_COLUMNS = (
+    "owner_telegram_id", "task_name", "description", "start_time",
+    "end_time", "completion_time", "status"
+)
+JSON_CHUNK_SIZE = 64 * 1024
+
+
+class ImportFormatError(Exception):
+    """The document cannot be read any further."""
+
+
+@dataclass
+class ImportReport:
+    """
+    Result of a bulk import.
+
+    Options:
+        imported (int): Number of imported tasks.
+        errors (list[tuple[int, str]]): Row number and error text of every rejected row.
+    """
+    imported: int = 0
+    errors: list[tuple[int, str]] = field(default_factory=list)
+
+
+@lru_cache(maxsize=4096)
+def parse_time(value: str) -> datetime:
+    """
+    Parse a task date in the bot format DD.MM.YYYY HH:MM or in ISO 8601.
+
+    Dates in a bulk import repeat a lot, so parsed values are cached.
+
+    Options:
+        value (str): Date text.
+
+    Returns:
+        datetime: A datetime object based on UTC time.
+
+    Raises:
+        ValueError: The date is in an unknown format.
+    """
+    try:
+        time = datetime.strptime(value, '%d.%m.%Y %H:%M')
+    except ValueError:
+        time = datetime.fromisoformat(value)
+    return time.astimezone(UTC)
+
+
+def parse_status(value: str | bool | None) -> bool:
+    """
+    Parse the optional task status.
+
+    Options:
+        value (str | bool | None): Status value from the document.
+
+    Returns:
+        bool: True if the task is completed.
+
+    Raises:
+        ValueError: The status is not a boolean value.
+    """
+    if value is None or isinstance(value, bool):
+        return bool(value)
+    normalized = str(value).strip().lower()
+    if normalized in ("", "0", "false", "no", "нет"):
+        return False
+    if normalized in ("1", "true", "yes", "да"):
+        return True
+    raise ValueError(f"неизвестный статус {value}")
+
+
+def parse_task_row(owner_telegram_id: int, row: dict) -> tuple:
+    """
+    Validate a document row and convert it into a user_tasks record.
+
+    Options:
+        owner_telegram_id (int): Telegram user ID.
+        row (dict): Row of the document.
+
+    Returns:
+        tuple: Record with the values of IMPORT_COLUMNS.
+
+    Raises:
+        ValueError: The row is invalid.
+    """
+    if not isinstance(row, dict):
+        raise ValueError("строка должна быть объектом")
+    task_name = str(row.get("task_name") or "").strip()
+    if not task_name:
+        raise ValueError("не указано название задачи")
+    description = str(row.get("description") or "")
+    try:
+        start_time = parse_time(str(row.get("start_time") or "").strip())
+        end_time = parse_time(str(row.get("end_time") or "").strip())
+    except ValueError:
+        raise ValueError("неверный формат даты, ожидается DD.MM.YYYY HH:MM")
+    if end_time <= start_time:
+        raise ValueError("дата завершения должна быть позже даты старта")
+    status = parse_status(row.get("status"))
+    completion_time = None
+    if status:
+        completion_time_text = str(row.get("completion_time") or "").strip()
+        try:
+            completion_time = parse_time(completion_time_text) if completion_time_text else end_time
+        except ValueError:
+            raise ValueError("неверный формат даты выполнения")
+    return owner_telegram_id, task_name, description, start_time, end_time, completion_time, status
+
+
+def iter_json_array(stream: io.TextIOBase) -> Iterator[tuple[int, object]]:
+    """
+    Read the elements of a JSON array one by one without loading the whole array.
+
+    Options:
+        stream (io.TextIOBase): Text stream of the document.
+
+    Returns:
+        Iterator[tuple[int, object]]: Element number and decoded element.
+
+    Raises:
+        ImportFormatError: The document is not a JSON array.
+    """
+    decoder = json.JSONDecoder()
+    buffer = stream.read(JSON_CHUNK_SIZE).lstrip()
+    if not buffer.startswith("["):
+        raise ImportFormatError("документ JSON должен содержать массив задач")
+    position = 1
+    row_number = 0
+    is_eof = False
+    while True:
+        while position < len(buffer) and buffer[position] in " \t\r\n,":
+            position += 1
+        if position < len(buffer) and buffer[position] == "]":
+            return
+        try:
+            element, end = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            if is_eof:
+                raise ImportFormatError(f"ошибка разбора JSON после элемента {row_number}")
+            chunk = stream.read(JSON_CHUNK_SIZE)
+            is_eof = not chunk
+            buffer = buffer[position:] + chunk
+            position = 0
+            continue
+        row_number += 1
+        yield row_number, element
+        position = end
+        if position > JSON_CHUNK_SIZE:
+            buffer = buffer[position:]
+            position = 0
+
+
+def iter_document_rows(document: BinaryIO, file_name: str) -> Iterator[tuple[int, object]]:
+    """
+    Read the rows of an uploaded document one by one.
+
+    Options:
+        document (BinaryIO): Binary stream of the document.
+        file_name (str): Name of the document, its extension selects the format.
+
+    Returns:
+        Iterator[tuple[int, object]]: Row number and row of the document.
+
+    Raises:
+        ImportFormatError: The format is not supported or the document cannot be read.
+    """
+    extension = os.path.splitext(file_name.lower())[1]
+    if extension not in IMPORT_FORMATS:
+        raise ImportFormatError(f"поддерживаются только форматы {', '.join(IMPORT_FORMATS)}")
+    stream = io.TextIOWrapper(document, encoding="utf-8-sig", newline="")
+    try:
+        if extension == ".csv":
+            reader = csv.DictReader(stream)
+            try:
+                for row in reader:
+                    yield reader.line_num, row
+            except csv.Error as error:
+                raise ImportFormatError(f"ошибка разбора CSV после строки {reader.line_num}: {error}")
+        elif extension == ".jsonl":
+            for line_number, line in enumerate(stream, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    yield line_number, json.loads(line)
+                except json.JSONDecodeError:
+                    yield line_number, None
+        else:
+            yield from iter_json_array(stream)
+    except UnicodeDecodeError:
+        raise ImportFormatError("документ должен быть в кодировке UTF-8")
+
+
+def read_batch(
+    owner_telegram_id: int,
+    rows: Iterator[tuple[int, object]],
+    report: ImportReport,
+    batch_size: int
+) -> tuple[list[tuple], int]:
+    """
+    Parse the next batch of document rows, adding invalid rows to the report.
+
+    Options:
+        owner_telegram_id (int): Telegram user ID.
+        rows (Iterator[tuple[int, object]]): Rows of the document.
+        report (ImportReport): Import report.
+        batch_size (int): Maximum number of rows in the batch.
+
+    Returns:
+        tuple[list[tuple], int]: Valid records of the batch and the number of read rows,
+            which is 0 when the document is over.
+    """
+    records = list()
+    row_count = 0
+    for row_number, row in itertools.islice(rows, batch_size):
+        row_count += 1
+        try:
+            records.append(parse_task_row(owner_telegram_id=owner_telegram_id, row=row))
+        except ValueError as error:
+            report.errors.append((row_number, str(error)))
+    return records, row_count
+
+
+async def import_tasks(owner_telegram_id: int, document: BinaryIO, file_name: str) -> ImportReport:
+    """
+    Import tasks from a document in one transaction.
+
+    Options:
+        owner_telegram_id (int): Telegram user ID.
+        document (BinaryIO): Binary stream of the document.
+        file_name (str): Name of the document.
+
+    Returns:
+        ImportReport: Number of imported tasks and the errors of rejected rows.
+
+    Raises:
+        ImportFormatError: The document cannot be read, nothing was imported.
+    """
+    report = ImportReport()
+    rows = iter_document_rows(document=document, file_name=file_name)
+    async with async_engine.connect() as connection:
+        raw_connection = await connection.get_raw_connection()
+        driver_connection = raw_connection.driver_connection
+        async with driver_connection.transaction():
+            total_row_count = 0
+            while True:
+                # Parsing is CPU bound, so every batch is parsed outside the event loop
+                records, row_count = await get_blocking_executor().run(
+                    read_batch,
+                    owner_telegram_id,
+                    rows,
+                    report,
+                    config.IMPORT_BATCH_SIZE
+                )
+                if not row_count:
+                    break
+                total_row_count += row_count
+                if total_row_count > config.IMPORT_MAX_ROWS:
+                    raise ImportFormatError(f"документ содержит больше {config.IMPORT_MAX_ROWS} строк")
+                if not records:
+                    continue
+                await driver_connection.copy_records_to_table(
+                    "user_tasks",
+                    records=records,
+                    columns=IMPORT_COLUMNS
+                )
+                report.imported += len(records)
+    if report.imported:
+        # COPY bypasses the statement registry, so the write is recorded for read routing here
+        get_session_router().record_write(("user_tasks",))
+        get_tasks_cache().invalidate_owner(owner_telegram_id=owner_telegram_id)
+    return report
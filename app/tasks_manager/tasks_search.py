@@ -0,0 +1,108 @@
+"""
+Full-text and fuzzy search of user tasks.
+
+This module contains the search over task names and descriptions. Words of the query are matched
+against the search_vector column (russian text search configuration, GIN index), and misspelled
+task names are matched by trigram similarity (pg_trgm GIN index). Results are ranked and returned
+page by page.
+
+Recent result pages are kept in an LRU cache. The cache key contains the generation of the owner in
+the tasks cache, which is increased on every invalidation of the owner's tasks, so pages cached before
+a change of the tasks are never returned again and simply age out of the cache.
+
+Options:
+    _search_cache (LRUCache): A single instance of the cache of result pages.
+"""
+
+from dataclasses import dataclass
+
+from app import config
+from app.cache import LRUCache
+from app.db.models import UserTasks
+from app.db.router import read_session
+from app.db.statements import get_statement_registry
+from app.tasks_manager.tasks_cache import get_tasks_cache
+
+SEARCH_TASKS = get_statement_registry().register(
+    name="tasks.search",
+    sql=(
+        "SELECT id_task, owner_telegram_id, task_name, start_time, end_time, completion_time, "
+        "status, description, "
+        "ts_rank(search_vector, query) + similarity(task_name, :query) AS rank "
+        "FROM user_tasks, websearch_to_tsquery('russian', :query) AS query "
+        "WHERE owner_telegram_id =:owner_telegram_id "
+        "AND (search_vector @@ query OR task_name % :query) "
+        "ORDER BY rank DESC, id_task "
+        "LIMIT :limit OFFSET :offset"
+    )
+)
+
+
+@dataclass
+class SearchPage:
+    """
+    Page of search results.
+
+    Options:
+        list_tasks (list[UserTasks]): Found tasks of the page ordered by rank.
+        page (int): Number of the page starting from 0.
+        has_next (bool): Whether there are more results after the page.
+    """
+    list_tasks: list[UserTasks]
+    page: int
+    has_next: bool
+
+
+_search_cache: LRUCache = LRUCache(max_size=config.SEARCH_CACHE_SIZE, ttl=config.SEARCH_CACHE_TTL)
+
+
+def normalize_query(query: str) -> str:
+    """Normalize the query so that equal queries share cache entries."""
+    return " ".join(query.lower().split())
+
+
+async def search_tasks(owner_telegram_id: int, query: str, page: int = 0) -> SearchPage:
+    """
+    Search the owner's tasks by name and description.
+
+    Options:
+        owner_telegram_id (int): Telegram user ID.
+        query (str): Search query, web search syntax is supported ("quoted phrases", -excluded words).
+        page (int): Number of the page starting from 0.
+
+    Returns:
+        SearchPage: Found tasks of the page.
+    """
+    query = normalize_query(query=query)
+    key = (owner_telegram_id, get_tasks_cache().get_generation(owner_telegram_id), query, page)
+    search_page: SearchPage | None = _search_cache.get(key)
+    if search_page is not None:
+        return search_page
+    async with read_session(SEARCH_TASKS) as session:
+        # One extra row tells whether there is a next page
+        list_tasks: list[UserTasks] = (await SEARCH_TASKS.execute(
+            session,
+            {
+                "owner_telegram_id": owner_telegram_id,
+                "query": query,
+                "limit": config.SEARCH_PAGE_SIZE + 1,
+                "offset": page * config.SEARCH_PAGE_SIZE
+            }
+        )).all()
+    search_page = SearchPage(
+        list_tasks=list_tasks[:config.SEARCH_PAGE_SIZE],
+        page=page,
+        has_next=len(list_tasks) > config.SEARCH_PAGE_SIZE
+    )
+    _search_cache.set(key, search_page)
+    return search_page
+
+
+def get_search_cache_stats() -> dict:
+    """
+    Get the counters of the search cache.
+
+    Returns:
+        dict: Hit-rate counters of the cache of result pages.
+    """
+    return _search_cache.get_stats()
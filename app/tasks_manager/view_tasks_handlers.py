@@ -1,3 +1,5 @@
+from datetime import datetime, UTC
+
 from pyrogram import filters, Client, types
 
 from app.bot_init.bot_init import client_bot
@@ -6,33 +8,60 @@ from app.fsm_context.fsm_context import get_fsm_context
 from app.root.filters import get_filters
 from app.tasks_manager import tasks_controller
 from app.tasks_manager.handlers import get_back_buttons
+from app.tasks_manager.recurrence import TaskOccurrence
 from app.utils import TelegramUtils
 
+MAX_OCCURRENCE_BUTTONS = 10
+MAX_TASK_NAME_LENGTH = 20
+
 
 @client_bot.on_callback_query(
     filters.regex("tasks:view_tasks:") &
     get_filters().message_filter(state="tasks")
 )
-async def view_tasks(_: Client, message: types.CallbackQuery) -> None:
+async def view_tasks(
+    _: Client,
+    message: types.CallbackQuery,
+    list_tasks: list[UserTasks | TaskOccurrence] | None = None
+) -> None:
     """
         Processes the user's request to view tasks depending on the selected option.
 
         Actions:
         - Retrieve user ID from callback_data.
-        - Generate a text message with available options for viewing tasks.
-        - Create an inline keyboard with task view options and "Back" button.
+        - Generate a text message with available options for viewing tasks and the number of tasks of each kind.
+        - Create an inline keyboard with task view options, buttons completing the open occurrences
+          of recurring tasks from the shown list and "Back" button.
         - Send a keyboard message to the user.
         - Update the state of the state machine on "tasks:view".
     """
     owner_telegram_id = int(message.data.split(":")[-1])
+    count_tasks = await tasks_controller.count_tasks(owner_telegram_id=owner_telegram_id)
     text_message = (
         "В данном меню вы можете:\n\n"
-        "1) Просмотреть все действующие задачи\n"
-        "2) Просмотреть все выполненные задачи\n"
-        "3) Просмотреть все просроченные задачи\n"
-        "4) Просмотреть все задачи\n"
+        f"1) Просмотреть все действующие задачи ({count_tasks['current']})\n"
+        f"2) Просмотреть все выполненные задачи ({count_tasks['completed']})\n"
+        f"3) Просмотреть все просроченные задачи ({count_tasks['overdue']})\n"
+        f"4) Просмотреть все задачи ({count_tasks['all']})\n"
     )
     inline_keyboard = list()
+    list_occurrences = [
+        task for task in list_tasks or list()
+        if isinstance(task, TaskOccurrence) and not task.status
+    ][:MAX_OCCURRENCE_BUTTONS]
+    if list_occurrences:
+        text_message += "\nПовторяющиеся задачи из списка выше можно отметить выполненными\n"
+    for task in list_occurrences:
+        inline_keyboard.append([types.InlineKeyboardButton(
+            text=(
+                f"Выполнено: {task.task_name[:MAX_TASK_NAME_LENGTH]} "
+                f"{task.start_time.astimezone(UTC).strftime('%d.%m.%Y %H:%M')}"
+            ),
+            callback_data=(
+                f"tasks:occurrence_done:{task.id_task}:"
+                f"{int(task.start_time.timestamp())}:{owner_telegram_id}"
+            )
+        )])
     inline_keyboard.append([types.InlineKeyboardButton(
         text="Просмотреть все действующие задачи",
         callback_data=f"tasks:view_current_tasks:{owner_telegram_id}")])
@@ -55,7 +84,7 @@ async def view_tasks(_: Client, message: types.CallbackQuery) -> None:
         message=message
     )
     await telegram_utils.send_messages()
-    get_fsm_context().update_state(
+    await get_fsm_context().update_state(
         telegram_id=message.from_user.id,
         state="tasks:view"
     )
@@ -77,13 +106,13 @@ async def get_all_current_tasks(
         - Sends a message with information about current tasks.
         - Calls the view_tasks function to return to the task view menu.
     """
-    list_user_tasks: list[UserTasks] = tasks_controller.get_all_tasks(
+    list_user_tasks: list[UserTasks] = await tasks_controller.get_all_tasks(
         owner_telegram_id=int(message.data.split(":")[-1]), current_tasks=True)
     await tasks_controller.send_messages_get_all_tasks(
         list_tasks=list_user_tasks,
         message=message
     )
-    await view_tasks(_=_, message=message)
+    await view_tasks(_=_, message=message, list_tasks=list_user_tasks)
 
 
 @client_bot.on_callback_query(
@@ -102,7 +131,7 @@ async def get_all_completed_tasks(
         - Sends a message with information about completed tasks.
         - Calls the view_tasks function to return to the task view menu.
     """
-    list_user_tasks: list[UserTasks] = tasks_controller.get_all_tasks(
+    list_user_tasks: list[UserTasks] = await tasks_controller.get_all_tasks(
         owner_telegram_id=int(message.data.split(":")[-1]),
         completed_tasks=True
     )
@@ -129,13 +158,13 @@ async def get_all_overdue_tasks(
         - Sends a message with information about overdue tasks.
         - Calls the view_tasks function to return to the task view menu.
     """
-    list_user_tasks: list[UserTasks] = tasks_controller.get_all_tasks(
+    list_user_tasks: list[UserTasks] = await tasks_controller.get_all_tasks(
         owner_telegram_id=int(message.data.split(":")[-1]), overdue_tasks=True)
     await tasks_controller.send_messages_get_all_tasks(
         list_tasks=list_user_tasks,
         message=message
     )
-    await view_tasks(_=_, message=message)
+    await view_tasks(_=_, message=message, list_tasks=list_user_tasks)
 
 
 @client_bot.on_callback_query(
@@ -151,10 +180,41 @@ async def get_all_tasks(_: Client, message: types.CallbackQuery) -> None:
         - Sends a message with information about all tasks.
         - Calls the view_tasks function to return to the task view menu.
     """
-    list_user_tasks: list[UserTasks] = tasks_controller.get_all_tasks(
+    list_user_tasks: list[UserTasks] = await tasks_controller.get_all_tasks(
         owner_telegram_id=int(message.data.split(":")[-1]))
     await tasks_controller.send_messages_get_all_tasks(
         list_tasks=list_user_tasks,
         message=message
     )
     await view_tasks(_=_, message=message)
+
+
+@client_bot.on_callback_query(
+    filters.regex("tasks:occurrence_done:") &
+    get_filters().message_filter(state="tasks:view")
+)
+async def complete_occurrence(_: Client, message: types.CallbackQuery) -> None:
+    """
+        Handle the user's request to mark an occurrence of a recurring task as completed.
+
+        Actions:
+        - Retrieves the task ID and the occurrence start time from callback_data.
+        - Stores the completion of the occurrence.
+        - Sends a message with the result.
+        - Calls the view_tasks function to return to the task view menu.
+    """
+    id_task, occurrence_timestamp, owner_telegram_id = [int(x) for x in message.data.split(":")[-3:]]
+    occurrence_start = datetime.fromtimestamp(occurrence_timestamp, UTC)
+    is_completed = await tasks_controller.complete_task_occurrence(
+        id_task=id_task,
+        owner_telegram_id=owner_telegram_id,
+        occurrence_start=occurrence_start
+    )
+    text_message = (
+        f"Задача № {id_task} от {occurrence_start.strftime('%d.%m.%Y %H:%M')} отмечена выполненной"
+        if is_completed else
+        f"Задача № {id_task} от {occurrence_start.strftime('%d.%m.%Y %H:%M')} не найдена или уже выполнена"
+    )
+    telegram_utils = TelegramUtils(text=text_message, message=message)
+    await telegram_utils.send_messages()
+    await view_tasks(_=_, message=message)
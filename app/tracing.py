@@ -0,0 +1,472 @@
+"""
+Tracing of updates with spans exported as OTLP JSON lines.
+
+Every update handled by the bot client gets a trace id. The root span of the trace covers the update
+from the first filter evaluated for it to the end of its handler, with child spans for:
+- the evaluation of the filters of every handler checked for the update;
+- the handler body;
+- every SQL statement sent to the database, from the cursor events of the engines;
+- every Telegram API call made by the client.
+The span of the handler is the current span while it runs, so statements and API calls of the handler
+become its children.
+
+Traces are sampled when the first filter of the update is evaluated, with the probability
+TRACING_SAMPLE_RATE; updates that are not sampled cost one random number and no spans. A finished
+trace is written as one line of OTLP JSON (the ExportTraceServiceRequest of the OpenTelemetry
+protocol) to TRACING_FILE by a background worker, so the event loop never waits for the disk, and
+traces are dropped when the export queue is full. benchmarks/trace_report.py prints the span tree
+and the critical path of the slowest traces in the file.
+
+Options:
+    _tracer (Tracer): A single instance of the tracer used by the application.
+"""
+
+import asyncio
+import contextlib
+import json
+import logging
+import os
+import random
+import time
+from contextvars import ContextVar, Token
+from dataclasses import dataclass, field
+from typing import Any, Iterator
+
+from sqlalchemy import event, Engine
+
+from app import config
+from app.db.query_accounting import describe_update
+
+logger = logging.getLogger(__name__)
+
+SERVICE_NAME = "pyrogram_test"
+# Span kinds of the OpenTelemetry protocol
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+SPAN_KIND_CLIENT = 3
+# Status codes of the OpenTelemetry protocol
+STATUS_CODE_UNSET = 0
+STATUS_CODE_ERROR = 2
+# Length of the SQL text kept in the attributes of a statement span
+SQL_ATTRIBUTE_LENGTH = 1000
+# Attribute of a Pyrogram update holding its pending trace until the handler starts
+PENDING_TRACE_ATTRIBUTE = "_pending_trace"
+
+
+@dataclass
+class PendingTrace:
+    """
+    Sampling decision and filter evaluations of an update whose handler has not started yet.
+
+    Options:
+        is_sampled (bool): Whether the update is traced.
+        started_at (int): Start of the first filter evaluation in nanoseconds since the epoch.
+        filters (list[tuple[str, int, int, bool]]): Handler name, start, end and result of every
+            filter evaluation.
+    """
+    is_sampled: bool
+    started_at: int
+    filters: list[tuple[str, int, int, bool]] = field(default_factory=list)
+
+
+@dataclass
+class Span:
+    """
+    Timed operation of a trace.
+
+    Options:
+        name (str): Name of the operation.
+        trace_id (str): Trace id, 32 hexadecimal digits.
+        span_id (str): Span id, 16 hexadecimal digits.
+        parent_span_id (str): Span id of the parent, empty for the root span.
+        kind (int): Span kind of the OpenTelemetry protocol.
+        start_time (int): Start in nanoseconds since the epoch.
+        end_time (int): End in nanoseconds since the epoch, 0 while the span runs.
+        attributes (dict[str, Any]): Attributes of the span.
+        error (str | None): Error that ended the span.
+        spans (list[Span]): Spans of the trace, shared by every span of the trace.
+    """
+    name: str
+    trace_id: str
+    span_id: str
+    parent_span_id: str
+    kind: int
+    start_time: int
+    end_time: int = 0
+    attributes: dict[str, Any] = field(default_factory=dict)
+    error: str | None = None
+    spans: list["Span"] = field(default_factory=list, repr=False)
+
+
+# Span the operations of the running code belong to, None outside of sampled traces
+_current_span: ContextVar[Span | None] = ContextVar("current_span", default=None)
+
+
+def format_attribute(key: str, value: Any) -> dict:
+    """Format an attribute as an OTLP key-value pair."""
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+def format_span(span: Span) -> dict:
+    """Format a span as an OTLP span."""
+    otlp_span = {
+        "traceId": span.trace_id,
+        "spanId": span.span_id,
+        "name": span.name,
+        "kind": span.kind,
+        "startTimeUnixNano": str(span.start_time),
+        "endTimeUnixNano": str(span.end_time),
+        "attributes": [format_attribute(key=x, value=y) for x, y in span.attributes.items()],
+        "status": {"code": STATUS_CODE_UNSET}
+    }
+    if span.parent_span_id:
+        otlp_span["parentSpanId"] = span.parent_span_id
+    if span.error is not None:
+        otlp_span["status"] = {"code": STATUS_CODE_ERROR, "message": span.error}
+    return otlp_span
+
+
+class TraceExporter:
+    """
+    Writer of finished traces to a file of OTLP JSON lines.
+
+    Options:
+        path (str): Path of the file, traces are appended.
+        max_queue_size (int): Maximum number of traces waiting to be written.
+
+    Methods:
+        export(spans: list[Span]) -> bool: Queues a finished trace.
+        run() -> None: Writes the queued traces until cancelled.
+        flush() -> None: Writes the queued traces at shutdown.
+        get_stats() -> dict: Gets the export counters.
+    """
+
+    def __init__(self, path: str, max_queue_size: int):
+        self.path = path
+        self.__queue: asyncio.Queue[str] = asyncio.Queue(maxsize=max_queue_size)
+        self.exported = 0
+        self.dropped = 0
+        self.failed = 0
+
+    def export(self, spans: list[Span]) -> bool:
+        """
+        Queue a finished trace.
+
+        Options:
+            spans (list[Span]): Spans of the trace.
+
+        Returns:
+            bool: False if the queue is full and the trace was dropped.
+        """
+        line = json.dumps({
+            "resourceSpans": [{
+                "resource": {"attributes": [format_attribute(key="service.name", value=SERVICE_NAME)]},
+                "scopeSpans": [{"scope": {"name": __name__}, "spans": [format_span(x) for x in spans]}]
+            }]
+        }, ensure_ascii=False)
+        try:
+            self.__queue.put_nowait(line)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            return False
+        return True
+
+    def __write(self, lines: list[str]) -> None:
+        """Append the lines to the file."""
+        with open(self.path, "a", encoding="utf-8") as file:
+            file.write("\n".join(lines) + "\n")
+
+    async def run(self) -> None:
+        """Write the queued traces in batches until cancelled."""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        while True:
+            lines = [await self.__queue.get()]
+            while not self.__queue.empty():
+                lines.append(self.__queue.get_nowait())
+            # One batch is written at a time, in the default executor: the blocking executor is sized for
+            # the database pool and imports db_config, which attaches the tracer to the engines
+            try:
+                await asyncio.get_running_loop().run_in_executor(None, self.__write, lines)
+            except OSError as error:
+                self.failed += len(lines)
+                logger.warning("%d traces were not written to %s: %r", len(lines), self.path, error)
+                continue
+            self.exported += len(lines)
+
+    def flush(self) -> None:
+        """Write the traces still queued, called at shutdown after run() is cancelled."""
+        lines = list()
+        while not self.__queue.empty():
+            lines.append(self.__queue.get_nowait())
+        if not lines:
+            return
+        try:
+            self.__write(lines)
+        except OSError as error:
+            self.failed += len(lines)
+            logger.warning("%d traces were not written to %s: %r", len(lines), self.path, error)
+            return
+        self.exported += len(lines)
+
+    def get_stats(self) -> dict:
+        """
+        Get the export counters.
+
+        Returns:
+            dict: Numbers of written, dropped and failed traces and the number of queued traces.
+        """
+        return {
+            "exported": self.exported,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "queued": self.__queue.qsize()
+        }
+
+
+class Tracer:
+    """
+    Tracer of the updates handled by the bot.
+
+    Options:
+        sample_rate (float): Probability of tracing an update, 0 disables tracing.
+        exporter (TraceExporter): Writer of the finished traces.
+
+    Methods:
+        record_filter(update: Any, handler: str, start_time: int, end_time: int, is_matched: bool) -> None:
+            Records a filter evaluation for the update and samples the update at its first evaluation.
+        start_trace(update: Any, handler: str) -> Token | None: Starts the root span of a sampled update.
+        finish_trace(token: Token | None) -> None: Ends the root span and exports the trace.
+        span(name: str, kind: int = SPAN_KIND_INTERNAL, attributes: dict | None = None) -> Iterator[Span | None]:
+            Context manager of a child span of the current span.
+        start_span(name: str, kind: int, attributes: dict[str, Any]) -> Span | None: Starts a child span.
+        end_span(span: Span, error: BaseException | None = None) -> None: Ends a span.
+        attach(engine: Engine) -> None: Traces the statements of the engine.
+        get_stats() -> dict: Gets the tracing counters.
+    """
+
+    def __init__(self, sample_rate: float, exporter: TraceExporter):
+        self.sample_rate = sample_rate
+        self.exporter = exporter
+        self.sampled = 0
+        self.unsampled = 0
+        self.spans = 0
+
+    def record_filter(self, update: Any, handler: str, start_time: int, end_time: int, is_matched: bool) -> None:
+        """
+        Record a filter evaluation for the update, sampling the update at its first evaluation.
+
+        Options:
+            update (Any): Pyrogram update.
+            handler (str): Qualified name of the handler whose filters were evaluated.
+            start_time (int): Start of the evaluation in nanoseconds since the epoch.
+            end_time (int): End of the evaluation in nanoseconds since the epoch.
+            is_matched (bool): Whether the filters matched the update.
+        """
+        if not self.sample_rate:
+            return
+        pending_trace: PendingTrace | None = getattr(update, PENDING_TRACE_ATTRIBUTE, None)
+        if pending_trace is None:
+            is_sampled = random.random() < self.sample_rate
+            pending_trace = PendingTrace(is_sampled=is_sampled, started_at=start_time)
+            setattr(update, PENDING_TRACE_ATTRIBUTE, pending_trace)
+        if pending_trace.is_sampled:
+            pending_trace.filters.append((handler, start_time, end_time, is_matched))
+
+    def start_trace(self, update: Any, handler: str) -> Token | None:
+        """
+        Start the root span of a sampled update with the spans of its filter evaluations.
+
+        Options:
+            update (Any): Pyrogram update.
+            handler (str): Qualified name of the handler of the update.
+
+        Returns:
+            Token | None: Token passed to finish_trace, None if the update is not sampled.
+        """
+        pending_trace: PendingTrace | None = getattr(update, PENDING_TRACE_ATTRIBUTE, None)
+        if pending_trace is None or not pending_trace.is_sampled:
+            self.unsampled += 1
+            return None
+        # Another handler group matching the same update starts a trace of its own
+        setattr(update, PENDING_TRACE_ATTRIBUTE, None)
+        self.sampled += 1
+        root = Span(
+            name=f"update {handler}",
+            trace_id=random.getrandbits(128).to_bytes(16, "big").hex(),
+            span_id=random.getrandbits(64).to_bytes(8, "big").hex(),
+            parent_span_id="",
+            kind=SPAN_KIND_SERVER,
+            start_time=pending_trace.started_at,
+            attributes={"bot.handler": handler, "bot.update": describe_update(update)}
+        )
+        root.spans.append(root)
+        for filter_handler, start_time, end_time, is_matched in pending_trace.filters:
+            filter_span = self.__make_child(
+                parent=root,
+                name=f"filter {filter_handler}",
+                kind=SPAN_KIND_INTERNAL,
+                attributes={"bot.handler": filter_handler, "bot.filter.matched": is_matched},
+                start_time=start_time
+            )
+            filter_span.end_time = end_time
+        return _current_span.set(root)
+
+    def finish_trace(self, token: Token | None) -> None:
+        """
+        End the root span and export the trace.
+
+        Options:
+            token (Token | None): Token returned by start_trace.
+        """
+        if token is None:
+            return
+        root = _current_span.get()
+        _current_span.reset(token)
+        root.end_time = time.time_ns()
+        self.spans += len(root.spans)
+        self.exporter.export(spans=root.spans)
+
+    def __make_child(self, parent: Span, name: str, kind: int, attributes: dict[str, Any], start_time: int) -> Span:
+        """Create a child span sharing the spans of the trace."""
+        child = Span(
+            name=name,
+            trace_id=parent.trace_id,
+            span_id=random.getrandbits(64).to_bytes(8, "big").hex(),
+            parent_span_id=parent.span_id,
+            kind=kind,
+            start_time=start_time,
+            attributes=attributes,
+            spans=parent.spans
+        )
+        parent.spans.append(child)
+        return child
+
+    def start_span(self, name: str, kind: int, attributes: dict[str, Any]) -> Span | None:
+        """
+        Start a child span of the current span without making it current.
+
+        Options:
+            name (str): Name of the operation.
+            kind (int): Span kind.
+            attributes (dict[str, Any]): Attributes of the span.
+
+        Returns:
+            Span | None: The started span, None outside of sampled traces.
+        """
+        parent = _current_span.get()
+        if parent is None:
+            return None
+        return self.__make_child(parent=parent, name=name, kind=kind, attributes=attributes, start_time=time.time_ns())
+
+    @staticmethod
+    def end_span(span: Span, error: BaseException | None = None) -> None:
+        """
+        End a span.
+
+        Options:
+            span (Span): Span returned by start_span.
+            error (BaseException | None): Error that ended the operation.
+        """
+        span.end_time = time.time_ns()
+        if error is not None:
+            span.error = f"{type(error).__name__}: {error}"
+
+    @contextlib.contextmanager
+    def span(
+        self,
+        name: str,
+        kind: int = SPAN_KIND_INTERNAL,
+        attributes: dict[str, Any] | None = None
+    ) -> Iterator[Span | None]:
+        """
+        Run the block in a child span of the current span, made current for the block.
+
+        Options:
+            name (str): Name of the operation.
+            kind (int): Span kind.
+            attributes (dict[str, Any] | None): Attributes of the span.
+
+        Returns:
+            Iterator[Span | None]: The span, None outside of sampled traces.
+        """
+        span = self.start_span(name=name, kind=kind, attributes=attributes or dict())
+        if span is None:
+            yield None
+            return
+        token = _current_span.set(span)
+        try:
+            yield span
+        # Pyrogram's StopPropagation and ContinuePropagation are StopAsyncIteration, not failures
+        except StopAsyncIteration:
+            self.end_span(span=span)
+            raise
+        except Exception as error:
+            self.end_span(span=span, error=error)
+            raise
+        else:
+            self.end_span(span=span)
+        finally:
+            _current_span.reset(token)
+
+    def attach(self, engine: Engine) -> None:
+        """
+        Trace the statements of the engine as children of the current span.
+
+        Options:
+            engine (Engine): Engine, the sync_engine of an asynchronous engine.
+        """
+        event.listen(engine, "before_cursor_execute", self.__before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", self.__after_cursor_execute)
+        event.listen(engine, "handle_error", self.__handle_error)
+
+    def __before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        if _current_span.get() is None:
+            return
+        context.trace_span = self.start_span(
+            name=context.execution_options.get("statement_name") or "db.statement",
+            kind=SPAN_KIND_CLIENT,
+            attributes={"db.system": "postgresql", "db.statement": statement[:SQL_ATTRIBUTE_LENGTH]}
+        )
+
+    def __after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        span: Span | None = getattr(context, "trace_span", None)
+        if span is not None:
+            self.end_span(span=span)
+
+    def __handle_error(self, exception_context) -> None:
+        span: Span | None = getattr(exception_context.execution_context, "trace_span", None)
+        if span is not None and not span.end_time:
+            self.end_span(span=span, error=exception_context.original_exception)
+
+    def get_stats(self) -> dict:
+        """
+        Get the tracing counters.
+
+        Returns:
+            dict: Numbers of sampled and not sampled updates and of recorded spans, with the export counters.
+        """
+        return {
+            "sample_rate": self.sample_rate,
+            "sampled": self.sampled,
+            "unsampled": self.unsampled,
+            "spans": self.spans,
+            **self.exporter.get_stats()
+        }
+
+
+_tracer: Tracer = Tracer(
+    sample_rate=config.TRACING_SAMPLE_RATE,
+    exporter=TraceExporter(path=config.TRACING_FILE, max_queue_size=config.TRACING_QUEUE_SIZE)
+)
+
+
+def get_tracer() -> Tracer:
+    return _tracer
@@ -50,7 +50,7 @@ class TelegramUtils:
                 if not data.get('list_messages_delete_ids'):
                     data["list_messages_delete_ids"] = list()
                 data["list_messages_delete_ids"].append(message.id)
-        get_fsm_context().update_data(telegram_id=self.message.from_user.id, data=data)
+        await get_fsm_context().update_data(telegram_id=self.message.from_user.id, data=data)
 
     async def delete_message(
         self,
@@ -74,7 +74,7 @@ class TelegramUtils:
         if data.get('list_messages_delete_ids'):
             message_delete_ids += data.get('list_messages_delete_ids')
             del data["list_messages_delete_ids"]
-            get_fsm_context().update_data(
+            await get_fsm_context().update_data(
                 telegram_id=self.message.from_user.id,
                 data=data
             )
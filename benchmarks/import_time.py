@@ -0,0 +1,62 @@
+"""
+Import-time profile of the bot.
+
+Imports app.__main__ in a fresh interpreter with -X importtime, the same import graph python -m app and
+main.py load before main() starts, and prints the slowest imports by cumulative time. The entry point
+starts the bot only when it is run as a script, and importing the modules must not touch the database
+or Telegram, so the profile runs without either. The script exits with status 1 when
+the total import time exceeds the budget, so it can guard startup time in CI.
+
+Run from the repository root with the environment of the bot:
+    python -m benchmarks.import_time
+"""
+
+import argparse
+import subprocess
+import sys
+
+IMPORT_TIME_BUDGET = 2.0
+
+
+def profile_imports(module: str) -> list[tuple[int, int, str]]:
+    """
+    Import the module in a fresh interpreter and parse the -X importtime report.
+
+    Options:
+        module (str): Imported module.
+
+    Returns:
+        list[tuple[int, int, str]]: Self and cumulative time in microseconds and name of every imported module.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    imports = list()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_time, cumulative_time, name = line.removeprefix("import time:").split("|")
+        imports.append((int(self_time), int(cumulative_time), name.strip()))
+    return imports
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--module", default="app.__main__", help="profiled module")
+    parser.add_argument("--budget", type=float, default=IMPORT_TIME_BUDGET, help="import time budget in seconds")
+    parser.add_argument("--top", type=int, default=15, help="number of printed imports")
+    args = parser.parse_args()
+    imports = profile_imports(module=args.module)
+    total = next(cumulative for _, cumulative, name in imports if name == args.module) / 1e6
+    for self_time, cumulative_time, name in sorted(imports, key=lambda x: -x[1])[:args.top]:
+        print(f"{cumulative_time / 1000:>9.1f} ms {self_time / 1000:>9.1f} ms self  {name}")
+    print(f"import {args.module}: {total:.3f} s, budget {args.budget:.3f} s")
+    if total > args.budget:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
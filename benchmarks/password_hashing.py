@@ -0,0 +1,74 @@
+"""
+Benchmark of password hashing.
+
+Calibrates the scrypt cost of app.auth_manager.password for a latency budget, then hashes a batch of
+passwords concurrently in worker threads and in worker processes while measuring how late the event
+loop wakes up, which is the delay the hashing adds to the updates of other users.
+
+Run from the repository root with the environment of the bot:
+    python -m benchmarks.password_hashing
+"""
+
+import argparse
+import asyncio
+import time
+
+from app.auth_manager.password import PasswordHasher, MIN_SCRYPT_N
+from app.offload import BlockingExecutor
+
+
+async def measure_loop_lag(done: asyncio.Event, interval: float = 0.001) -> float:
+    """Measure the largest delay of a periodic wake-up of the event loop until the event is set."""
+    lag = 0.0
+    while not done.is_set():
+        started_at = time.perf_counter()
+        await asyncio.sleep(interval)
+        lag = max(lag, time.perf_counter() - started_at - interval)
+    return lag
+
+
+async def run_batch(hasher: PasswordHasher, passwords: int) -> tuple[float, float]:
+    """Hash the passwords concurrently and return the total time and the largest loop lag."""
+    done = asyncio.Event()
+    lag_task = asyncio.create_task(measure_loop_lag(done=done))
+    started_at = time.perf_counter()
+    await asyncio.gather(*(hasher.hash(password=f"Password-{x}!") for x in range(passwords)))
+    elapsed = time.perf_counter() - started_at
+    done.set()
+    return elapsed, await lag_task
+
+
+async def run(time_budget: float, workers: int, passwords: int) -> None:
+    hashers = {
+        name: PasswordHasher(
+            n=MIN_SCRYPT_N,
+            r=8,
+            p=1,
+            executor=BlockingExecutor(max_workers=workers, max_queue_size=passwords, timeout=600, processes=processes)
+        )
+        for name, processes in (("threads", False), ("processes", True))
+    }
+    n = await hashers["processes"].calibrate(time_budget=time_budget)
+    hashers["threads"].n = n
+    print(f"calibrated n={n} for a budget of {time_budget * 1000:.0f} ms")
+    password_hash = await hashers["processes"].hash(password="Password-0!")
+    started_at = time.perf_counter()
+    assert await hashers["processes"].verify(password="Password-0!", password_hash=password_hash)
+    print(f"{'verify':<12}{(time.perf_counter() - started_at) * 1000:>9.1f} ms")
+    for name, hasher in hashers.items():
+        elapsed, lag = await run_batch(hasher=hasher, passwords=passwords)
+        print(f"{name:<12}{elapsed * 1000:>9.1f} ms per {passwords} hashes, max loop lag {lag * 1000:.1f} ms")
+        hasher.executor.shutdown()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--budget", type=float, default=0.1, help="latency budget of one hash in seconds")
+    parser.add_argument("--workers", type=int, default=2, help="number of worker threads or processes")
+    parser.add_argument("--passwords", type=int, default=8, help="number of concurrently hashed passwords")
+    args = parser.parse_args()
+    asyncio.run(run(time_budget=args.budget, workers=args.workers, passwords=args.passwords))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Benchmark of task card rendering.
+
+Compares the nested f-string rendering the task lists used before the card renderer with the
+precompiled templates of app.tasks_manager.task_cards, without the cache and with a warm cache.
+
+Run from the repository root with the environment of the bot:
+    python -m benchmarks.task_cards
+"""
+
+import argparse
+import timeit
+from datetime import datetime, timedelta, UTC
+
+import pytz
+
+from app.db.models import UserTasks
+from app.tasks_manager.task_cards import render_task_card, TaskCardRenderer, TASK_STATUS_TEXT
+
+
+def render_task_card_f_strings(task: UserTasks) -> str:
+    """Render the card the way send_messages_get_all_tasks did before the card renderer."""
+    return (
+        f"*                                 Задача {task.task_name} № {task.id_task}                     *\n\n"
+        f"Описание задачи:\n{task.description}\n\n"
+        f"Время старта данной задачи по Гринвичу:\n{task.start_time.astimezone(pytz.timezone('UTC'))}\n\n"
+        f"Время завершения данной задачи по Гринвичу:\n{task.end_time.astimezone(pytz.timezone('UTC'))}\n\n"
+        f"Статус завершения задачи:\nЗадача {TASK_STATUS_TEXT.get(task.task_status)}\n\n"
+        f"{(f'Время завершения задачи по Гринвичу:\n{task.completion_time.astimezone(pytz.timezone('UTC'))}\n\n'
+            if task.status else '')}"
+    )
+
+
+def create_tasks(count: int) -> list[UserTasks]:
+    """Create single tasks with every fourth one completed."""
+    start_time = datetime(2024, 1, 1, 9, tzinfo=UTC)
+    return [
+        UserTasks(
+            id_task=x,
+            user=None,
+            task_name=f"Задача {x}",
+            description=f"Описание задачи {x}",
+            start_time=start_time + timedelta(hours=x),
+            end_time=start_time + timedelta(hours=x + 2),
+            completion_time=start_time + timedelta(hours=x + 1) if x % 4 == 0 else None,
+            status=x % 4 == 0,
+            task_status="done" if x % 4 == 0 else "active",
+            recurrence_unit=None,
+            recurrence_interval=1,
+            row_version=0
+        )
+        for x in range(count)
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=1000, help="number of rendered tasks")
+    parser.add_argument("--repeat", type=int, default=20, help="number of measured renderings of all tasks")
+    args = parser.parse_args()
+    list_tasks = create_tasks(count=args.tasks)
+    assert all(render_task_card_f_strings(task) == render_task_card(task) for task in list_tasks)
+    renderer = TaskCardRenderer(max_size=args.tasks, bucket_size=3600)
+    for task in list_tasks:
+        renderer.render(task=task)
+    benchmarks = {
+        "f-strings": lambda: [render_task_card_f_strings(task) for task in list_tasks],
+        "templates": lambda: [render_task_card(task) for task in list_tasks],
+        "templates, warm cache": lambda: [renderer.render(task=task) for task in list_tasks]
+    }
+    baseline = None
+    for name, benchmark in benchmarks.items():
+        seconds = min(timeit.repeat(benchmark, number=1, repeat=args.repeat))
+        baseline = baseline or seconds
+        print(f"{name:<24}{seconds * 1000:>9.3f} ms per {args.tasks} tasks{baseline / seconds:>8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Report of the traces exported by the bot.
+
+Reads the OTLP JSON lines written to TRACING_FILE and prints the span tree of the slowest traces, or of
+one trace by its id, with the start offset and duration of every span. The critical path is marked
+with "*": from the root, the child span ending last at every level, the chain of operations the update
+waited for. Spans of the critical path are where a slow interaction lost its time, whether in filters,
+FSM writes, controller SQL or Telegram API calls.
+
+Run from the repository root:
+    python -m benchmarks.trace_report traces.jsonl --top 5
+    python -m benchmarks.trace_report traces.jsonl --trace-id <trace id>
+"""
+
+import argparse
+import json
+import sys
+from collections import defaultdict
+
+
+def load_traces(path: str) -> dict[str, list[dict]]:
+    """
+    Load the spans of the file grouped by trace.
+
+    Options:
+        path (str): Path of the OTLP JSON lines file.
+
+    Returns:
+        dict[str, list[dict]]: OTLP spans by trace id.
+    """
+    traces = defaultdict(list)
+    with open(path, encoding="utf-8") as file:
+        for line in file:
+            if not line.strip():
+                continue
+            for resource_spans in json.loads(line).get("resourceSpans", []):
+                for scope_spans in resource_spans.get("scopeSpans", []):
+                    for span in scope_spans.get("spans", []):
+                        traces[span["traceId"]].append(span)
+    return traces
+
+
+def get_duration(span: dict) -> int:
+    """Get the duration of a span in nanoseconds."""
+    return int(span["endTimeUnixNano"]) - int(span["startTimeUnixNano"])
+
+
+def find_critical_path(root: dict, children: dict[str, list[dict]]) -> set[str]:
+    """
+    Find the critical path of a trace.
+
+    Options:
+        root (dict): Root span.
+        children (dict[str, list[dict]]): Child spans by parent span id.
+
+    Returns:
+        set[str]: Span ids of the spans ending last at every level from the root.
+    """
+    critical_path = {root["spanId"]}
+    span = root
+    while children.get(span["spanId"]):
+        span = max(children[span["spanId"]], key=lambda x: int(x["endTimeUnixNano"]))
+        critical_path.add(span["spanId"])
+    return critical_path
+
+
+def print_trace(trace_id: str, spans: list[dict]) -> None:
+    """Print the span tree of a trace with its critical path."""
+    roots = [x for x in spans if not x.get("parentSpanId")]
+    if not roots:
+        print(f"trace {trace_id}: no root span")
+        return
+    root = roots[0]
+    children = defaultdict(list)
+    for span in spans:
+        if span.get("parentSpanId"):
+            children[span["parentSpanId"]].append(span)
+    critical_path = find_critical_path(root=root, children=children)
+    root_start = int(root["startTimeUnixNano"])
+    print(f"trace {trace_id}: {root['name']} {get_duration(root) / 1e6:.1f} ms, {len(spans)} spans")
+
+    def print_span(span: dict, depth: int) -> None:
+        marker = "*" if span["spanId"] in critical_path else " "
+        status = span.get("status", {})
+        error = f"  ERROR {status.get('message', '')}" if status.get("code") == 2 else ""
+        offset = (int(span["startTimeUnixNano"]) - root_start) / 1e6
+        print(f"{marker} {offset:>9.1f} ms {get_duration(span) / 1e6:>9.1f} ms  {'  ' * depth}{span['name']}{error}")
+        for child in sorted(children.get(span["spanId"], []), key=lambda x: int(x["startTimeUnixNano"])):
+            print_span(span=child, depth=depth + 1)
+
+    print_span(span=root, depth=0)
+    print()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("path", nargs="?", default="traces.jsonl", help="OTLP JSON lines file")
+    parser.add_argument("--trace-id", help="printed trace")
+    parser.add_argument("--top", type=int, default=5, help="number of printed slowest traces")
+    args = parser.parse_args()
+    traces = load_traces(path=args.path)
+    if args.trace_id:
+        if args.trace_id not in traces:
+            print(f"trace {args.trace_id} is not in {args.path}")
+            sys.exit(1)
+        print_trace(trace_id=args.trace_id, spans=traces[args.trace_id])
+        return
+
+    def get_trace_duration(spans: list[dict]) -> int:
+        return max((get_duration(x) for x in spans if not x.get("parentSpanId")), default=0)
+
+    slowest = sorted(traces.items(), key=lambda x: -get_trace_duration(x[1]))[:args.top]
+    print(f"{len(traces)} traces in {args.path}, {len(slowest)} slowest:\n")
+    for trace_id, spans in slowest:
+        print_trace(trace_id=trace_id, spans=spans)
+
+
+if __name__ == "__main__":
+    main()